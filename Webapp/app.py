@@ -9,15 +9,43 @@ import logging
 # Just ensure werkzeug doesn't log too much
 logging.getLogger("werkzeug").setLevel(logging.WARNING)
 
-from flask import Flask, jsonify, render_template, Response, request
+from flask import Flask, jsonify, render_template, Response, request, stream_with_context
+import re
+import math
 import time
+import functools
 import threading
 import json
+import queue
 import sqlite3
+import csv
+import io
+import uuid
+from collections import defaultdict, deque
+from datetime import date, datetime, timedelta, time as dt_time
+from decimal import Decimal
+from zoneinfo import ZoneInfo
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeout
+
+try:
+	import orjson  # optional: faster JSON with native datetime support
+except Exception:
+	orjson = None
+
+try:
+	import psycopg2.extensions as _pg_ext
+	# NUMERIC -> float typecaster, registered per-cursor on JSON read paths so
+	# rows need no Decimal coercion pass before encoding.
+	_DEC2FLOAT = _pg_ext.new_type(_pg_ext.DECIMAL.values, 'DEC2FLOAT', lambda v, c: float(v) if v is not None else None)
+except Exception:
+	_pg_ext = None
+	_DEC2FLOAT = None
 
 # Allow direct execution without treating Webapp as a package
 CURRENT_DIR = os.path.dirname(__file__)
 REPO_ROOT = os.path.dirname(os.path.dirname(__file__))
+# Resolved once at import; main.py loads .env before importing this module.
+_INSTRUMENTS_CSV_PATH = os.path.join(REPO_ROOT, os.getenv('INSTRUMENTS_CSV', os.path.join('Csvs','instruments.csv')))
 if CURRENT_DIR not in sys.path:
 	sys.path.append(CURRENT_DIR)
 if REPO_ROOT not in sys.path:
@@ -169,12 +197,12 @@ except Exception:
 # path issues. If unavailable, provide clear runtime-failing stubs rather
 # than leaving names undefined (which caused NameError exceptions).
 try:
-	from Webapp.ltp_service import get_kite as _get_kite_impl, fetch_ltp as _fetch_impl
+	from Webapp.ltp_service import get_kite as _get_kite_impl, fetch_ltp as _fetch_impl, ltp_as_columns
 	get_kite = _get_kite_impl
 	fetch_ltp = _fetch_impl
 except Exception:
 	try:
-		from ltp_service import get_kite as _get_kite_impl, fetch_ltp as _fetch_impl
+		from ltp_service import get_kite as _get_kite_impl, fetch_ltp as _fetch_impl, ltp_as_columns
 		get_kite = _get_kite_impl
 		fetch_ltp = _fetch_impl
 	except Exception:
@@ -182,6 +210,8 @@ except Exception:
 		def get_kite(*a, **k):
 			raise RuntimeError("kite client not available: ensure kiteconnect and token.txt are configured")
 		# fetch_ltp already has a safe wrapper above; leave it as-is
+		def ltp_as_columns(fields, snapshot=None):
+			return [], {f: [] for f in fields}
 
 def load_dotenv(path: str):
 	"""Minimal .env loader (does not overwrite existing vars)."""
@@ -195,6 +225,86 @@ def load_dotenv(path: str):
  
 app = Flask(__name__, template_folder="templates")
 
+
+def _json_default(o):
+	if isinstance(o, Decimal):
+		return float(o)
+	if isinstance(o, (datetime, date, dt_time)):
+		return o.isoformat()
+	raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+def _json_bytes(obj) -> bytes:
+	"""Serialize to UTF-8 JSON bytes, using orjson when it is installed.
+
+	Decimals become floats and datetimes ISO 8601 strings on both paths; any
+	other unsupported type raises TypeError.
+	"""
+	if orjson is not None:
+		return orjson.dumps(obj, default=_json_default, option=orjson.OPT_NON_STR_KEYS)
+	return json.dumps(obj, default=_json_default).encode()
+
+
+def _json_dumps(obj) -> str:
+	"""_json_bytes() as a str, for callers that build text (e.g. SSE frames)."""
+	if orjson is not None:
+		return _json_bytes(obj).decode()
+	return json.dumps(obj, default=_json_default)
+
+
+# jsonify() keeps Flask's encoding rules (HTTP dates, Decimal as str,
+# TypeError for unknown types) but is encoded with orjson when it is
+# installed. Routes returning DB rows use _jsonify() for ISO dates and floats.
+try:
+	from flask.json.provider import DefaultJSONProvider
+except Exception:  # Flask < 2.2: fall back to _jsonify() on the hot routes
+	DefaultJSONProvider = None
+
+if DefaultJSONProvider is not None:
+	if orjson is not None:
+		# dates/dataclasses go to Flask's default() instead of orjson's encoding
+		_FLASK_ORJSON_OPTS = (orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+				| orjson.OPT_PASSTHROUGH_DATACLASS)
+
+	class _AppJSONProvider(DefaultJSONProvider):
+		def _orjson_option(self) -> int:
+			if self.sort_keys:
+				return _FLASK_ORJSON_OPTS | orjson.OPT_SORT_KEYS
+			return _FLASK_ORJSON_OPTS
+
+		def dumps(self, obj, **kwargs):
+			# json.dumps options (indent=, separators=, ...) have no exact
+			# orjson equivalent, so those calls keep the stdlib encoder
+			if orjson is None or kwargs:
+				return super().dumps(obj, **kwargs)
+			return orjson.dumps(obj, default=self.default, option=self._orjson_option()).decode()
+
+		def response(self, *args, **kwargs):
+			# pretty-printed output (compact=False, or debug mode) stays on Flask's path
+			if orjson is None or self.compact is False or (self.compact is None and self._app.debug):
+				return super().response(*args, **kwargs)
+			# same argument rules as Flask's jsonify()
+			if args and kwargs:
+				raise TypeError("app.json.response() takes either args or kwargs, not both")
+			obj = (args[0] if len(args) == 1 else args) if args else (kwargs or None)
+			# hand orjson's bytes straight to the response instead of the
+			# default dumps() -> str -> re-encode round trip
+			body = orjson.dumps(obj, default=self.default, option=self._orjson_option()) + b"\n"
+			return self._app.response_class(body, mimetype=self.mimetype)
+
+		def loads(self, s, **kwargs):
+			if orjson is not None and not kwargs:
+				return orjson.loads(s)
+			return super().loads(s, **kwargs)
+
+	app.json = _AppJSONProvider(app)
+
+
+def _jsonify(obj):
+	"""jsonify() for the high-traffic routes; encodes with _json_bytes on
+	every Flask version, including < 2.2 where app.json is not available."""
+	return app.response_class(_json_bytes(obj), mimetype='application/json')
+
 # -------- Security Headers Setup --------
 # Add OWASP-recommended security headers to all responses
 app = add_security_headers(app)
@@ -214,7 +324,7 @@ app.config['PERMANENT_SESSION_LIFETIME'] = 3600  # 1 hour session
 app = init_auth(app)
 app = init_csrf(app)
 
-# -------- Rate Limiting (DISABLED) --------
+# -------- Rate Limiting (opt-in) --------
 # Dummy limiter - decorators do nothing
 class DummyLimiter:
 	def limit(self, *args, **kwargs):
@@ -224,6 +334,25 @@ class DummyLimiter:
 
 limiter = DummyLimiter()
 
+# Set RATE_LIMIT_ENABLED=true to enforce the per-endpoint limits below. The
+# fixed-window-elastic-expiry strategy is a single counter per key (O(1)) rather
+# than the sorted timestamp set kept by moving-window. Storage defaults to the
+# in-process memory store; point RATE_LIMIT_STORAGE_URI at redis:// when running
+# several workers so they share counters.
+if os.environ.get('RATE_LIMIT_ENABLED', 'false').lower() in ('true', '1', 'yes'):
+	try:
+		from flask_limiter import Limiter
+		from flask_limiter.util import get_remote_address
+		limiter = Limiter(
+			key_func=get_remote_address,
+			app=app,
+			storage_uri=os.environ.get('RATE_LIMIT_STORAGE_URI', 'memory://'),
+			strategy='fixed-window-elastic-expiry',
+		)
+	except Exception as e:
+		logging.warning("flask-limiter unavailable, rate limiting disabled: %s", e)
+		limiter = DummyLimiter()
+
 from logging_config import get_logger
 
 # Per-component loggers (write to date-foldered files under ./logs/YYYY-MM-DD/)
@@ -307,6 +436,26 @@ except Exception:
 # -------- In-memory store for orders placed via this webapp --------
 _orders_lock = threading.RLock()
 _orders_store: dict[str, dict] = {}
+# Upper bounds for the per-process order caches; without them they grow with
+# every order seen in a session.
+_ORDERS_STORE_MAX = 10000
+_ORDERS_STORE_TTL = 86400  # seconds, against each record's epoch 'ts'
+_BROKER_ORDERS_MAX = 10000
+
+
+def _trim_oldest(d: dict, max_size: int, max_age: float | None = None) -> None:
+	"""Evict from the front of insertion-ordered `d` until it holds at most
+	`max_size` entries and, when `max_age` is given, its oldest record's 'ts'
+	is younger than that many seconds."""
+	cutoff = time.time() - max_age if max_age else None
+	while d:
+		try:
+			k = next(iter(d))
+			if len(d) <= max_size and (cutoff is None or (d[k].get('ts') or 0) >= cutoff):
+				break
+		except (StopIteration, RuntimeError, KeyError):
+			break
+		d.pop(k, None)
 
 from Webapp import cooldown
 
@@ -337,44 +486,329 @@ def _can_enter_symbol(symbol: str, cooldown_seconds: int = 600) -> tuple[bool, i
 		# Fail-open: if cooldown check fails, allow entry
 		return True, None
 
-# Cached broker orders (updated via Kite Ticker order_update), and cached GTTs
+# Cached broker orders (updated via Kite Ticker order_update), and cached GTTs.
+# _broker_orders_cache is accessed without a lock: writers only do single-key
+# sets/pops or one dict.update(), and readers take list(.values()), each of
+# which is a single atomic operation under the GIL. _broker_orders_lock now
+# only serializes swaps of _gtt_cache; its lists are never edited in place.
 _broker_orders_cache: dict[str, dict] = {}
 _broker_orders_lock = threading.RLock()
 _gtt_cache: dict[str, list] = {}
-_gtt_cache_ts: float = 0.0
+_gtt_cache_ts: float = 0.0  # time.monotonic() of last refresh
+# Bumped by _invalidate_gtt_cache(); fetches started under an older generation
+# are not stored, so a book read before a place/modify/delete can't land late.
+_gtt_cache_gen: int = 0
+# SSE subscribers as (deque(maxlen=_SSE_QUEUE_MAX), Event) pairs; the deque
+# holds ready-to-send `data:` frames
 _order_event_queues: list = []
+_SSE_QUEUE_MAX = 64
+_SSE_BATCH_MAX = 32  # events per SSE write
+
+# Per-instrument quote cache shared by the trailer, /api/holdings,
+# /api/gtt/recreate and /api/orders: key "NSE:SYM" -> (monotonic ts, quote).
+# Fetches are serialized so concurrent callers asking for overlapping keys wait
+# for one kite.quote() and then read its results instead of repeating it.
+_quote_cache: dict[str, tuple[float, dict]] = {}
+_quote_fetch_lock = threading.Lock()
+_QUOTE_TTL = 5.0
+_QUOTE_BATCH_MAX = 500  # Kite's per-request instrument limit for quote()
+_QUOTE_EVICT_AGE = 60.0  # entries older than this are dropped on each fetch
 
-def _fetch_gtts_with_timeout(kite, timeout=2.0):
-	"""Attempt to fetch GTTs from kite but return quickly using a thread timeout.
 
-	If fetch doesn't complete within `timeout` seconds, return cached _gtt_cache flattened.
+def _quote_get(kite, keys, ttl: float = _QUOTE_TTL) -> dict:
+	"""kite.quote() for `keys`, serving entries younger than `ttl` from cache.
+
+	Only stale/missing keys are requested, in as few calls as Kite's
+	per-request limit allows. Errors from kite.quote propagate to the caller.
 	"""
-	import threading
-	result = {}
-	def worker():
-		try:
-			if hasattr(kite, 'get_gtts'):
-				res = kite.get_gtts() or []
-			elif hasattr(kite, 'get_gtt'):
-				res = [kite.get_gtt()] or []
+	keys = list(dict.fromkeys(keys))
+
+	def _fresh(now):
+		out, stale = {}, []
+		for k in keys:
+			hit = _quote_cache.get(k)
+			if hit and now - hit[0] < ttl:
+				out[k] = hit[1]
 			else:
-				res = []
-			result['v'] = res
-		except Exception as e:
-			error_logger.warning("Failed to fetch GTT list: %s", e)
-			result['v'] = []
-
-	th = threading.Thread(target=worker, daemon=True)
-	th.start()
-	th.join(timeout)
-	if 'v' in result:
-		return result['v']
-	# timeout -> return flattened cache
+				stale.append(k)
+		return out, stale
+
+	out, stale = _fresh(time.monotonic())
+	if not stale:
+		return out
+	with _quote_fetch_lock:
+		# another caller may have fetched these while we waited
+		out, stale = _fresh(time.monotonic())
+		if stale:
+			# bound the cache to recently quoted instruments
+			cutoff = time.monotonic() - _QUOTE_EVICT_AGE
+			for k in [k for k, (ts, _) in _quote_cache.items() if ts < cutoff]:
+				del _quote_cache[k]
+		for i in range(0, len(stale), _QUOTE_BATCH_MAX):
+			qd = kite.quote(stale[i:i + _QUOTE_BATCH_MAX]) or {}
+			now = time.monotonic()
+			for k, q in qd.items():
+				_quote_cache[k] = (now, q)
+			out.update(qd)
+	return out
+
+
+# Short-lived snapshot of kite.orders() for read-only pollers (sync, order book)
+# so bursts of requests share one broker round trip. Kept separate from
+# _broker_orders_cache, which is fed incrementally by ticker order_update events.
+_orders_snapshot: dict = {'ts': 0.0, 'val': None}
+_orders_snapshot_lock = threading.Lock()
+
+
+def _upper_fields(d: dict, keys=('status', 'transaction_type')) -> dict:
+	"""Upper-case `keys` of a broker order/GTT leg in place (Kite already sends
+	upper case; this only fixes stragglers) so readers can compare directly."""
+	for k in keys:
+		v = d.get(k)
+		if isinstance(v, str) and not v.isupper():
+			d[k] = v.upper()
+	return d
+
+
+def _cached_orders(kite, ttl: float = 1.5) -> list:
+	"""Return kite.orders(), re-fetching at most once per `ttl` seconds.
+
+	Errors propagate to the caller; a failed fetch is not cached.
+	"""
+	with _orders_snapshot_lock:
+		now = time.monotonic()
+		if _orders_snapshot['val'] is None or now - _orders_snapshot['ts'] > ttl:
+			_orders_snapshot['val'] = [_upper_fields(o) for o in (kite.orders() or [])]
+			_orders_snapshot['ts'] = now
+		return _orders_snapshot['val']
+
+
+# Shared pool for broker GTT fetches so a timed-out call doesn't cost a fresh
+# thread per request.
+_gtt_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='gtt_fetch')
+# In-flight inline fetch as (cache generation, future), shared by concurrent
+# callers of the same generation (single-flight).
+_gtt_inflight = None
+_gtt_inflight_lock = threading.Lock()
+
+def _fetch_gtts(kite):
+	"""Fetch the GTT book from kite, returning [] on failure.
+
+	Order legs have their transaction_type upper-cased on the way in.
+	"""
+	try:
+		if hasattr(kite, 'get_gtts'):
+			gtts = kite.get_gtts() or []
+		elif hasattr(kite, 'get_gtt'):
+			gtts = [kite.get_gtt()]
+		else:
+			return []
+		for g in gtts:
+			for o in (g.get('orders') or []):
+				_upper_fields(o, ('transaction_type',))
+		return gtts
+	except Exception as e:
+		error_logger.warning("Failed to fetch GTT list: %s", e)
+		return []
+
+# GTT book freshness bound. Callers get the cached book; when it is older than
+# this the background refresher is woken to fetch a new one.
+_GTT_TTL = 2.0
+_gtt_refresh_event = threading.Event()
+_gtt_refresher_started = False
+_gtt_refresher_lock = threading.Lock()
+
+
+def _store_gtt_cache(gtt_list, gen: int | None = None) -> None:
+	"""Replace _gtt_cache with `gtt_list` grouped by tradingsymbol.
+
+	`gen` is the _gtt_cache_gen the fetch started under; if the cache has been
+	invalidated since, the (possibly pre-change) book is dropped.
+	"""
+	global _gtt_cache, _gtt_cache_ts
+	by_symbol: dict[str, list] = {}
+	for g in gtt_list:
+		ts = g.get('tradingsymbol') or g.get('symbol')
+		if ts:
+			by_symbol.setdefault(ts, []).append(g)
+	with _broker_orders_lock:
+		if gen is not None and gen != _gtt_cache_gen:
+			return
+		_gtt_cache = by_symbol
+		_gtt_cache_ts = time.monotonic()
+
+
+def _invalidate_gtt_cache() -> None:
+	"""Mark the GTT book stale after a place/modify/delete on the broker.
+
+	The next reader fetches a new book inline; the old entries stay only as
+	the timeout fallback.
+	"""
+	global _gtt_cache_ts, _gtt_cache_gen
+	with _broker_orders_lock:
+		_gtt_cache_gen += 1
+		_gtt_cache_ts = 0.0
+
+
+def _drop_gtt_from_cache(gtt_id) -> None:
+	"""Remove `gtt_id` from _gtt_cache by swapping in a new dict; the lists a
+	reader may already hold are never modified."""
+	global _gtt_cache
+	sid = str(gtt_id)
+	with _broker_orders_lock:
+		new_cache = {}
+		for k, arr in _gtt_cache.items():
+			kept = [g for g in arr if str(g.get('id') or g.get('trigger_id')) != sid]
+			if kept:
+				new_cache[k] = kept
+		_gtt_cache = new_cache
+
+
+def _cached_gtt_list() -> list:
 	tmp = []
-	for arr in _gtt_cache.values():
+	for arr in list(_gtt_cache.values()):
 		tmp.extend(arr)
 	return tmp
 
+
+def _gtt_cache_snapshot() -> tuple[list, float]:
+	"""The cached GTT book and the monotonic time it was fetched, read as one
+	pair (ts is 0.0 while the cache is cold or invalidated)."""
+	with _broker_orders_lock:
+		cache, ts = _gtt_cache, _gtt_cache_ts
+	tmp = []
+	for arr in cache.values():
+		tmp.extend(arr)
+	return tmp, ts
+
+
+def _gtt_refresher_loop() -> None:
+	while True:
+		_gtt_refresh_event.wait()
+		_gtt_refresh_event.clear()
+		try:
+			if time.monotonic() - _gtt_cache_ts < _GTT_TTL:
+				continue
+			gen = _gtt_cache_gen
+			_store_gtt_cache(_fetch_gtts(get_kite()), gen)
+		except Exception as e:
+			error_logger.warning("GTT refresher failed: %s", e)
+			time.sleep(_GTT_TTL)
+
+
+def _ensure_gtt_refresher() -> None:
+	global _gtt_refresher_started
+	if _gtt_refresher_started:
+		return
+	with _gtt_refresher_lock:
+		if not _gtt_refresher_started:
+			threading.Thread(target=_gtt_refresher_loop, name='gtt_refresher', daemon=True).start()
+			_gtt_refresher_started = True
+
+
+def _fetch_gtts_with_timeout(kite, timeout=2.0, max_age: float = _GTT_TTL):
+	"""Return the GTT book, served from the shared cache when possible.
+
+	A cache younger than `max_age` seconds is returned as-is; an older one is
+	returned too, but the background refresher is woken to fetch a new book.
+	Only a cold or invalidated cache, or max_age=0, fetches inline, bounded
+	by `timeout` and falling back to the cache on timeout. Callers deciding
+	whether to place/modify/delete a GTT must pass max_age=0. Concurrent
+	cold-cache callers share a single in-flight fetch.
+	"""
+	age = time.monotonic() - _gtt_cache_ts
+	if _gtt_cache_ts and max_age > 0:
+		if age >= max_age:
+			_ensure_gtt_refresher()
+			_gtt_refresh_event.set()
+		return _cached_gtt_list()
+	global _gtt_inflight
+	with _gtt_inflight_lock:
+		gen = _gtt_cache_gen
+		inflight = _gtt_inflight
+		fut = inflight[1] if inflight is not None and inflight[0] == gen else None
+		# Never queue behind a running fetch: a hung get_gtts (bounded by the
+		# kite client's HTTP timeout) would hold up every later one. A fetch of
+		# the current generation started after the last place/modify/delete, so
+		# max_age=0 callers can join it too.
+		if fut is None or fut.done():
+			fut = _gtt_executor.submit(_fetch_gtts, kite)
+			_gtt_inflight = (gen, fut)
+			# store on completion, so a fetch that outlives `timeout` still
+			# warms the cache for the next caller
+			fut.add_done_callback(lambda f, gen=gen: _store_gtt_cache(f.result(), gen))
+	try:
+		return fut.result(timeout=timeout)
+	except FuturesTimeout:
+		return _cached_gtt_list()
+
+
+def _gtt_book_by_symbol(kite, timeout=2.0, max_age: float = _GTT_TTL) -> dict[str, list]:
+	"""The GTT book grouped by tradingsymbol, read straight from _gtt_cache.
+
+	Same freshness rules as _fetch_gtts_with_timeout, but a warm cache is
+	returned as a shallow copy instead of being flattened and regrouped.
+	Cache values are only ever replaced, never mutated, so the copy is a
+	consistent snapshot.
+	"""
+	if not _gtt_cache_ts:
+		return _group_gtts(_fetch_gtts_with_timeout(kite, timeout=timeout, max_age=max_age))
+	if time.monotonic() - _gtt_cache_ts >= max_age:
+		_ensure_gtt_refresher()
+		_gtt_refresh_event.set()
+	return dict(_gtt_cache)
+
+# Order updates flow ticker callback -> _order_dispatch_q -> dispatcher thread
+# -> per-subscriber SSE queues. The payload is encoded once per event.
+_order_dispatch_q: queue.SimpleQueue = queue.SimpleQueue()
+_order_dispatcher_started = False
+_order_dispatcher_lock = threading.Lock()
+
+
+def _order_dispatcher() -> None:
+	while True:
+		data = _order_dispatch_q.get()
+		if not _order_event_queues:
+			continue
+		try:
+			# framed once here; subscribers just concatenate the shared string
+			msg = f"data: {_json_dumps({'type':'order_update','order':data})}\n\n"
+		except Exception as e:
+			error_logger.warning("Error encoding order update: %s", e)
+			continue
+		for buf, ev in list(_order_event_queues):
+			# bounded deque: a slow subscriber loses its oldest events, not the newest
+			buf.append(msg)
+			ev.set()
+
+
+# Encoded SSE snapshot frame shared by clients connecting within the same
+# _SNAPSHOT_MAX_AGE window (e.g. a burst of reconnects after a deploy).
+_snapshot_payload_cache: tuple[float, str] = (0.0, '')
+_SNAPSHOT_MAX_AGE = 0.2
+
+
+def _snapshot_frame() -> str:
+	global _snapshot_payload_cache
+	ts, frame = _snapshot_payload_cache
+	now = time.monotonic()
+	if not frame or now - ts > _SNAPSHOT_MAX_AGE:
+		snapshot = list(_broker_orders_cache.values())
+		frame = f"data: {_json_dumps({'type':'snapshot','orders':snapshot})}\n\n"
+		_snapshot_payload_cache = (now, frame)
+	return frame
+
+
+def _ensure_order_dispatcher() -> None:
+	global _order_dispatcher_started
+	if _order_dispatcher_started:
+		return
+	with _order_dispatcher_lock:
+		if not _order_dispatcher_started:
+			threading.Thread(target=_order_dispatcher, name="order_dispatcher", daemon=True).start()
+			_order_dispatcher_started = True
+
+
 def _ensure_order_listener():
 	"""Start Kite Ticker to listen for order updates and keep a local cache."""
 	try:
@@ -392,8 +826,9 @@ def _ensure_order_listener():
 			oid = str(data.get('order_id') or data.get('id') or '')
 			if not oid:
 				return
-			with _broker_orders_lock:
-				_broker_orders_cache[oid] = data
+			_upper_fields(data)
+			_broker_orders_cache[oid] = data
+			_trim_oldest(_broker_orders_cache, _BROKER_ORDERS_MAX)
 			# If this order update looks like a stop-loss / exit (SELL filled, or trigger by stop), record it
 			try:
 				otype = (data.get('transaction_type') or data.get('transactionType') or '').upper()
@@ -407,33 +842,25 @@ def _ensure_order_listener():
 			except Exception:
 				# don't let this break order handling
 				pass
-			# broadcast to SSE listeners
-			try:
-				msg = json.dumps({"type":"order_update","order":data})
-				for q in list(_order_event_queues):
-					try:
-						q.put_nowait(msg)
-					except Exception as e:
-						error_logger.debug("Failed to broadcast order update to queue: %s", e)
-			except Exception as e:
-				# swallow broadcast errors but log them
-				error_logger.warning("Error broadcasting order updates: %s", e)
+			# broadcast to SSE listeners from the dispatcher thread, so a slow
+			# subscriber can never stall the ticker callback; with no one
+			# connected there is nothing to encode at all
+			if _order_event_queues:
+				_order_dispatch_q.put(data)
 		except Exception as e:
 			error_logger.warning("Error in order event handler: %s", e)
 
 	def on_connect(params):
 		# On connect, prime cache with current orders once
 		try:
-			orders = kite.orders() or []
-			with _broker_orders_lock:
-				for o in orders:
-					oid = str(o.get('order_id') or '')
-					if oid:
-						_broker_orders_cache[oid] = o
+			orders = [_upper_fields(o) for o in (kite.orders() or [])]
+			_broker_orders_cache.update({str(o.get('order_id')): o for o in orders if o.get('order_id')})
+			_trim_oldest(_broker_orders_cache, _BROKER_ORDERS_MAX)
 		except Exception as e:
 			error_logger.error("orders() prime failed: %s", e)
 
 	try:
+		_ensure_order_dispatcher()
 		ticker.on_order_update = on_order_update
 		ticker.on_connect = on_connect
 		threading.Thread(target=ticker.connect, name="kite_order_listener", daemon=True).start()
@@ -445,28 +872,35 @@ def _ensure_order_listener():
 def sse_orders():
 	"""Server-Sent Events: stream order updates to clients."""
 	try:
-		import queue
-		q = queue.Queue(maxsize=1000)
-		_order_event_queues.append(q)
+		sub = (deque(maxlen=_SSE_QUEUE_MAX), threading.Event())
+		_order_event_queues.append(sub)
 		def gen():
-			# send a prime snapshot
-			with _broker_orders_lock:
-				snapshot = list(_broker_orders_cache.values())
+			buf, ev = sub
 			try:
-				yield f"data: {json.dumps({'type':'snapshot','orders':snapshot})}\n\n"
+				# send a prime snapshot
+				yield _snapshot_frame()
+				while True:
+					if not ev.wait(timeout=30):
+						# comment line keeps proxies open and surfaces dead clients
+						yield ": keepalive\n\n"
+						continue
+					ev.clear()
+					# coalesce a burst into one write: each event keeps its own
+					# `data:` frame, but they go out in a single chunk
+					while buf:
+						batch = []
+						while buf and len(batch) < _SSE_BATCH_MAX:
+							batch.append(buf.popleft())
+						yield "".join(batch)
+			except GeneratorExit:
+				pass
 			except Exception as e:
-				# if client disconnects early, stop
-				error_logger.debug("Client disconnected from SSE stream: %s", e)
-				return
-			while True:
+				error_logger.debug("Error in SSE generation: %s", e)
+			finally:
 				try:
-					msg = q.get()
-					yield f"data: {msg}\n\n"
-				except GeneratorExit:
-					break
-				except Exception as e:
-					error_logger.debug("Error in SSE generation: %s", e)
-					time.sleep(0.5)
+					_order_event_queues.remove(sub)
+				except ValueError:
+					pass
 		# Ensure listener
 		try:
 			_ensure_order_listener()
@@ -716,6 +1150,9 @@ def api_major_support():
 			error_logger.exception("/api/major-support GET failed: %s", e)
 			return jsonify({})
 
+_ACTIVE_ORDER_STATUSES = frozenset({"OPEN", "PENDING", "OPEN_PENDING", "TRIGGER_PENDING"})
+
+
 @app.get("/api/orderbook")
 def api_orderbook():
 	"""Return the active/open broker order book directly from Kite."""
@@ -723,18 +1160,23 @@ def api_orderbook():
 		kite = get_kite()
 		orders = []
 		try:
-			orders = kite.orders() or []
+			orders = _cached_orders(kite)
 		except Exception as oe:
 			error_logger.error("orders() failed: %s", oe)
 			orders = []
-		# Filter to active/open statuses
-		active_status = {"OPEN", "PENDING", "OPEN_PENDING", "TRIGGER_PENDING"}
-		active = [o for o in orders if (o.get('status') or '').upper() in active_status]
+		# Filter to active/open statuses (Kite already sends them upper-case)
+		active = [
+			o for o in orders
+			if (st := o.get('status')) and (st if st.isupper() else st.upper()) in _ACTIVE_ORDER_STATUSES
+		]
 		return jsonify({"count": len(active), "orders": active})
 	except Exception as e:
 		error_logger.exception("/api/orderbook failed: %s", e)
 		return jsonify({"error": str(e)}), 500
 
+# Upper bound on concurrent place_gtt calls from /api/gtt/recreate.
+_GTT_PLACE_WORKERS = 8
+
 @app.post("/api/gtt/recreate")
 def api_gtt_recreate():
 	"""Fetch current GTT orders then (re)place stop-loss GTTs per symbol.
@@ -754,10 +1196,10 @@ def api_gtt_recreate():
 		force = bool(payload.get('force', False))
 		sl_pct = float(payload.get('sl_pct', 0.05))
 		kite = get_kite()
-		# current gtt book
+		# current gtt book, fetched fresh: it decides what gets placed
 		gtts = []
 		try:
-			gtts = _fetch_gtts_with_timeout(kite, timeout=2.0) or []
+			gtts = _fetch_gtts_with_timeout(kite, timeout=2.0, max_age=0) or []
 		except Exception as ge:
 			error_logger.error("gtt() failed: %s", ge)
 			gtts = []
@@ -782,13 +1224,20 @@ def api_gtt_recreate():
 			data_map = {}
 		quote_map = {}
 		try:
-			quote_map = kite.quote([f"NSE:{s}" for s in symbols]) or {}
+			quote_map = _quote_get(kite, ["NSE:" + s for s in symbols])
 		except Exception as qe:
 			error_logger.error("quote() failed during gtt recreate: %s", qe)
 			quote_map = {}
-		inst_csv = os.path.join(REPO_ROOT, os.getenv('INSTRUMENTS_CSV', os.path.join('Csvs','instruments.csv')))
-		ticks = _load_tick_sizes(inst_csv)
+		ticks = _load_tick_sizes(_INSTRUMENTS_CSV_PATH)
+		# quantity per symbol from the order store, first record wins
+		qty_by_sym = {}
+		with _orders_lock:
+			for orec in _orders_store.values():
+				qty_by_sym.setdefault(orec.get('symbol'), orec.get('quantity'))
+		# Pass 1: resolve LTP/qty/existing GTTs per symbol. results keeps request
+		# order; entries still to be placed are collected in `plan`.
 		results = []
+		plan = []  # (results index, symbol, ltp, int qty)
 		for sym in symbols:
 			ltp = None
 			try:
@@ -812,43 +1261,68 @@ def api_gtt_recreate():
 							existing_sell_gtt_ids.append(g.get('id') or g.get('trigger_id'))
 				except Exception as e:
 					error_logger.debug("Silent exception ignored: %s", e)
-			placed = None
-			trigger_price = None
-			qty = None
-			# derive quantity from order store if possible
-			with _orders_lock:
-				for orec in _orders_store.values():
-					if orec.get('symbol') == sym:
-						qty = orec.get('quantity')
-						break
+			qty = qty_by_sym.get(sym)
 			if qty is None:
 				qty = 1  # fallback minimal
-			should_place = force or not existing_sell_gtt_ids
-			if should_place:
-				try:
-					# Place bracket OCO with target +7.5% and stop -sl_pct
-					placed_id = _place_bracket_oco_gtt(kite, sym, int(qty), ref_price=ltp, target_pct=0.075, sl_pct=sl_pct)
-					trigger_price = round(ltp * (1 - sl_pct), 2)
-					placed = placed_id
-					# update local order store gtt id if matching symbol without gtt
-					with _orders_lock:
-						for oid, orec in _orders_store.items():
-							if orec.get('symbol') == sym and not orec.get('gtt_id'):
-								orec['gtt_id'] = placed_id
-					# ensure trailing manager state (OCO bracket with target +7.5%)
-					_start_trailing(kite, sym, int(qty), sl_pct, ltp=ltp, tick=ticks.get(sym, 0.05), gtt_id=placed_id, gtt_type='oco', target_pct=0.075)
-				except Exception as pe:
-					results.append({"symbol": sym, "error": f"Place failed: {pe}"})
-					continue
+			try:
+				qty = int(qty)
+			except (TypeError, ValueError):
+				results.append({"symbol": sym, "error": f"Place failed: invalid quantity {qty!r}"})
+				continue
+			if force or not existing_sell_gtt_ids:
+				plan.append((len(results), sym, ltp, qty))
 			results.append({
 				"symbol": sym,
 				"ltp": ltp,
 				"existing_sell_gtt_ids": existing_sell_gtt_ids,
-				"new_gtt_id": placed,
+				"new_gtt_id": None,
 				"sl_pct": sl_pct,
-				"trigger_price": trigger_price,
+				"trigger_price": None,
 				"quantity": qty,
-				"action": "placed" if placed else "skipped"
+				"action": "skipped"
+			})
+		# Pass 2: price every bracket up front (stop -sl_pct, target +7.5%) so the
+		# placement loop below only talks to the broker.
+		tick_arr = [ticks.get(sym) or _fallback_tick_by_price(ltp) for _, sym, ltp, _ in plan]
+		prices = [
+			(_ceil_to_tick(ltp * (1 - sl_pct), tick), _ceil_to_tick(ltp * 1.075, tick), tick)
+			for (_, _, ltp, _), tick in zip(plan, tick_arr)
+		]
+		# Pass 3: place. Each place_gtt is an independent broker round-trip, so
+		# they are overlapped on a small pool (capped for Kite rate limits);
+		# local bookkeeping stays on this thread.
+		placed_by_idx = {}
+		if plan:
+			with ThreadPoolExecutor(max_workers=min(_GTT_PLACE_WORKERS, len(plan)), thread_name_prefix='gtt_place') as ex:
+				futures = {
+					# Place bracket OCO with target +7.5% and stop -sl_pct
+					ex.submit(_place_bracket_oco_gtt, kite, sym, qty, ltp, 0.075, sl_pct, px): idx
+					for (idx, sym, ltp, qty), px in zip(plan, prices)
+				}
+				for fut in as_completed(futures):
+					try:
+						placed_by_idx[futures[fut]] = (fut.result(), None)
+					except Exception as pe:
+						placed_by_idx[futures[fut]] = (None, pe)
+		for idx, sym, ltp, qty in plan:
+			placed_id, pe = placed_by_idx[idx]
+			try:
+				if pe is not None:
+					raise pe
+				# update local order store gtt id if matching symbol without gtt
+				with _orders_lock:
+					for oid, orec in _orders_store.items():
+						if orec.get('symbol') == sym and not orec.get('gtt_id'):
+							orec['gtt_id'] = placed_id
+				# ensure trailing manager state (OCO bracket with target +7.5%)
+				_start_trailing(kite, sym, qty, sl_pct, ltp=ltp, tick=ticks.get(sym, 0.05), gtt_id=placed_id, gtt_type='oco', target_pct=0.075)
+			except Exception as pe:
+				results[idx] = {"symbol": sym, "error": f"Place failed: {pe}"}
+				continue
+			results[idx].update({
+				"new_gtt_id": placed_id,
+				"trigger_price": round(ltp * (1 - sl_pct), 2),
+				"action": "placed" if placed_id else "skipped",
 			})
 		return jsonify({"count": len(results), "results": results})
 	except Exception as e:
@@ -900,8 +1374,7 @@ def api_start_trailing():
 			target_pct = max(0.02, min(target_pct, 0.50))  # Clamp between 2% and 50%
 		
 		# Get tick size for the symbol
-		inst_csv = os.path.join(REPO_ROOT, os.getenv('INSTRUMENTS_CSV', os.path.join('Csvs','instruments.csv')))
-		ticks = _load_tick_sizes(inst_csv)
+		ticks = _load_tick_sizes(_INSTRUMENTS_CSV_PATH)
 		tick = ticks.get(symbol) or _fallback_tick_by_price(ltp)
 		
 		# Start trailing - use stop_price as initial trigger so it knows where the GTT currently is
@@ -944,24 +1417,7 @@ def api_trades():
 			error_logger.error("gtt() failed: %s", ge)
 			gtts = []
 		# Minimal shape: return raw trades with a symbol-level gtt summary
-		gtt_summary = {}
-		for g in gtts:
-			try:
-				ts = g.get('tradingsymbol') or g.get('symbol')
-				if not ts:
-					continue
-				entry = gtt_summary.get(ts) or {"count": 0, "items": []}
-				entry["count"] += 1
-				entry["items"].append({
-					"id": g.get('id') or g.get('trigger_id'),
-					"status": g.get('status'),
-					"type": g.get('type') or g.get('trigger_type'),
-					"trigger_values": g.get('trigger_values') or [],
-					"orders": g.get('orders') or [],
-				})
-				gtt_summary[ts] = entry
-			except Exception as e:
-				error_logger.debug("Silent exception ignored: %s", e)
+		gtt_summary = {ts: {"count": len(items), "items": items} for ts, items in _group_gtts(gtts).items()}
 
 		# Also include historical trades from central trade_journal (Postgres) so
 		# the UI can display old trades and stats even when broker API doesn't
@@ -1105,37 +1561,33 @@ def api_holdings():
 			holdings = []
 		# Enrich with LTP and Holding PnL using latest prices
 		try:
-			# Build symbol list
-			symbols = [h.get('tradingsymbol') or h.get('symbol') for h in holdings if (h.get('tradingsymbol') or h.get('symbol'))]
-			# Prefer app's data service for LTP
+			# One symbol per holding (None when absent), reused by the enrichment pass
+			hold_syms = [h.get('tradingsymbol') or h.get('symbol') for h in holdings]
+			symbols = {s for s in hold_syms if s}
+			# Prefer app's data service for LTP; look up only the held symbols
 			ltp_map = {}
 			try:
-				data = fetch_ltp() or {}
-				for s, d in (data.get('data') or {}).items():
-					try:
-						lp = d.get('last_price')
-						if isinstance(lp, (int, float)):
-							ltp_map[s] = float(lp)
-					except Exception as e:
-						error_logger.debug("Silent exception ignored: %s", e)
+				ltp_data = (fetch_ltp() or {}).get('data') or {}
+				for s in symbols:
+					lp = (ltp_data.get(s) or {}).get('last_price')
+					if isinstance(lp, (int, float)):
+						ltp_map[s] = float(lp)
 			except Exception:
 				ltp_map = {}
-			# Fallback to broker quotes for any missing symbols
-			missing = [s for s in symbols if s not in ltp_map]
-			if missing:
+			# Fallback to broker quotes for any missing symbols, in one call
+			missing_keys = {"NSE:" + s: s for s in symbols if s not in ltp_map}
+			if missing_keys:
 				try:
-					qd = kite.quote([f"NSE:{s}" for s in missing]) or {}
-					for s in missing:
-						q = qd.get(f"NSE:{s}") or {}
-						lp = q.get('last_price')
+					qd = _quote_get(kite, missing_keys)
+					for key, s in missing_keys.items():
+						lp = (qd.get(key) or {}).get('last_price')
 						if isinstance(lp, (int, float)):
 							ltp_map[s] = float(lp)
 				except Exception as qe:
 					error_logger.error("quote() failed in /api/holdings LTP: %s", qe)
 			total_pnl = 0.0
-			for h in holdings:
+			for h, s in zip(holdings, hold_syms):
 				try:
-					s = h.get('tradingsymbol') or h.get('symbol')
 					# Use opening_quantity (includes T+1) or sum of quantity + t1_quantity
 					qty = h.get('opening_quantity')
 					if qty is None:
@@ -1177,6 +1629,24 @@ def api_holdings():
 		error_logger.exception("/api/holdings failed: %s", e)
 		return jsonify({"error": str(e)}), 500
 
+def _group_gtts(gtts) -> dict[str, list]:
+	"""Group a raw GTT list by tradingsymbol into compact summary items."""
+	grouped = defaultdict(list)
+	for g in gtts:
+		g_get = g.get
+		ts = g_get('tradingsymbol') or g_get('symbol')
+		if not ts:
+			continue
+		grouped[ts].append({
+			'id': g_get('id') or g_get('trigger_id'),
+			'status': g_get('status'),
+			'type': g_get('type') or g_get('trigger_type'),
+			'trigger_values': g_get('trigger_values') or [],
+			'orders': g_get('orders') or [],
+		})
+	return dict(grouped)
+
+
 @app.get("/api/gtt")
 def api_gtt_list():
 		"""Return current GTT (GTC) orders grouped by tradingsymbol."""
@@ -1189,22 +1659,9 @@ def api_gtt_list():
 			except Exception as ge:
 				error_logger.error("gtt() failed: %s", ge)
 				gtts = []
-			# group by tradingsymbol
-			grouped: dict[str, list] = {}
-			for g in gtts:
-				ts = g.get('tradingsymbol') or g.get('symbol')
-				if not ts:
-					continue
-				grouped.setdefault(ts, []).append({
-					'id': g.get('id') or g.get('trigger_id'),
-					'status': g.get('status'),
-					'type': g.get('type') or g.get('trigger_type'),
-					'trigger_values': g.get('trigger_values') or [],
-					'orders': g.get('orders') or [],
-				})
 			return jsonify({
 				'count': len(gtts),
-				'by_symbol': grouped,
+				'by_symbol': _group_gtts(gtts),
 				'items': gtts,
 			})
 		except Exception as e:
@@ -1443,44 +1900,89 @@ def health_check():
 			'timestamp': datetime.utcnow().isoformat() + 'Z',
 		}), 500
 
+# Column order for /export/ltp.csv (after the leading symbol column)
+_LTP_CSV_FIELDS = (
+	'last_price', 'last_close', 'sma200_15m', 'sma50_15m', 'ratio_15m_50_200',
+	'rank_gm', 'pct_vs_15m_sma50', 'pct_vs_daily_sma20', 'drawdown_15m_200_pct',
+	'days_since_golden_cross', 'daily_sma20', 'daily_sma50', 'daily_sma200',
+	'daily_ratio_50_200', 'volume_ratio_d5_d200',
+)
+_LTP_CSV_HEADER = ('symbol', 'last_price', 'last_close_15m') + _LTP_CSV_FIELDS[2:]
+
+
 @app.route("/export/ltp.csv")
 def export_ltp_csv():
 	try:
 		data = fetch_ltp()
-		rows = [
-			"symbol,last_price,last_close_15m,sma200_15m,sma50_15m,ratio_15m_50_200,rank_gm,pct_vs_15m_sma50,pct_vs_daily_sma20,drawdown_15m_200_pct,days_since_golden_cross,daily_sma20,daily_sma50,daily_sma200,daily_ratio_50_200,volume_ratio_d5_d200"
-		]
-		for sym, info in data.get("data", {}).items():
-			rows.append(
-				f"{sym},{info.get('last_price','')},{info.get('last_close','')},{info.get('sma200_15m','')},{info.get('sma50_15m','')},{info.get('ratio_15m_50_200','')},{info.get('rank_gm','')},{info.get('pct_vs_15m_sma50','')},{info.get('pct_vs_daily_sma20','')},{info.get('drawdown_15m_200_pct','')},{info.get('days_since_golden_cross','')},{info.get('daily_sma20','')},{info.get('daily_sma50','')},{info.get('daily_sma200','')},{info.get('volume_ratio_d5_d200','')}"
-			)
-		csv_content = "\n".join(rows) + "\n"
-		return Response(csv_content, mimetype="text/csv", headers={
+		items = data.get("data", {}).items()
+
+		def gen(chunk_rows=500):
+			buf = io.StringIO()
+			w = csv.writer(buf, lineterminator="\n")
+			w.writerow(_LTP_CSV_HEADER)
+			n = 0
+			for sym, info in items:
+				w.writerow([sym] + [info.get(k) for k in _LTP_CSV_FIELDS])
+				n += 1
+				if n % chunk_rows == 0:
+					yield buf.getvalue()
+					buf.seek(0)
+					buf.truncate()
+			yield buf.getvalue()
+
+		return Response(gen(), mimetype="text/csv", headers={
 			"Content-Disposition": "attachment; filename=ltp.csv"
 		})
 	except Exception as e:
 		error_logger.exception("/export/ltp.csv failed: %s", e)
 		return jsonify({"error": str(e)}), 500
 
+# Parsed tick sizes per CSV path, keyed on (mtime_ns, size) so an updated
+# instruments file is picked up without re-parsing it on every request.
+_TICKS_CACHE: dict[str, tuple[tuple[int, int], dict]] = {}
+_TICKS_CACHE_LOCK = threading.Lock()
+
+
 def _load_tick_sizes(csv_path: str) -> dict:
-	"""Load tick sizes from instruments CSV. Fallback to 0.05 when missing."""
-	result = {}
+	"""Load tick sizes from instruments CSV. Fallback to 0.05 when missing.
+
+	The returned dict is shared between callers; treat it as read-only.
+	"""
 	try:
-		import csv as _csv
-		if os.path.exists(csv_path):
+		st = os.stat(csv_path)
+	except OSError:
+		return {}
+	sig = (st.st_mtime_ns, st.st_size)
+	hit = _TICKS_CACHE.get(csv_path)
+	if hit and hit[0] == sig:
+		return hit[1]
+	with _TICKS_CACHE_LOCK:
+		hit = _TICKS_CACHE.get(csv_path)
+		if hit and hit[0] == sig:
+			return hit[1]
+		result = {}
+		try:
 			with open(csv_path, 'r', newline='', encoding='utf-8') as f:
-				reader = _csv.DictReader(f)
-				for row in reader:
-					ts = row.get('tradingsymbol')
-					tick = row.get('tick_size') or row.get('tick')
-					if ts and tick:
+				reader = csv.reader(f)
+				header = next(reader, [])
+				sym_i = header.index('tradingsymbol') if 'tradingsymbol' in header else None
+				tick_cols = [header.index(c) for c in ('tick_size', 'tick') if c in header]
+				if sym_i is not None and tick_cols:
+					for row in reader:
 						try:
-							result[ts] = float(tick)
-						except Exception as e:
-							error_logger.debug("Silent exception ignored: %s", e)
-	except Exception as e:
-		error_logger.debug("Silent exception ignored: %s", e)
-	return result
+							ts = row[sym_i]
+							tick = next((row[i] for i in tick_cols if row[i]), None)
+						except IndexError:
+							continue
+						if ts and tick:
+							try:
+								result[ts] = float(tick)
+							except Exception as e:
+								error_logger.debug("Silent exception ignored: %s", e)
+		except Exception as e:
+			error_logger.debug("Silent exception ignored: %s", e)
+		_TICKS_CACHE[csv_path] = (sig, result)
+		return result
 
 def _round_to_tick(price: float, tick: float) -> float:
 	if not tick:
@@ -1495,8 +1997,7 @@ def _ceil_to_tick(price: float, tick: float) -> float:
 	above any previous value (avoid placing a trigger that the exchange will
 	snap down to the previous tick and immediately fire).
 	"""
-	try:	
-		import math
+	try:
 		if not tick or tick <= 0:
 			tick = 0.05
 		return round(math.ceil(float(price) / float(tick)) * float(tick), 2)
@@ -1527,8 +2028,7 @@ def _place_sl_gtt(kite, symbol: str, qty: int, ref_price: float, sl_pct: float =
 	if not hasattr(kite, 'place_gtt'):
 		raise RuntimeError('GTT not supported by current Kite client')
 	# Ensure trigger and limit adhere to instrument tick size
-	inst_csv = os.path.join(REPO_ROOT, os.getenv('INSTRUMENTS_CSV', os.path.join('Csvs','instruments.csv')))
-	ticks = _load_tick_sizes(inst_csv)
+	ticks = _load_tick_sizes(_INSTRUMENTS_CSV_PATH)
 	tick = ticks.get(symbol)
 	if not tick:
 		tick = _fallback_tick_by_price(ref_price)
@@ -1551,27 +2051,31 @@ def _place_sl_gtt(kite, symbol: str, qty: int, ref_price: float, sl_pct: float =
 			"price": limit,
 		}]
 	)
+	_invalidate_gtt_cache()
 	return resp.get('trigger_id') or resp.get('id')
 
-def _place_bracket_oco_gtt(kite, symbol: str, qty: int, ref_price: float, target_pct: float = 0.075, sl_pct: float = 0.05):
+def _place_bracket_oco_gtt(kite, symbol: str, qty: int, ref_price: float, target_pct: float = 0.075, sl_pct: float = 0.05, prices: tuple | None = None):
 	"""Place a two-leg OCO GTT: profit target (SELL LIMIT) and stop-loss (SELL LIMIT).
 
 	Target at +target_pct above ref_price; Stop at -sl_pct below ref_price.
-	Prices are snapped to instrument tick size.
+	Prices are snapped to instrument tick size. Batch callers may pass
+	precomputed `prices` as (stop_px, target_px, tick).
 	Returns GTT ID.
 	"""
 	if not hasattr(kite, 'place_gtt'):
 		raise RuntimeError('GTT not supported by current Kite client')
-	inst_csv = os.path.join(REPO_ROOT, os.getenv('INSTRUMENTS_CSV', os.path.join('Csvs','instruments.csv')))
-	ticks = _load_tick_sizes(inst_csv)
-	tick = ticks.get(symbol) or _fallback_tick_by_price(ref_price)
-	# Use ceil rounding for trigger values so they are never below the exact
-	# computed level. This avoids cases where a computed trigger like 62.35125
-	# would be rounded down to 62.35 (invalid for tick 0.01) and immediately
-	# trigger at current LTP. Order execution prices may still be rounded to
-	# the nearest tick using _round_to_tick where appropriate.
-	target_px = _ceil_to_tick(ref_price * (1 + target_pct), tick)
-	stop_px = _ceil_to_tick(ref_price * (1 - sl_pct), tick)
+	if prices is not None:
+		stop_px, target_px, tick = prices
+	else:
+		ticks = _load_tick_sizes(_INSTRUMENTS_CSV_PATH)
+		tick = ticks.get(symbol) or _fallback_tick_by_price(ref_price)
+		# Use ceil rounding for trigger values so they are never below the exact
+		# computed level. This avoids cases where a computed trigger like 62.35125
+		# would be rounded down to 62.35 (invalid for tick 0.01) and immediately
+		# trigger at current LTP. Order execution prices may still be rounded to
+		# the nearest tick using _round_to_tick where appropriate.
+		target_px = _ceil_to_tick(ref_price * (1 + target_pct), tick)
+		stop_px = _ceil_to_tick(ref_price * (1 - sl_pct), tick)
 	if target_px <= 0 or stop_px <= 0:
 		raise ValueError('Computed GTT prices invalid')
 	resp = kite.place_gtt(
@@ -1599,6 +2103,7 @@ def _place_bracket_oco_gtt(kite, symbol: str, qty: int, ref_price: float, target
 			},
 		]
 	)
+	_invalidate_gtt_cache()
 	return resp.get('trigger_id') or resp.get('id')
 
 
@@ -1635,7 +2140,75 @@ def _extract_trigger_id(raw):
 # Now keyed by gtt_id to support multiple GTTs per symbol
 _trail_lock = None
 _trail_state = {}  # key: gtt_id, value: {symbol, qty, sl_pct, tick, trigger, gtt_type, target_pct}
+# (unique symbols, "NSE:" quote keys, symbol -> states) derived from
+# _trail_state, see _trail_index(); reset to None whenever _trail_state gains
+# or loses an entry.
+_trail_symbols_cache: tuple[list[str], list[str], dict[str, list[dict]]] | None = None
 _trail_thread_started = False
+# Set when trailing state changes so the worker runs a pass now instead of
+# waiting out its 30s interval.
+_trail_wake = threading.Event()
+# NSE cash session (IST, Mon-Fri, minus exchange holidays); the trailer idles
+# outside it.
+_IST = ZoneInfo("Asia/Kolkata")
+_MARKET_OPEN = dt_time(9, 15)
+_MARKET_CLOSE = dt_time(15, 30)
+# Longest single idle wait; the worker re-checks the clock after each one.
+_MARKET_IDLE_MAX_WAIT = 3600.0
+
+
+def _load_market_holidays() -> frozenset[date]:
+	"""Exchange closed dates from MARKET_HOLIDAYS_CSV and MARKET_HOLIDAYS.
+
+	The CSV (default Csvs/nse_holidays.csv, optional) holds one YYYY-MM-DD
+	date in the first column per row; MARKET_HOLIDAYS is a comma-separated
+	list of the same. Unparseable entries (e.g. a header row) are skipped.
+	"""
+	raw = os.getenv('MARKET_HOLIDAYS', '').split(',')
+	path = os.path.join(REPO_ROOT, os.getenv('MARKET_HOLIDAYS_CSV', os.path.join('Csvs', 'nse_holidays.csv')))
+	try:
+		with open(path, newline='') as f:
+			raw.extend(row[0] for row in csv.reader(f) if row)
+	except OSError:
+		pass
+	holidays = set()
+	for value in raw:
+		try:
+			holidays.add(date.fromisoformat(value.strip()))
+		except ValueError:
+			continue
+	return frozenset(holidays)
+
+
+# Resolved once at import, like _INSTRUMENTS_CSV_PATH.
+_MARKET_HOLIDAYS = _load_market_holidays()
+
+
+def _trading_day(day: date) -> bool:
+	return day.weekday() < 5 and day not in _MARKET_HOLIDAYS
+
+
+def _market_open(now: datetime | None = None) -> bool:
+	"""True during NSE trading hours (09:15-15:30 IST on trading days)."""
+	now = now or datetime.now(_IST)
+	return _trading_day(now.date()) and _MARKET_OPEN <= now.time() <= _MARKET_CLOSE
+
+
+def _seconds_until_market_open(now: datetime | None = None) -> float:
+	"""Seconds until the next session opens; 0 while the market is open."""
+	now = now or datetime.now(_IST)
+	if _market_open(now):
+		return 0.0
+	day = now.date()
+	if now.time() > _MARKET_CLOSE or not _trading_day(day):
+		day += timedelta(days=1)
+	# a year of closed days is a broken holiday list, not a calendar
+	for _ in range(366):
+		if _trading_day(day):
+			break
+		day += timedelta(days=1)
+	opens = datetime.combine(day, _MARKET_OPEN, tzinfo=now.tzinfo or _IST)
+	return max(0.0, (opens - now).total_seconds())
 
 def _trail_lock_obj():
 	global _trail_lock
@@ -1645,6 +2218,22 @@ def _trail_lock_obj():
 	return _trail_lock
 
 
+def _trail_index() -> tuple[list[str], list[str], dict[str, list[dict]]]:
+	"""Return _trail_symbols_cache, rebuilding it if _trail_state changed shape.
+
+	Caller must hold _trail_lock_obj().
+	"""
+	global _trail_symbols_cache
+	if _trail_symbols_cache is None:
+		by_symbol: dict[str, list[dict]] = defaultdict(list)
+		for st in _trail_state.values():
+			if st.get('symbol'):
+				by_symbol[st['symbol']].append(st)
+		symbols = list(by_symbol)
+		_trail_symbols_cache = (symbols, ["NSE:" + s for s in symbols], dict(by_symbol))
+	return _trail_symbols_cache
+
+
 def _start_trailing(kite, symbol: str, qty: int, sl_pct: float, ltp: float = None, tick: float = None, gtt_id=None, gtt_type: str = 'single', target_pct: float = None, initial_trigger: float = None):
 	"""Register trailing state for a GTT and ensure the worker thread is running.
 
@@ -1667,7 +2256,6 @@ def _start_trailing(kite, symbol: str, qty: int, sl_pct: float, ltp: float = Non
 	# normalize gtt id to a scalar/key; if missing, generate a local synthetic id
 	key = _extract_trigger_id(gtt_id)
 	if key is None:
-		import time
 		key = f"local:{symbol}:{int(time.time()*1000)}"
 
 	# compute an initial trigger if provided, else derive from ltp and TRAIL_THRESHOLD
@@ -1693,6 +2281,7 @@ def _start_trailing(kite, symbol: str, qty: int, sl_pct: float, ltp: float = Non
 		'target_pct': float(target_pct) if target_pct is not None else None,
 		'initial_target': None,
 		'db_stop': None,
+		'registered': time.monotonic(),
 	}
 
 	# persist initial_target when available for OCO
@@ -1704,8 +2293,10 @@ def _start_trailing(kite, symbol: str, qty: int, sl_pct: float, ltp: float = Non
 		st['initial_target'] = None
 
 	# Register in global state atomically
+	global _trail_symbols_cache
 	try:
 		with _trail_lock_obj():
+			_trail_symbols_cache = None
 			existing = _trail_state.get(str(key))
 			if existing:
 				# merge/refresh existing fields
@@ -1716,6 +2307,8 @@ def _start_trailing(kite, symbol: str, qty: int, sl_pct: float, ltp: float = Non
 	except Exception:
 		# last-resort: set without lock
 		_trail_state[str(key)] = st
+		_trail_symbols_cache = None
+	_trail_wake.set()
 
 	try:
 		trail_logger.info("TRAIL_STARTED symbol=%s gtt_id=%s qty=%d sl_pct=%.3f ltp=%s type=%s", symbol, key, qty, sl_pct, (ltp if ltp is not None else 'NA'), gtt_type)
@@ -1730,6 +2323,37 @@ def _start_trailing(kite, symbol: str, qty: int, sl_pct: float, ltp: float = Non
 		# the worker will be started when possible elsewhere.
 		pass
 
+# Fetch time of the GTT book the last prune ran against.
+_trail_pruned_book_ts = 0.0
+
+
+def _prune_trail_state() -> None:
+	"""Drop trailing entries whose GTT is no longer in the broker's book.
+
+	Runs against the cached book only, and only once per new book: the
+	refresher is woken when it is stale instead of fetching here. Entries
+	registered at or after the book's fetch time are not checked, so a GTT
+	placed after that fetch is not dropped. Local synthetic ids and an empty
+	book (e.g. a failed fetch) are left alone.
+	"""
+	global _trail_symbols_cache, _trail_pruned_book_ts
+	book, book_ts = _gtt_cache_snapshot()
+	if not book_ts or time.monotonic() - book_ts >= _GTT_TTL:
+		_ensure_gtt_refresher()
+		_gtt_refresh_event.set()
+	if not book or not book_ts or book_ts == _trail_pruned_book_ts:
+		return
+	_trail_pruned_book_ts = book_ts
+	live = {str(g.get('id') or g.get('trigger_id')) for g in book}
+	with _trail_lock_obj():
+		for key, st in list(_trail_state.items()):
+			if str(key).startswith('local:') or st.get('registered', 0) >= book_ts:
+				continue
+			if str(_extract_trigger_id(st.get('gtt_id'))) not in live:
+				_trail_state.pop(key, None)
+				_trail_symbols_cache = None
+				trail_logger.info("TRAIL_PRUNE symbol=%s gtt_id=%s (not in GTT book)", st.get('symbol'), st.get('gtt_id'))
+
 def _ensure_trailer_thread(kite):
 	"""Starts a background thread that raises SL GTT as price rises (no server-side trailing)."""
 	global _trail_thread_started
@@ -1772,8 +2396,7 @@ def _ensure_trailer_thread(kite):
 						qty = int(o.get('quantity') or qty or 0)
 				# pick tick for symbol
 				try:
-					inst_csv = os.path.join(REPO_ROOT, os.getenv('INSTRUMENTS_CSV', os.path.join('Csvs','instruments.csv')))
-					ticks = _load_tick_sizes(inst_csv)
+					ticks = _load_tick_sizes(_INSTRUMENTS_CSV_PATH)
 					tick = ticks.get(sym) or _fallback_tick_by_price(last_price)
 				except Exception:
 					tick = 0.05
@@ -1795,18 +2418,35 @@ def _ensure_trailer_thread(kite):
 
 	def worker():
 		while True:
+			# checked once per pass so per-symbol debug args are only built when
+			# debug logging is actually on
+			trail_debug = trail_logger.isEnabledFor(logging.DEBUG)
+			idle = _seconds_until_market_open()
+			if idle > 0:
+				# no price moves to trail; skip the quote/GTT fan-out entirely
+				# and sleep through to the next open (capped, then re-checked)
+				_trail_wake.wait(timeout=min(idle, _MARKET_IDLE_MAX_WAIT))
+				_trail_wake.clear()
+				continue
 			try:
+				if _trail_state:
+					try:
+						_prune_trail_state()
+					except Exception as e:
+						error_logger.debug("Trailing prune failed: %s", e)
 				with _trail_lock_obj():
 					items = list(_trail_state.items())  # items: [(gtt_id, state_dict), ...]
+					# Batch quote request - unique symbols from all tracked GTTs
+					cached = _trail_index() if items else None
 				if not items:
-					time.sleep(30)
+					# idle until _start_trailing registers something
+					_trail_wake.wait(timeout=30)
+					_trail_wake.clear()
 					continue
-				# Batch quote request - get unique symbols from all tracked GTTs
-				symbols_to_quote = list(set(st.get('symbol') for _, st in items if st.get('symbol')))
-				syms = [f"NSE:{s}" for s in symbols_to_quote]
+				symbols_to_quote, syms, _ = cached
 				qd = {}
 				try:
-					qd = kite.quote(syms) or {}
+					qd = _quote_get(kite, syms)
 				except Exception as e:
 					trail_logger.error("TRAIL_QUOTE_FAIL %s", e)
 					time.sleep(30)
@@ -1842,7 +2482,8 @@ def _ensure_trailer_thread(kite):
 						# Use ceil rounding so initial trigger is never rounded down by exchange
 						# and accidentally equal to current LTP.
 						new_trig = _ceil_to_tick(ltp * (1 - TRAIL_THRESHOLD), st['tick'])
-						st['trigger'] = new_trig
+						with _trail_lock_obj():
+							st['trigger'] = new_trig
 						continue
 
 					# If strategy wrote an exact stop to DB, prefer that when it raises the current trigger
@@ -1854,20 +2495,22 @@ def _ensure_trailer_thread(kite):
 							db_stop = None
 
 					candidate_new_trig = None
+					current_gap_pct = (ltp - current_trigger) / ltp
 					if db_stop and db_stop > current_trigger:
 						# honor strategy's stop (rounded to tick)
 						# Use ceil to ensure trigger is not rounded down by tick snapping at broker
 						candidate_new_trig = _ceil_to_tick(db_stop, st['tick'])
-						trail_logger.debug("TRAIL_DB_USE symbol=%s gtt_id=%s db_stop=%.2f current_stop=%.2f", sym, gtt_id, db_stop, current_trigger or 0.0)
+						if trail_debug:
+							trail_logger.debug("TRAIL_DB_USE symbol=%s gtt_id=%s db_stop=%.2f current_stop=%.2f", sym, gtt_id, db_stop, current_trigger or 0.0)
 					else:
 						# Fallback: compute based on LTP and configured threshold
-						current_gap_pct = (ltp - current_trigger) / ltp
 						# Only skip when the gap is strictly smaller than the configured threshold.
 						# Treat equality as a trigger to raise the stop so a move equal to
 						# TRAIL_THRESHOLD (e.g. 0.001 == 0.1%) will update the GTT.
 						if current_gap_pct < TRAIL_THRESHOLD:
-							trail_logger.debug("TRAIL_SKIP symbol=%s gtt_id=%s ltp=%.2f current_stop=%.2f gap=%.3f threshold=%.3f", 
-												sym, gtt_id, ltp, current_trigger or 0.0, current_gap_pct, TRAIL_THRESHOLD)
+							if trail_debug:
+								trail_logger.debug("TRAIL_SKIP symbol=%s gtt_id=%s ltp=%.2f current_stop=%.2f gap=%.3f threshold=%.3f", 
+													sym, gtt_id, ltp, current_trigger or 0.0, current_gap_pct, TRAIL_THRESHOLD)
 							continue
 						# Raise using ceil rounding to ensure broker tick snapping doesn't
 					# reduce the trigger below the intended level.
@@ -1887,8 +2530,9 @@ def _ensure_trailer_thread(kite):
 					try:
 						gtt_type = st.get('gtt_type', 'single')  # default to single for backward compat
 						# Diagnostic log: show state and available kite methods
-						trail_logger.debug("TRAIL_DECIDE symbol=%s gtt_id=%s has_modify=%s gtt_type=%s current_stop=%.2f new_stop=%.2f gap=%.2f ltp=%.2f st=%s",
-								sym, st.get('gtt_id'), hasattr(kite, 'modify_gtt'), gtt_type, current_trigger, new_trig, current_gap_pct*100, ltp, {k: st.get(k) for k in ('qty','sl_pct','initial_target','target_pct')})
+						if trail_debug:
+							trail_logger.debug("TRAIL_DECIDE symbol=%s gtt_id=%s has_modify=%s gtt_type=%s current_stop=%.2f new_stop=%.2f gap=%.2f ltp=%.2f st=%s",
+									sym, st.get('gtt_id'), hasattr(kite, 'modify_gtt'), gtt_type, current_trigger, new_trig, current_gap_pct*100, ltp, {k: st.get(k) for k in ('qty','sl_pct','initial_target','target_pct')})
 						# Normalize gtt id and attempt modify; fall back to replace if modify not supported or fails
 						normalized_id = _extract_trigger_id(st.get('gtt_id'))
 						if hasattr(kite, 'modify_gtt') and normalized_id:
@@ -1904,7 +2548,7 @@ def _ensure_trailer_thread(kite):
 									trigger_type=kite.GTT_TYPE_OCO,
 									tradingsymbol=sym,
 									exchange='NSE',
-										trigger_values=[new_trig, new_target],
+									trigger_values=[new_trig, new_target],
 									last_price=ltp,
 									orders=[
 										{
@@ -1912,23 +2556,25 @@ def _ensure_trailer_thread(kite):
 											"quantity": st['qty'],
 											"product": kite.PRODUCT_CNC,
 											"order_type": kite.ORDER_TYPE_LIMIT,
-												"price": _round_to_tick(new_trig, st['tick']),
+											"price": _round_to_tick(new_trig, st['tick']),
 										},
 										{
 											"transaction_type": kite.TRANSACTION_TYPE_SELL,
 											"quantity": st['qty'],
 											"product": kite.PRODUCT_CNC,
 											"order_type": kite.ORDER_TYPE_LIMIT,
-												"price": _round_to_tick(new_target, st['tick']),
+											"price": _round_to_tick(new_target, st['tick']),
 										},
 									]
 								)
+								_invalidate_gtt_cache()
 								trail_logger.info("TRAIL_MODIFY_OCO symbol=%s gtt_id=%s stop=%.2f target=%.2f (fixed)", sym, st.get('gtt_id'), new_trig, new_target)
-								trail_logger.debug("TRAIL_MODIFY_RESP symbol=%s gtt_id=%s resp=%s", sym, st.get('gtt_id'), str(resp))
+								if trail_debug:
+									trail_logger.debug("TRAIL_MODIFY_RESP symbol=%s gtt_id=%s resp=%s", sym, st.get('gtt_id'), resp)
 								# Post-modify verification: ensure broker shows the new trigger value.
 								try:
 									found = False
-									gtts_now = _fetch_gtts_with_timeout(kite, timeout=2.0) or []
+									gtts_now = _fetch_gtts_with_timeout(kite, timeout=2.0, max_age=0) or []
 									for gg in gtts_now:
 										gid = _extract_trigger_id(gg.get('id') or gg.get('trigger_id') or gg)
 										if str(gid) == str(normalized_id):
@@ -1941,12 +2587,14 @@ def _ensure_trailer_thread(kite):
 										if normalized_id and hasattr(kite, 'delete_gtt'):
 											try:
 												kite.delete_gtt(normalized_id)
+												_invalidate_gtt_cache()
 											except Exception:
 												pass
 										new_id = _place_sl_gtt(kite, sym, st['qty'], ref_price=ltp, sl_pct=st['sl_pct'])
 										with _trail_lock_obj():
 											st['gtt_id'] = new_id
 											st['trigger'] = new_trig
+											st['registered'] = time.monotonic()
 								except Exception:
 									# ignore verification errors - we've already updated local state
 									pass
@@ -1967,12 +2615,14 @@ def _ensure_trailer_thread(kite):
 										"price": _round_to_tick(new_trig, st['tick']),
 									}]
 								)
+								_invalidate_gtt_cache()
 								trail_logger.info("TRAIL_MODIFY symbol=%s gtt_id=%s trigger=%.2f", sym, st.get('gtt_id'), new_trig)
-								trail_logger.debug("TRAIL_MODIFY_RESP symbol=%s gtt_id=%s resp=%s", sym, st.get('gtt_id'), str(resp))
+								if trail_debug:
+									trail_logger.debug("TRAIL_MODIFY_RESP symbol=%s gtt_id=%s resp=%s", sym, st.get('gtt_id'), resp)
 								# Post-modify verification for single-leg as well
 								try:
 									found = False
-									gtts_now = _fetch_gtts_with_timeout(kite, timeout=2.0) or []
+									gtts_now = _fetch_gtts_with_timeout(kite, timeout=2.0, max_age=0) or []
 									for gg in gtts_now:
 										gid = _extract_trigger_id(gg.get('id') or gg.get('trigger_id') or gg)
 										if str(gid) == str(normalized_id):
@@ -1984,20 +2634,25 @@ def _ensure_trailer_thread(kite):
 										if normalized_id and hasattr(kite, 'delete_gtt'):
 											try:
 												kite.delete_gtt(normalized_id)
+												_invalidate_gtt_cache()
 											except Exception:
 												pass
 										new_id = _place_sl_gtt(kite, sym, st['qty'], ref_price=ltp, sl_pct=st['sl_pct'])
 										with _trail_lock_obj():
 											st['gtt_id'] = new_id
 											st['trigger'] = new_trig
+											st['registered'] = time.monotonic()
 								except Exception:
 									pass
 							# Update local state from response when possible
 							try:
 								new_id = _extract_trigger_id(resp.get('trigger_id') or resp.get('id') if isinstance(resp, dict) else resp)
 								with _trail_lock_obj():
-									if new_id:
+									# skip if verification above already replaced the GTT
+									cur_id = _extract_trigger_id(st.get('gtt_id'))
+									if new_id and str(cur_id) == str(normalized_id) and str(new_id) != str(cur_id):
 										st['gtt_id'] = new_id
+										st['registered'] = time.monotonic()
 									st['trigger'] = new_trig
 							except Exception:
 								with _trail_lock_obj():
@@ -2007,6 +2662,7 @@ def _ensure_trailer_thread(kite):
 							if normalized_id and hasattr(kite, 'delete_gtt'):
 								try:
 									kite.delete_gtt(normalized_id)
+									_invalidate_gtt_cache()
 								except Exception as e:
 									error_logger.debug("Silent exception ignored: %s", e)
 							new_id = _place_sl_gtt(kite, sym, st['qty'], ref_price=ltp, sl_pct=st['sl_pct'])
@@ -2015,10 +2671,12 @@ def _ensure_trailer_thread(kite):
 								st['gtt_id'] = new_id
 								st['trigger'] = new_trig
 								st['gtt_type'] = 'single'  # replaced with single-leg
+								st['registered'] = time.monotonic()
 							trail_logger.info("TRAIL_REPLACE symbol=%s gtt_id=%s trigger=%.2f", sym, new_id, new_trig)
 					except Exception as e:
 						trail_logger.error("TRAIL_UPDATE_FAIL symbol=%s err=%s", sym, e)
-				time.sleep(30)
+				_trail_wake.wait(timeout=30)
+				_trail_wake.clear()
 			except Exception as e:
 				trail_logger.exception("TRAIL_LOOP_ERR %s", e)
 				time.sleep(30)
@@ -2066,8 +2724,7 @@ def _ensure_trailer_thread(kite):
 								if st is None:
 									# determine tick for symbol
 									try:
-										inst_csv = os.path.join(REPO_ROOT, os.getenv('INSTRUMENTS_CSV', os.path.join('Csvs','instruments.csv')))
-										ticks = _load_tick_sizes(inst_csv)
+										ticks = _load_tick_sizes(_INSTRUMENTS_CSV_PATH)
 										tick = ticks.get(symbol) or _fallback_tick_by_price(stop or 0)
 									except Exception:
 										tick = 0.05
@@ -2099,6 +2756,48 @@ def _ensure_trailer_thread(kite):
 	except Exception:
 		error_logger.debug("Failed to start DB sync for trailing", exc_info=True)
 
+def _cancel_trade_gtt(cur, conn, entry_id, gtt_to_cancel, symbol):
+	"""Cancel the GTT attached to a closed journal row and clear local references to it."""
+	global _trail_symbols_cache
+	kite = get_kite()
+	normalized = None
+	try:
+		normalized = _extract_trigger_id(gtt_to_cancel)
+	except Exception:
+		normalized = gtt_to_cancel
+	# Attempt delete/cancel only for this specific trigger id
+	try:
+		if hasattr(kite, 'delete_gtt'):
+			kite.delete_gtt(normalized)
+			_invalidate_gtt_cache()
+		elif hasattr(kite, 'cancel_gtt'):
+			kite.cancel_gtt(normalized)
+			_invalidate_gtt_cache()
+		# Cleanup any cached references to this single gtt id
+		try:
+			_drop_gtt_from_cache(normalized)
+		except Exception as e:
+			error_logger.debug("Silent exception ignored while cleaning _gtt_cache: %s", e)
+		# Remove from in-memory trail state only the entries that reference this trigger id
+		try:
+			with _trail_lock_obj():
+				for key in list(_trail_state.keys()):
+					st = _trail_state.get(key)
+					if st and str(_extract_trigger_id(st.get('gtt_id'))) == str(normalized):
+						_trail_state.pop(key, None)
+						_trail_symbols_cache = None
+		except Exception as e:
+			error_logger.debug("Silent exception ignored while cleaning _trail_state: %s", e)
+		# Persist clearing the gtt_id in DB so sync won't re-register it
+		try:
+			cur.execute("UPDATE trade_journal SET gtt_id = NULL WHERE id = %s", (entry_id,))
+			conn.commit()
+		except Exception as e:
+			error_logger.debug("Failed to persist clear gtt_id for trade %s: %s", entry_id, e)
+		order_logger.info("Auto-cancelled GTT %s for symbol %s after exit", normalized, symbol)
+	except Exception as ce:
+		order_logger.warning("Failed to auto-cancel GTT %s: %s", gtt_to_cancel, ce)
+
 def _log_trade_exit(order_id, symbol, exit_price, exit_qty, exit_type='completed'):
 	"""Automatically log a trade exit when order is completed or GTT triggered."""
 	from datetime import datetime
@@ -2166,53 +2865,100 @@ def _log_trade_exit(order_id, symbol, exit_price, exit_qty, exit_type='completed
 					except Exception:
 						gtt_to_cancel = None
 				if gtt_to_cancel:
-					kite = get_kite()
-					normalized = None
-					try:
-						normalized = _extract_trigger_id(gtt_to_cancel)
-					except Exception:
-						normalized = gtt_to_cancel
-					# Attempt delete/cancel only for this specific trigger id
-					try:
-						if hasattr(kite, 'delete_gtt'):
-							kite.delete_gtt(normalized)
-						elif hasattr(kite, 'cancel_gtt'):
-							kite.cancel_gtt(normalized)
-						# Cleanup any cached references to this single gtt id
-						try:
-							with _broker_orders_lock:
-								for k, arr in list(_gtt_cache.items()):
-									newarr = [g for g in arr if str(g.get('id') or g.get('trigger_id')) != str(normalized)]
-									if newarr:
-										_gtt_cache[k] = newarr
-									else:
-										_gtt_cache.pop(k, None)
-						except Exception as e:
-							error_logger.debug("Silent exception ignored while cleaning _gtt_cache: %s", e)
-						# Remove from in-memory trail state only the entries that reference this trigger id
-						try:
-							with _trail_lock_obj():
-								for key in list(_trail_state.keys()):
-									st = _trail_state.get(key)
-									if st and str(_extract_trigger_id(st.get('gtt_id'))) == str(normalized):
-										_trail_state.pop(key, None)
-						except Exception as e:
-							error_logger.debug("Silent exception ignored while cleaning _trail_state: %s", e)
-						# Persist clearing the gtt_id in DB so sync won't re-register it
-						try:
-							cur.execute("UPDATE trade_journal SET gtt_id = NULL WHERE id = %s", (entry_id,))
-							conn.commit()
-						except Exception as e:
-							error_logger.debug("Failed to persist clear gtt_id for trade %s: %s", entry_id, e)
-						order_logger.info("Auto-cancelled GTT %s for symbol %s after exit", normalized, symbol)
-					except Exception as ce:
-						order_logger.warning("Failed to auto-cancel GTT %s: %s", gtt_to_cancel, ce)
+					_cancel_trade_gtt(cur, conn, entry_id, gtt_to_cancel, symbol)
 			except Exception as e:
 				error_logger.debug("Silent exception cancelling GTT on exit: %s", e)
 	except Exception as e:
 		order_logger.error("Failed to log trade exit: %s", e)
 		# Don't raise - exit logging should not block main flow
 
+def _log_trade_exits_batch(exits, exit_type='synced') -> int:
+	"""Log several trade exits with one SELECT and one bulk UPDATE.
+
+	`exits` is a list of (order_id, symbol, exit_price, exit_qty). Mirrors
+	_log_trade_exit's PnL/duration math and GTT cleanup. Returns rows updated.
+	"""
+	from datetime import datetime
+	from pgAdmin_database.db_connection import pg_cursor
+	from psycopg2.extras import execute_values
+
+	if not exits:
+		return 0
+	by_order = {}
+	for oid, sym, px, q in exits:
+		try:
+			by_order[str(oid)] = (sym, float(px), int(q))
+		except Exception as e:
+			order_logger.error("Failed to log trade exit: order_id=%s %s", oid, e)
+	if not by_order:
+		return 0
+	exit_dt = datetime.utcnow()
+	timestamp = exit_dt.isoformat()
+	notes = f'Auto-logged exit ({exit_type})'
+	with pg_cursor() as (cur, conn):
+		cur.execute("""
+			SELECT id, order_id, entry_price, entry_date FROM trade_journal
+			WHERE order_id = ANY(%s) AND status = 'open'
+			ORDER BY id
+		""", (list(by_order.keys()),))
+		rows = []
+		symbol_by_id = {}
+		seen = set()
+		for entry_id, order_id, entry_price, entry_date in cur.fetchall():
+			# Like _log_trade_exit, close only one open row per order_id
+			if order_id in seen:
+				continue
+			seen.add(order_id)
+			# a bad row (e.g. NULL entry_price) skips that trade, not the batch
+			try:
+				symbol, exit_price, exit_qty = by_order[str(order_id)]
+				entry_price = float(entry_price)
+				pnl = (exit_price - entry_price) * exit_qty
+				pnl_pct = ((exit_price - entry_price) / entry_price * 100) if entry_price > 0 else 0
+				duration_hours = None
+				if entry_date:
+					entry_dt = datetime.fromisoformat(entry_date) if isinstance(entry_date, str) else entry_date
+					duration_hours = (exit_dt - entry_dt).total_seconds() / 3600
+			except Exception as e:
+				order_logger.error("Failed to log trade exit: order_id=%s %s", order_id, e)
+				continue
+			rows.append((entry_id, timestamp, exit_price, pnl, pnl_pct, duration_hours, notes))
+			symbol_by_id[entry_id] = symbol
+			order_logger.info("Trade exit logged: order_id=%s symbol=%s exit_price=%.2f pnl=%.2f pnl_pct=%.2f",
+					 order_id, symbol, exit_price, pnl, pnl_pct)
+		if not rows:
+			return 0
+		execute_values(cur, """
+			UPDATE trade_journal AS t
+			SET exit_date = d.exit_date, exit_price = d.exit_price, pnl = d.pnl, pnl_pct = d.pnl_pct,
+				duration = d.duration, status = 'closed', notes = d.notes, updated_at = CURRENT_TIMESTAMP
+			FROM (VALUES %s) AS d(id, exit_date, exit_price, pnl, pnl_pct, duration, notes)
+			WHERE t.id = d.id
+		""", rows, template="(%s, %s::timestamp, %s::numeric, %s::numeric, %s::numeric, %s::numeric, %s)")
+		conn.commit()
+		# Cancel only the GTTs attached to these trades. gtt_id is read on its
+		# own so a schema without it doesn't fail the exit update above.
+		try:
+			cur.execute("SELECT id, gtt_id FROM trade_journal WHERE id = ANY(%s) AND gtt_id IS NOT NULL",
+					(list(symbol_by_id),))
+			gtt_rows = cur.fetchall()
+		except Exception as e:
+			error_logger.debug("Silent exception cancelling GTT on exit: %s", e)
+			gtt_rows = []
+		for entry_id, gtt_id in gtt_rows:
+			try:
+				_cancel_trade_gtt(cur, conn, entry_id, gtt_id, symbol_by_id[entry_id])
+			except Exception as e:
+				error_logger.debug("Silent exception cancelling GTT on exit: %s", e)
+	return len(rows)
+
+# Broker error classification for the buy path. Margin patterns are checked
+# first so a message mentioning both still reports as a funds problem.
+_ORDER_MARGIN_ERR_RE = re.compile(r'margin|insufficient|required', re.I)
+_ORDER_MARKET_ERR_RE = re.compile(r'market|closed|trading hours', re.I)
+_GTT_MARGIN_ERR_RE = re.compile(r'margin|insufficient', re.I)
+_GTT_MARKET_ERR_RE = re.compile(r'market|closed', re.I)
+
 @app.post("/api/order/buy")
 @limiter.limit("5 per minute")  # Max 5 buy orders per minute per IP
 @csrf_protect  # CSRF token validation
@@ -2268,6 +3014,8 @@ def api_place_buy():
 		ltp = q.get('last_price')
 		if not isinstance(ltp, (int, float)) or ltp <= 0:
 			return jsonify({"error": "Invalid LTP received"}), 400
+		# Tick size resolved once; shared by limit rounding, the GTT bracket and trailing
+		tick = _load_tick_sizes(_INSTRUMENTS_CSV_PATH).get(symbol) or _fallback_tick_by_price(ltp)
 		# Determine price basis and qty
 		price_basis = ltp
 		limit_price = None
@@ -2275,9 +3023,6 @@ def api_place_buy():
 		tick_used = None
 		if not use_market:
 			# Tick rounding for limit entry - place at LTP
-			inst_csv = os.path.join(REPO_ROOT, os.getenv('INSTRUMENTS_CSV', os.path.join('Csvs','instruments.csv')))
-			ticks = _load_tick_sizes(inst_csv)
-			tick = ticks.get(symbol) or _fallback_tick_by_price(ltp)
 			# record inputs for API response
 			original_price = float(ltp)
 			tick_used = float(tick)
@@ -2306,12 +3051,12 @@ def api_place_buy():
 		try:
 			order_id = kite.place_order(**order_kwargs)
 		except Exception as order_err:
-			error_str = str(order_err).lower()
 			# Check for specific error conditions
-			if 'margin' in error_str or 'insufficient' in error_str or 'required' in error_str:
+			error_str = str(order_err)
+			if _ORDER_MARGIN_ERR_RE.search(error_str):
 				order_logger.error("ORDER_MARGIN_ERROR symbol=%s qty=%s price=%s err=%s", symbol, qty, limit_price, order_err)
 				return jsonify({"error": f"Margin/Insufficient funds: {str(order_err)}"}), 400
-			elif 'market' in error_str or 'closed' in error_str or 'trading hours' in error_str:
+			elif _ORDER_MARKET_ERR_RE.search(error_str):
 				order_logger.error("ORDER_MARKET_CLOSED symbol=%s qty=%s err=%s", symbol, qty, order_err)
 				return jsonify({"error": f"Market closed or trading hours issue: {str(order_err)}"}), 400
 			else:
@@ -2345,16 +3090,14 @@ def api_place_buy():
 		if with_tsl and order_id and order_status != "REJECTED":
 			try:
 				# Place bracket OCO: target +7.5%, stop -5%
-				gtt_id = _place_bracket_oco_gtt(kite, symbol, qty, ref_price=ltp, target_pct=0.075, sl_pct=sl_pct)
+				gtt_id = _place_bracket_oco_gtt(kite, symbol, qty, ref_price=ltp, target_pct=0.075, sl_pct=sl_pct,
+					prices=(_ceil_to_tick(ltp * (1 - sl_pct), tick), _ceil_to_tick(ltp * 1.075, tick), tick))
 				# Start trailing from last LTP (raise-only)
-				inst_csv = os.path.join(REPO_ROOT, os.getenv('INSTRUMENTS_CSV', os.path.join('Csvs','instruments.csv')))
-				tmap = _load_tick_sizes(inst_csv)
-				trail_tick = tmap.get(symbol) or _fallback_tick_by_price(ltp)
-				_start_trailing(kite, symbol, qty, sl_pct, ltp=ltp, tick=trail_tick, gtt_id=gtt_id, gtt_type='oco', target_pct=0.075)
+				_start_trailing(kite, symbol, qty, sl_pct, ltp=ltp, tick=tick, gtt_id=gtt_id, gtt_type='oco', target_pct=0.075)
 				# Persist computed GTT target/stop immediately so UI can show them
 				try:
-					target_px = _round_to_tick(ltp * (1 + 0.075), trail_tick)
-					stop_px = _round_to_tick(ltp * (1 - sl_pct), trail_tick)
+					target_px = _round_to_tick(ltp * (1 + 0.075), tick)
+					stop_px = _round_to_tick(ltp * (1 - sl_pct), tick)
 					target_pct_from_ltp = ((target_px / float(ltp)) - 1.0) * 100.0 if ltp else None
 					stop_pct_from_ltp = (1.0 - (stop_px / float(ltp))) * 100.0 if ltp else None
 					with _orders_lock:
@@ -2364,6 +3107,7 @@ def api_place_buy():
 							# create minimal record
 							_orders_store[str(order_id)] = {
 								"symbol": symbol,
+								"quote_key": "NSE:" + symbol,
 								"quantity": qty,
 								"limit_price": limit_price,
 								"gtt_id": gtt_id,
@@ -2373,6 +3117,7 @@ def api_place_buy():
 								"gtt_stop_pct_from_ltp": stop_pct_from_ltp,
 								"ts": int(time.time()),
 							}
+							_trim_oldest(_orders_store, _ORDERS_STORE_MAX, _ORDERS_STORE_TTL)
 						else:
 							rec['gtt_id'] = gtt_id
 							rec['gtt_target_price'] = target_px
@@ -2387,18 +3132,20 @@ def api_place_buy():
 				# GTT placement failed but order succeeded; return partial success
 				gtt_error_msg = str(ge)
 				# Check for specific GTT errors
-				if 'margin' in gtt_error_msg.lower() or 'insufficient' in gtt_error_msg.lower():
+				if _GTT_MARGIN_ERR_RE.search(gtt_error_msg):
 					gtt_error_msg = f"GTT Margin Error: {ge}"
-				elif 'market' in gtt_error_msg.lower() or 'closed' in gtt_error_msg.lower():
+				elif _GTT_MARKET_ERR_RE.search(gtt_error_msg):
 					gtt_error_msg = f"GTT Market Closed: {ge}"
 				with _orders_lock:
 					_orders_store[str(order_id)] = {
 						"symbol": symbol,
+						"quote_key": "NSE:" + symbol,
 						"quantity": qty,
 						"limit_price": limit_price,
 						"gtt_id": None,
 						"ts": int(time.time()),
 					}
+					_trim_oldest(_orders_store, _ORDERS_STORE_MAX, _ORDERS_STORE_TTL)
 				return jsonify({
 					"status": "partial",
 					"order_id": order_id,
@@ -2412,11 +3159,13 @@ def api_place_buy():
 		with _orders_lock:
 			_orders_store[str(order_id)] = {
 				"symbol": symbol,
+				"quote_key": "NSE:" + symbol,
 				"quantity": qty,
 				"limit_price": limit_price,
 				"gtt_id": gtt_id,
 				"ts": int(time.time()),
 			}
+			_trim_oldest(_orders_store, _ORDERS_STORE_MAX, _ORDERS_STORE_TTL)
 		order_logger.info("ORDER_OK symbol=%s qty=%s price=%s order_id=%s gtt_id=%s trailing=%s", symbol, qty, limit_price, order_id, gtt_id, with_tsl)
 		
 		# Automatically log to trade journal
@@ -2443,10 +3192,20 @@ def api_place_buy():
 				"tick_used": tick_used,
 				"rounded_price": limit_price,
 			})
-		return jsonify(resp)
+		return _jsonify(resp)
 	except Exception as e:
 		error_logger.exception("/api/order/buy failed: %s", e)
 		return jsonify({"error": str(e)}), 500
+
+def _tofloat(v):
+	"""float(v), or None when v is missing or not numeric."""
+	if isinstance(v, (int, float)):
+		return v
+	try:
+		return float(v)
+	except (TypeError, ValueError):
+		return None
+
 @app.get("/api/orders")
 def api_orders():
 	"""Return orders placed via this app with live LTP, trailing stop, and PnL."""
@@ -2457,67 +3216,42 @@ def api_orders():
 			return jsonify({"count": 0, "orders": []})
 		kite = get_kite()
 		# Prefer cached broker orders; fallback to immediate fetch if empty
-		with _broker_orders_lock:
-			broker_orders = list(_broker_orders_cache.values())
+		broker_orders = list(_broker_orders_cache.values())
 		if not broker_orders:
 			try:
-				broker_orders = kite.orders() or []
-				with _broker_orders_lock:
-					for o in broker_orders:
-						oid = str(o.get('order_id') or '')
-						if oid:
-							_broker_orders_cache[oid] = o
+				broker_orders = _cached_orders(kite)
+				_broker_orders_cache.update({str(o.get('order_id')): o for o in broker_orders if o.get('order_id')})
+				_trim_oldest(_broker_orders_cache, _BROKER_ORDERS_MAX)
 			except Exception as oe:
 				error_logger.error("orders() failed: %s", oe)
 				broker_orders = []
 		# Filter to open/active orders for relevance
-		active_status = {"OPEN", "TRIGGER_PENDING", "PENDING", "OPEN_PENDING"}
-		ord_map = {str(o.get('order_id')): o for o in broker_orders if (o.get('status') or '').upper() in active_status or str(o.get('order_id')) in _orders_store}
-
-		# Fetch current GTTs (GTC) to get target/stop books
-		# Use cached GTTs refreshed every 30s
-		gtt_list = []
-		global _gtt_cache_ts, _gtt_cache
-		now = time.time()
+		# statuses are upper-cased when orders enter the cache (_upper_fields)
+		ord_map = {str(o.get('order_id')): o for o in broker_orders if o.get('status') in _ACTIVE_ORDER_STATUSES or str(o.get('order_id')) in _orders_store}
+
+		# Current GTTs (GTC) for target/stop books, indexed by tradingsymbol;
+		# served from the background-refreshed cache (up to 30s old)
 		try:
-			if now - _gtt_cache_ts > 30:
-				gtt_list = _fetch_gtts_with_timeout(kite, timeout=2.0) or []
-				_gtt_cache = {}
-				for g in gtt_list:
-					ts = g.get('tradingsymbol') or g.get('symbol')
-					if not ts:
-						continue
-					_gtt_cache.setdefault(ts, []).append(g)
-				_gtt_cache_ts = now
-			else:
-				# flatten cached gtt map
-				tmp = []
-				for arr in _gtt_cache.values():
-					tmp.extend(arr)
-				gtt_list = tmp
+			gtt_by_symbol = _gtt_book_by_symbol(kite, timeout=2.0, max_age=30)
 		except Exception as ge:
 			error_logger.error("gtt() failed: %s", ge)
-			gtt_list = []
-		# index gtt by tradingsymbol for convenience
-		gtt_by_symbol: dict[str, list] = {}
-		for g in gtt_list:
-			ts = g.get('tradingsymbol') or g.get('symbol')
-			if not ts:
-				continue
-			gtt_by_symbol.setdefault(ts, []).append(g)
+			gtt_by_symbol = {}
 		# Quotes for symbols
-		syms = sorted({ rec[1].get('symbol') for rec in items if rec[1].get('symbol') })
+		# "NSE:SYM" keys are stored on each record when the order is placed
+		quote_keys = list({rec['quote_key'] for _, rec in items if rec.get('quote_key')})
 		# Quote fetch: only if needed and batched; prefer existing LTP from data service when possible
 		quotes = {}
 		try:
-			quotes = kite.quote([f"NSE:{s}" for s in syms]) or {}
+			quotes = _quote_get(kite, quote_keys)
 		except Exception as qe:
 			error_logger.error("quote() failed: %s", qe)
 			quotes = {}
+		with _trail_lock_obj():
+			trail_by_symbol = _trail_index()[2]
 		resp = []
 		for oid, rec in items:
 			symbol = rec.get('symbol')
-			q = quotes.get(f"NSE:{symbol}") or {}
+			q = quotes.get(rec.get('quote_key')) or {}
 			ltp = q.get('last_price')
 			# try app data service for LTP if quote missing
 			if not isinstance(ltp, (int,float)) or ltp <= 0:
@@ -2532,15 +3266,8 @@ def api_orders():
 			avg_price = od.get('average_price') or od.get('average') or rec.get('limit_price')
 			qty = rec.get('quantity')
 			# trailing trigger from state - now keyed by gtt_id
-			trail_trigger = None
-			try:
-				# Look for any trailing state matching this symbol
-				for gid, st in _trail_state.items():
-					if st.get('symbol') == symbol:
-						trail_trigger = st.get('trigger')
-						break
-			except Exception:
-				trail_trigger = None
+			states = trail_by_symbol.get(symbol)
+			trail_trigger = states[0].get('trigger') if states else None
 
 			# extract GTT target/stop info from current gtt book
 			gtt_info = []
@@ -2558,28 +3285,15 @@ def api_orders():
 							"trigger_values": trigger_values,
 							"orders": orders,
 						})
-						# derive target/stop prices (robust to string values)
-						cand_high = None
-						cand_low = None
-						for o in orders:
-							if (o.get('transaction_type') or '').upper() == 'SELL':
-								p = o.get('price')
-								if not isinstance(p, (int, float)):
-									try:
-										p = float(p)
-									except Exception:
-										p = None
-								if isinstance(p, (int,float)):
-									cand_high = p if (cand_high is None or p > cand_high) else cand_high
-									cand_low = p if (cand_low is None or p < cand_low) else cand_low
+						# derive target/stop prices (robust to string values): collect
+						# the SELL leg prices once, then reduce with builtin max/min
+						sell_px = [p for p in (_tofloat(o.get('price')) for o in orders
+							if o.get('transaction_type') == 'SELL') if p is not None]
+						cand_high = max(sell_px) if sell_px else None
+						cand_low = min(sell_px) if sell_px else None
 						# fall back to trigger values if order prices missing
 						if cand_high is None or cand_low is None:
-							vals = []
-							for tv in (trigger_values or []):
-								try:
-									vals.append(float(tv))
-								except Exception as e:
-									error_logger.debug("Silent exception ignored: %s", e)
+							vals = [v for v in map(_tofloat, trigger_values) if v is not None]
 							if vals:
 								mx = max(vals)
 								mn = min(vals)
@@ -2615,14 +3329,9 @@ def api_orders():
 						orders = g.get('orders') or []
 						for o in orders:
 							# look for SELL limit leg as stop
-							if (o.get('transaction_type') or '').upper() == 'SELL':
-								p = o.get('price')
-								if not isinstance(p, (int, float)):
-									try:
-										p = float(p)
-									except Exception:
-										p = None
-								if isinstance(p, (int,float)):
+							if o.get('transaction_type') == 'SELL':
+								p = _tofloat(o.get('price'))
+								if p is not None:
 									current_stop_price = p
 									break
 						if current_stop_price is not None:
@@ -2682,7 +3391,7 @@ def api_orders():
 				"gtt_id": rec.get('gtt_id'),
 				"ts": rec.get('ts'),
 			})
-		return jsonify({"count": len(resp), "orders": resp})
+		return _jsonify({"count": len(resp), "orders": resp})
 	except Exception as e:
 		error_logger.exception("/api/orders failed: %s", e)
 		return jsonify({"error": str(e)}), 500
@@ -2716,8 +3425,7 @@ def api_cancel_order():
 		# Remove from local stores if present
 		with _orders_lock:
 			_orders_store.pop(str(order_id), None)
-		with _broker_orders_lock:
-			_broker_orders_cache.pop(str(order_id), None)
+		_broker_orders_cache.pop(str(order_id), None)
 		
 		# Auto-cancel linked GTT orders for the same symbol
 		cancelled_gtt_id = None
@@ -2733,15 +3441,13 @@ def api_cancel_order():
 							try:
 								if hasattr(kite, 'delete_gtt'):
 									kite.delete_gtt(gtt_id)
+									_invalidate_gtt_cache()
 								elif hasattr(kite, 'cancel_gtt'):
 									kite.cancel_gtt(gtt_id)
+									_invalidate_gtt_cache()
 								cancelled_gtt_id = gtt_id
 								# Remove from cache
-								newarr = [g for g in gtt_list if str(g.get('id') or g.get('trigger_id')) != str(gtt_id)]
-								if newarr:
-									_gtt_cache[symbol] = newarr
-								else:
-									_gtt_cache.pop(symbol, None)
+								_drop_gtt_from_cache(gtt_id)
 								access_logger.info("Auto-cancelled GTT %s for symbol %s when order %s cancelled", gtt_id, symbol, order_id)
 							except Exception as gtt_err:
 								error_logger.warning("Failed to auto-cancel GTT %s for symbol %s: %s", gtt_id, symbol, gtt_err)
@@ -2761,6 +3467,7 @@ def api_cancel_order():
 @limiter.limit("10 per minute")  # Max 10 GTT cancel requests per minute per IP
 def api_cancel_gtt():
 	"""Cancel/delete a GTT by trigger id (JSON body: {"gtt_id": "..."})."""
+	global _trail_symbols_cache
 	try:
 		access_logger.info("POST /api/gtt/cancel from %s", request.remote_addr)
 		payload = request.get_json(silent=True) or {}
@@ -2772,8 +3479,10 @@ def api_cancel_gtt():
 			# prefer delete_gtt if available
 			if hasattr(kite, 'delete_gtt'):
 				res = kite.delete_gtt(gtt_id)
+				_invalidate_gtt_cache()
 			elif hasattr(kite, 'cancel_gtt'):
 				res = kite.cancel_gtt(gtt_id)
+				_invalidate_gtt_cache()
 			else:
 				return jsonify({"error": "GTT delete not supported by kite client"}), 501
 		except Exception as ge:
@@ -2781,14 +3490,18 @@ def api_cancel_gtt():
 			return jsonify({"error": str(ge)}), 500
 		# Remove from cached GTTs if present
 		try:
-			with _broker_orders_lock:
-				# purge any cached entries that reference this id
-				for k, arr in list(_gtt_cache.items()):
-					newarr = [g for g in arr if str(g.get('id') or g.get('trigger_id')) != str(gtt_id)]
-					if newarr:
-						_gtt_cache[k] = newarr
-					else:
-						_gtt_cache.pop(k, None)
+			_drop_gtt_from_cache(gtt_id)
+		except Exception as e:
+			error_logger.debug("Silent exception ignored: %s", e)
+		# stop trailing the deleted trigger
+		try:
+			with _trail_lock_obj():
+				for key in list(_trail_state.keys()):
+					st = _trail_state.get(key)
+					if st and str(_extract_trigger_id(st.get('gtt_id'))) == str(gtt_id):
+						_trail_state.pop(key, None)
+						_trail_symbols_cache = None
+			_trail_wake.set()
 		except Exception as e:
 			error_logger.debug("Silent exception ignored: %s", e)
 		return jsonify({"status": "ok", "gtt_id": gtt_id, "result": res})
@@ -2796,6 +3509,81 @@ def api_cancel_gtt():
 		error_logger.exception("/api/gtt/cancel failed: %s", e)
 		return jsonify({"error": str(e)}), 500
 
+def _book_gtt(kite, gtt_id, symbol: str, qty: int, ltp: float) -> tuple[dict, int]:
+	"""Cancel the GTT and place a LIMIT SELL at `ltp`. Returns (body, http_status)."""
+	try:
+		# Cancel the GTT order first
+		try:
+			kite.delete_gtt(trigger_id=gtt_id)
+			_invalidate_gtt_cache()
+			order_logger.info("BOOK_GTT cancelled GTT %s for %s", gtt_id, symbol)
+		except Exception as cancel_err:
+			order_logger.warning("Failed to cancel GTT %s: %s", gtt_id, cancel_err)
+			return {"error": f"Failed to cancel GTT: {str(cancel_err)}"}, 500
+		
+		# Place a limit sell order at LTP to get filled immediately
+		order_id = kite.place_order(
+			variety=kite.VARIETY_REGULAR,
+			exchange='NSE',
+			tradingsymbol=symbol,
+			transaction_type=kite.TRANSACTION_TYPE_SELL,
+			quantity=qty,
+			product=kite.PRODUCT_CNC,
+			order_type=kite.ORDER_TYPE_LIMIT,
+			price=ltp
+		)
+		order_logger.info("BOOK_GTT placed SELL order symbol=%s order_id=%s qty=%d price=%.2f (cancelled_gtt=%s)", 
+						  symbol, order_id, qty, ltp, gtt_id)
+	except Exception as ge:
+		order_logger.error("gtt book failed for %s: %s", gtt_id, ge)
+		return {"error": f"Book order failed: {str(ge)}"}, 500
+	
+	return {
+		"status": "ok",
+		"gtt_id": gtt_id,
+		"order_id": order_id,
+		"symbol": symbol,
+		"sell_price": ltp,
+		"quantity": qty,
+		"message": f"GTT cancelled, SELL order placed at {ltp:.2f}"
+	}, 200
+
+
+# Set GTT_BOOK_ASYNC=true to run book-profit broker calls (delete_gtt +
+# place_order) on a background pool: the endpoint answers 202 with a job id
+# and clients poll /api/gtt/book/status/<job_id>. Off by default so the
+# synchronous response shape is unchanged.
+GTT_BOOK_ASYNC = os.environ.get('GTT_BOOK_ASYNC', 'false').lower() in ('true', '1', 'yes')
+_book_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='gtt_book')
+_book_jobs: dict[str, dict] = {}
+_book_jobs_lock = threading.Lock()
+_BOOK_JOB_TTL = 600  # seconds a finished job's result stays queryable
+
+
+def _run_book_job(job_id: str, gtt_id, symbol: str, qty: int, ltp: float) -> None:
+	try:
+		body, code = _book_gtt(get_kite(), gtt_id, symbol, qty, ltp)
+	except Exception as e:
+		order_logger.exception("BOOK_GTT job %s failed: %s", job_id, e)
+		body, code = {"error": str(e)}, 500
+	with _book_jobs_lock:
+		job = _book_jobs.get(job_id)
+		if job is not None:
+			job.update(state='done', http_status=code, result=body, ts=time.monotonic())
+
+
+def _submit_book_job(gtt_id, symbol: str, qty: int, ltp: float) -> str:
+	job_id = uuid.uuid4().hex
+	now = time.monotonic()
+	with _book_jobs_lock:
+		# Drop results nobody collected
+		for jid in [j for j, v in _book_jobs.items() if v['state'] == 'done' and now - v['ts'] > _BOOK_JOB_TTL]:
+			_book_jobs.pop(jid, None)
+		_book_jobs[job_id] = {'state': 'queued', 'gtt_id': gtt_id, 'symbol': symbol, 'ts': now}
+	_book_executor.submit(_run_book_job, job_id, gtt_id, symbol, qty, ltp)
+	return job_id
+
+
 @app.post('/api/gtt/book')
 @limiter.limit("5 per minute")  # Max 5 book profit requests per minute per IP
 def api_book_gtt():
@@ -2814,64 +3602,498 @@ def api_book_gtt():
 		if not gtt_id or not symbol or qty <= 0 or stop_price <= 0 or target_price <= 0:
 			return jsonify({"error": "gtt_id, symbol, qty, stop_price, and target_price are required"}), 400
 		
-		kite = get_kite()
-		
 		# Fetch tick size for proper rounding
-		inst_csv = os.path.join(REPO_ROOT, os.getenv('INSTRUMENTS_CSV', os.path.join('Csvs','instruments.csv')))
-		ticks = _load_tick_sizes(inst_csv)
+		ticks = _load_tick_sizes(_INSTRUMENTS_CSV_PATH)
 		tick = ticks.get(symbol) or _fallback_tick_by_price(target_price)
 		
-		# Round prices to proper tick
-		stop_px = _round_to_tick(stop_price, tick)
+		# Work in whole ticks so the buffer and rounding can't drift; convert to
+		# rupees once at the end.
+		if not tick or tick <= 0:
+			tick = 0.05
+		stop_ticks = round(stop_price / tick)
+		ltp_ticks = round(target_price / tick)  # target_price from frontend is LTP
+		if stop_ticks <= 0 or ltp_ticks <= 0:
+			return jsonify({"error": "Invalid stop or LTP price after rounding"}), 400
 		
-		# target_price from frontend is LTP - we need to set target 0.3% above it
-		# Zerodha API requires trigger price to differ from LTP by at least 0.25%
-		ltp = _round_to_tick(target_price, tick)  # Keep original LTP for last_price param
-		buffer_amount = ltp * 0.003  # 0.3% buffer above LTP
-		target_px = _round_to_tick(ltp + buffer_amount, tick)
+		# Target sits 0.3% (at least one tick) above LTP: Zerodha requires the
+		# trigger to differ from LTP by at least 0.25%
+		target_ticks = ltp_ticks + max(1, round(ltp_ticks * 0.003))
+		stop_px = round(stop_ticks * tick, 2)
+		ltp = round(ltp_ticks * tick, 2)  # Keep original LTP for last_price param
+		target_px = round(target_ticks * tick, 2)
 		
-		if stop_px <= 0 or ltp <= 0:
-			return jsonify({"error": "Invalid stop or LTP price after rounding"}), 400
+		if GTT_BOOK_ASYNC:
+			job_id = _submit_book_job(gtt_id, symbol, qty, ltp)
+			order_logger.info("BOOK_GTT queued job=%s gtt=%s symbol=%s", job_id, gtt_id, symbol)
+			return jsonify({"status": "queued", "job_id": job_id, "gtt_id": gtt_id, "symbol": symbol}), 202
 		
+		body, code = _book_gtt(get_kite(), gtt_id, symbol, qty, ltp)
+		return jsonify(body), code
+	except Exception as e:
+		order_logger.exception("/api/gtt/book failed: %s", e)
+		return jsonify({"error": str(e)}), 500
+
+
+@app.get('/api/gtt/book/status/<job_id>')
+def api_book_gtt_status(job_id):
+	"""Poll a queued book-profit job. While running returns {"state": "queued"};
+	once finished returns the synchronous endpoint's body and status code."""
+	with _book_jobs_lock:
+		job = dict(_book_jobs.get(job_id) or {})
+	if not job:
+		return jsonify({"error": "unknown job_id"}), 404
+	if job['state'] != 'done':
+		return jsonify({"state": job['state'], "job_id": job_id, "gtt_id": job['gtt_id'], "symbol": job['symbol']}), 202
+	return jsonify(dict(job['result'], state='done', job_id=job_id)), job['http_status']
+
+# information_schema lookups for trade_journal are cached per table: the schema
+# only changes on deploy/DDL, so re-reading the catalog on every request is wasted
+# work. Value is (monotonic fetch time, column set, resolved timestamp column).
+_schema_cache: dict[str, tuple[float, frozenset, str]] = {}
+_schema_cache_lock = threading.Lock()
+_SCHEMA_CACHE_TTL = 300
+
+
+def _get_trade_journal_cols(cur, ttl: float = _SCHEMA_CACHE_TTL) -> tuple[frozenset, str]:
+	"""Return (columns, ts_col) for trade_journal, re-querying at most once per `ttl` seconds.
+
+	ts_col is 'timestamp' when that column exists, otherwise 'entry_date'.
+	"""
+	now = time.monotonic()
+	hit = _schema_cache.get('trade_journal')
+	if hit and now - hit[0] < ttl:
+		return hit[1], hit[2]
+	cur.execute("SELECT column_name FROM information_schema.columns WHERE table_name = 'trade_journal'")
+	cols = frozenset(r[0] for r in cur.fetchall())
+	ts_col = 'timestamp' if 'timestamp' in cols else 'entry_date'
+	# Don't cache an empty result: the table may simply not exist yet.
+	if cols:
+		with _schema_cache_lock:
+			_schema_cache['trade_journal'] = (now, cols, ts_col)
+	return cols, ts_col
+
+
+def _invalidate_trade_journal_schema() -> None:
+	with _schema_cache_lock:
+		_schema_cache.pop('trade_journal', None)
+	_build_trade_journal_select.cache_clear()
+	_build_trade_journal_stats_sql.cache_clear()
+
+
+# L1 cache for /api/trade-journal/min, keyed by (symbol, days). Entries are
+# {'ts': epoch, 'version': journal version, 'body': encoded JSON}; writes bump
+# the version so a cached window is never served after an insert/update in
+# this process. Only the usual `days` windows are cached, and the dict is
+# trimmed on every store, since both key parts come from the client.
+_min_cache: dict[tuple, dict] = {}
+_min_cache_lock = threading.Lock()
+_MIN_CACHE_TTL = 5
+_MIN_CACHE_MAX = 256
+_MIN_CACHE_DAYS = frozenset((1, 7, 30, 90))
+_journal_version = 0
+
+
+def _min_cache_get(key: tuple) -> tuple[int, str | None]:
+	"""Return (current journal version, cached body or None) for `key`."""
+	with _min_cache_lock:
+		version = _journal_version
+		hit = _min_cache.get(key)
+	if hit and hit['version'] == version and time.time() - hit['ts'] < _MIN_CACHE_TTL:
+		return version, hit['body']
+	return version, None
+
+
+def _min_cache_put(key: tuple, version: int, body: str) -> None:
+	"""Store `body` unless a write bumped the journal version since `version`."""
+	if key[1] not in _MIN_CACHE_DAYS:
+		return
+	with _min_cache_lock:
+		if version != _journal_version:
+			return
+		# re-insert at the end so the dict stays ordered by 'ts'
+		_min_cache.pop(key, None)
+		_min_cache[key] = {'ts': time.time(), 'version': version, 'body': body}
+		_trim_oldest(_min_cache, _MIN_CACHE_MAX, _MIN_CACHE_TTL)
+
+
+def _bump_journal_version() -> None:
+	global _journal_version
+	with _min_cache_lock:
+		_journal_version += 1
+		_min_cache.clear()
+
+
+_table_ensured = False
+_table_ensure_lock = threading.Lock()
+
+
+def _ensure_trade_journal_indexes(cur) -> None:
+	"""Create the indexes backing the journal's GET/stats filters and exit sync.
+
+	Only columns present in the live schema are indexed, since deployments differ
+	in whether the timestamp column is `timestamp` or `entry_date`.
+	"""
+	cols, ts_col = _get_trade_journal_cols(cur)
+	stmts = [
+		# symbol filter + time window + ORDER BY ts DESC in one index range scan
+		f"CREATE INDEX IF NOT EXISTS trade_journal_symbol_ts_idx ON trade_journal (symbol, {ts_col} DESC)",
+	]
+	if 'entry_date' in cols:
+		# COALESCE(timestamp, entry_date) fallback used by /api/trade-journal/min
+		stmts.append("CREATE INDEX IF NOT EXISTS trade_journal_entry_date_idx ON trade_journal (entry_date DESC)")
+	if {'order_id', 'status', 'exit_price'} <= cols:
+		# open trades awaiting an exit (api_sync_trade_exits)
+		stmts.append("CREATE INDEX IF NOT EXISTS trade_journal_open_idx ON trade_journal (order_id) WHERE status = 'open' AND exit_price IS NULL")
+	for stmt in stmts:
 		try:
-			# Cancel the GTT order first
+			cur.execute(stmt)
+		except Exception as e:
+			error_logger.warning("trade_journal index creation failed (%s): %s", stmt, e)
+
+
+def ensure_trade_journal_table() -> bool:
+	"""Create or widen trade_journal. Runs the DDL at most once per process.
+
+	Called at startup; the POST handler calls it again only if startup could not
+	reach the database. Returns True once the table is known to exist.
+	"""
+	global _table_ensured
+	if _table_ensured:
+		return True
+	from pgAdmin_database.db_connection import pg_cursor, ensure_trade_journal_schema
+	with _table_ensure_lock:
+		if _table_ensured:
+			return True
+		try:
+			with pg_cursor() as (cur, conn):
+				# shared with momentum_strategy, which writes the entry/exit columns
+				ensure_trade_journal_schema(cur)
+				conn.commit()
+				_invalidate_trade_journal_schema()
+				_ensure_trade_journal_indexes(cur)
+			_table_ensured = True
+			access_logger.info("trade_journal table ensured")
+		except Exception as e:
+			error_logger.warning("Failed to ensure trade_journal table: %s", e)
+	if _table_ensured:
+		_start_stats_view_refresher()
+	return _table_ensured
+
+
+# Stats for the default 30-day window are served from a materialized view that a
+# background thread refreshes every minute; other windows query the table live.
+_STATS_VIEW_DAYS = 30
+_STATS_VIEW_REFRESH_SECONDS = 60
+# Refresh even without a write from this process after this long, so rows
+# ageing out of the window and other writers (momentum_strategy) show up.
+_STATS_VIEW_MAX_STALE_SECONDS = 900
+_stats_view_ready = False
+_stats_view_thread_started = False
+_stats_view_thread_lock = threading.Lock()
+
+
+def _ensure_trade_journal_stats_view() -> bool:
+	"""Create the trade_journal_stats_30d materialized view (per-symbol aggregates)."""
+	global _stats_view_ready
+	from pgAdmin_database.db_connection import pg_cursor
+	try:
+		with pg_cursor() as (cur, conn):
+			_, ts_col = _get_trade_journal_cols(cur)
+			cur.execute(f"""
+				CREATE MATERIALIZED VIEW IF NOT EXISTS trade_journal_stats_30d AS
+				SELECT
+					symbol,
+					COUNT(*) AS total_trades,
+					COUNT(*) FILTER (WHERE pnl > 0) AS winning_trades,
+					COUNT(*) FILTER (WHERE pnl <= 0) AS losing_trades,
+					COUNT(pnl) AS pnl_count,
+					COALESCE(SUM(pnl), 0) AS total_pnl,
+					MAX(pnl) AS max_win,
+					MIN(pnl) AS max_loss
+				FROM trade_journal
+				WHERE {ts_col} >= NOW() - INTERVAL '{_STATS_VIEW_DAYS} days'
+				GROUP BY symbol
+			""")
+			# unique index is required for REFRESH ... CONCURRENTLY
+			cur.execute("CREATE UNIQUE INDEX IF NOT EXISTS trade_journal_stats_30d_symbol_idx ON trade_journal_stats_30d (symbol)")
+			conn.commit()
+		_stats_view_ready = True
+	except Exception as e:
+		error_logger.warning("Failed to ensure trade_journal_stats_30d view: %s", e)
+	return _stats_view_ready
+
+
+def _start_stats_view_refresher(interval: int = _STATS_VIEW_REFRESH_SECONDS) -> None:
+	"""Start the background thread that keeps trade_journal_stats_30d fresh."""
+	global _stats_view_thread_started
+	with _stats_view_thread_lock:
+		if _stats_view_thread_started:
+			return
+		_stats_view_thread_started = True
+	from pgAdmin_database.db_connection import pg_cursor
+
+	def _worker():
+		refreshed_version = None
+		refreshed_at = 0.0
+		while True:
 			try:
-				kite.delete_gtt(trigger_id=gtt_id)
-				order_logger.info("BOOK_GTT cancelled GTT %s for %s", gtt_id, symbol)
-			except Exception as cancel_err:
-				order_logger.warning("Failed to cancel GTT %s: %s", gtt_id, cancel_err)
-				return jsonify({"error": f"Failed to cancel GTT: {str(cancel_err)}"}), 500
-			
-			# Place a limit sell order at LTP to get filled immediately
-			order_id = kite.place_order(
-				variety=kite.VARIETY_REGULAR,
-				exchange='NSE',
-				tradingsymbol=symbol,
-				transaction_type=kite.TRANSACTION_TYPE_SELL,
-				quantity=qty,
-				product=kite.PRODUCT_CNC,
-				order_type=kite.ORDER_TYPE_LIMIT,
-				price=ltp
-			)
-			order_logger.info("BOOK_GTT placed SELL order symbol=%s order_id=%s qty=%d price=%.2f (cancelled_gtt=%s)", 
-							  symbol, order_id, qty, ltp, gtt_id)
-		except Exception as ge:
-			order_logger.error("gtt book failed for %s: %s", gtt_id, ge)
-			return jsonify({"error": f"Book order failed: {str(ge)}"}), 500
-		
-		return jsonify({
-			"status": "ok",
-			"gtt_id": gtt_id,
-			"order_id": order_id,
-			"symbol": symbol,
-			"sell_price": ltp,
-			"quantity": qty,
-			"message": f"GTT cancelled, SELL order placed at {ltp:.2f}"
-		})
+				# skip the refresh while no journal write has landed, up to
+				# _STATS_VIEW_MAX_STALE_SECONDS
+				version = _journal_version
+				stale = time.monotonic() - refreshed_at >= _STATS_VIEW_MAX_STALE_SECONDS
+				if (version != refreshed_version or stale) and (_stats_view_ready or _ensure_trade_journal_stats_view()):
+					with pg_cursor() as (cur, conn):
+						cur.execute("REFRESH MATERIALIZED VIEW CONCURRENTLY trade_journal_stats_30d")
+					refreshed_version = version
+					refreshed_at = time.monotonic()
+			except Exception:
+				error_logger.debug("trade_journal_stats_30d refresh failed", exc_info=True)
+			time.sleep(interval)
+
+	threading.Thread(target=_worker, name="trade_journal_stats_refresh", daemon=True).start()
+
+
+@app.post('/api/trade-journal/refresh-schema')
+def api_trade_journal_refresh_schema():
+	"""Drop the cached trade_journal column list (call after manual DDL)."""
+	_invalidate_trade_journal_schema()
+	return jsonify({"status": "ok"})
+
+
+def _register_dec2float(cur) -> None:
+	"""Make `cur` return NUMERIC columns as float instead of Decimal."""
+	if _DEC2FLOAT is not None:
+		try:
+			_pg_ext.register_type(_DEC2FLOAT, cur)
+		except Exception:
+			pass
+
+
+# GET requests for all rows, or a limit above this, are streamed
+_JOURNAL_STREAM_MIN_ROWS = 1000
+
+
+def _trade_journal_row_to_dict(cols, row) -> dict:
+	"""Zip a trade_journal row into a dict; _json_dumps handles Decimal/datetime."""
+	return dict(zip(cols, row))
+
+
+# (column, alias) pairs the GET endpoint returns when present in the schema;
+# the timestamp-like column is substituted for None and selected AS timestamp.
+_JOURNAL_DESIRED_FIELDS = (
+	('id', 'id'),
+	('trade_id', 'trade_id'),
+	('symbol', 'symbol'),
+	(None, 'timestamp'),
+	('entry_price', 'entry_price'),
+	('entry_qty', 'entry_qty'),
+	('entry_date', 'entry_date'),
+	('fill_price', 'fill_price'),
+	('intended_entry_price', 'intended_entry_price'),
+	('exit_date', 'exit_date'),
+	('exit_price', 'exit_price'),
+	('pnl', 'pnl'),
+	('pnl_pct', 'pnl_pct'),
+	('duration', 'duration'),
+	('strategy', 'strategy'),
+	('status', 'status'),
+	('notes', 'notes'),
+	('setup_description', 'setup_description'),
+	('order_id', 'order_id'),
+	('side', 'side'),
+	('slippage', 'slippage'),
+	('created_at', 'created_at'),
+	('updated_at', 'updated_at'),
+)
+
+
+@functools.lru_cache(maxsize=4)
+def _build_trade_journal_select(schema_cols: frozenset, ts_col: str) -> tuple[str, str]:
+	"""Return (rich_select, minimal_select) for the given schema signature.
+
+	Only columns that exist are selected so the endpoint tolerates schema
+	variants (older/newer deployments may lack some columns).
+	"""
+	fields = []
+	for col, alias in _JOURNAL_DESIRED_FIELDS:
+		col = col or ts_col
+		if col in schema_cols:
+			if col == ts_col:
+				fields.append(f"{col} AS {alias}")
+			else:
+				fields.append(col)
+	# Ensure at least a minimal set exists
+	if not fields:
+		fields = ['id', 'trade_id', 'symbol', f"{ts_col} AS timestamp"]
+	rich = "SELECT " + ", ".join(fields) + " FROM trade_journal"
+	# Minimal core fields only (id, trade_id, symbol, timestamp), used if the
+	# database complains about a missing column (schema mismatch).
+	minimal = f"SELECT id, trade_id, symbol, {ts_col} AS ts FROM trade_journal"
+	return rich, minimal
+
+
+def _stream_trade_journal(selects, params, itersize: int = 1000):
+	"""Yield a JSON array of trade_journal rows read through a server-side cursor.
+
+	`selects` are tried in order until one executes (rich select, then minimal).
+	"""
+	from pgAdmin_database.db_connection import pg_cursor
+	with pg_cursor() as (_, conn):
+		cur = None
+		for sql in selects:
+			# withhold=True lets a named cursor live on an autocommit connection
+			cur = conn.cursor(name='trade_journal_stream', withhold=True)
+			cur.itersize = itersize
+			_register_dec2float(cur)
+			try:
+				cur.execute(sql, params)
+				break
+			except Exception:
+				cur.close()
+				cur = None
+		if cur is None:
+			yield '[]'
+			return
+		try:
+			yield '['
+			cols = None
+			sep = ''
+			for row in cur:
+				if cols is None:
+					cols = [desc[0] for desc in cur.description]
+				yield sep + _json_dumps(_trade_journal_row_to_dict(cols, row))
+				sep = ','
+			yield ']'
+		finally:
+			cur.close()
+
+
+# Columns a client may set through POST /api/trade-journal (besides the
+# timestamp column, whose name depends on the deployment's schema).
+_JOURNAL_POST_FIELDS = (
+	'trade_id', 'side', 'order_book_imbalance', 'intended_entry_price',
+	'fill_price', 'slippage', 'exit_price', 'pnl', 'setup_description',
+)
+
+
+def _journal_item_error(item) -> str | None:
+	"""Validation error for one POSTed journal item, or None if it is usable."""
+	if not isinstance(item, dict):
+		return "item must be an object"
+	symbol = item.get('symbol')
+	if symbol is not None and not isinstance(symbol, str):
+		return "symbol must be a string"
+	if not (symbol or '').strip() or not (item.get('timestamp') or item.get('entry_date')):
+		return "symbol and timestamp (or entry_date) are required"
+	return None
+
+
+def _journal_batch_rows(items: list, cols: frozenset, ts_col: str) -> tuple[list, list]:
+	"""Normalize POSTed journal items into (insert_cols, row tuples).
+
+	Column list is the union of fields supplied across `items` that exist in the
+	schema; missing values become NULL. Duplicate trade_ids keep the last item,
+	since one statement can't hit the same conflict key twice.
+	"""
+	rows = []
+	by_trade_id = {}
+	for item in items:
+		row = {k: item.get(k) for k in _JOURNAL_POST_FIELDS if k in cols and item.get(k) is not None}
+		row['symbol'] = item['symbol'].strip().upper()
+		row[ts_col] = item.get('timestamp') or item.get('entry_date')
+		tid = row.get('trade_id')
+		if tid is not None:
+			if tid in by_trade_id:
+				rows[by_trade_id[tid]] = row
+				continue
+			by_trade_id[tid] = len(rows)
+		rows.append(row)
+	insert_cols = [c for c in ('symbol', ts_col) + _JOURNAL_POST_FIELDS if any(c in r for r in rows)]
+	return insert_cols, [tuple(r.get(c) for c in insert_cols) for r in rows]
+
+
+def _journal_conflict_clause(cols: frozenset, insert_cols: list) -> str:
+	"""ON CONFLICT suffix shared by the batched and COPY insert paths."""
+	if 'trade_id' not in insert_cols:
+		return ''
+	update_sets = [f"{c} = EXCLUDED.{c}" for c in ('exit_price', 'pnl') if c in cols]
+	if 'updated_at' in cols:
+		update_sets.append('updated_at = CURRENT_TIMESTAMP')
+	if update_sets:
+		return f" ON CONFLICT (trade_id) DO UPDATE SET {', '.join(update_sets)}"
+	return " ON CONFLICT (trade_id) DO NOTHING"
+
+
+def _upsert_trade_journal_batch(items: list, page_size: int = 500) -> int:
+	"""Insert/upsert many journal rows with one execute_values call and one commit."""
+	from pgAdmin_database.db_connection import pg_cursor
+	from psycopg2.extras import execute_values
+
+	with pg_cursor() as (cur, conn):
+		cols, ts_col = _get_trade_journal_cols(cur)
+		insert_cols, rows = _journal_batch_rows(items, cols, ts_col)
+		if not rows:
+			return 0
+		sql = f"INSERT INTO trade_journal ({', '.join(insert_cols)}) VALUES %s"
+		sql += _journal_conflict_clause(cols, insert_cols)
+		execute_values(cur, sql, rows, page_size=page_size)
+		conn.commit()
+	_bump_journal_version()
+	return len(rows)
+
+
+def _copy_trade_journal_batch(items: list) -> int:
+	"""Bulk-load journal rows via COPY into a temp staging table, then one upsert.
+
+	Cheaper than execute_values for multi-thousand row backfills since the server
+	parses CSV instead of a giant VALUES list.
+	"""
+	from pgAdmin_database.db_connection import pg_cursor
+
+	with pg_cursor() as (cur, conn):
+		cols, ts_col = _get_trade_journal_cols(cur)
+		insert_cols, rows = _journal_batch_rows(items, cols, ts_col)
+		if not rows:
+			return 0
+		buf = io.StringIO()
+		csv.writer(buf).writerows(rows)
+		buf.seek(0)
+		cols_sql = ', '.join(insert_cols)
+		# ON COMMIT DROP needs an explicit transaction; pg_cursor hands out
+		# autocommit connections and restores that on the next checkout.
+		conn.autocommit = False
+		cur.execute("CREATE TEMP TABLE trade_journal_staging (LIKE trade_journal INCLUDING DEFAULTS) ON COMMIT DROP")
+		cur.copy_expert(f"COPY trade_journal_staging ({cols_sql}) FROM STDIN WITH (FORMAT CSV)", buf)
+		cur.execute(
+			f"INSERT INTO trade_journal ({cols_sql}) SELECT {cols_sql} FROM trade_journal_staging"
+			+ _journal_conflict_clause(cols, insert_cols)
+		)
+		conn.commit()
+	_bump_journal_version()
+	return len(rows)
+
+
+@app.post('/api/trade-journal/bulk-copy')
+def api_trade_journal_bulk_copy():
+	"""Backfill trade_journal from a JSON array using COPY (same item shape as POST)."""
+	try:
+		data = request.get_json() or []
+		if not isinstance(data, list):
+			return jsonify({"error": "expected a JSON array of trade objects"}), 400
+		for i, item in enumerate(data):
+			err = _journal_item_error(item)
+			if err:
+				return jsonify({"error": f"item {i}: {err}", "index": i}), 400
+		if not _table_ensured:
+			ensure_trade_journal_table()
+		count = _copy_trade_journal_batch(data)
+		access_logger.info("/api/trade-journal/bulk-copy: loaded %d rows", count)
+		return jsonify({"success": True, "count": count})
 	except Exception as e:
-		order_logger.exception("/api/gtt/book failed: %s", e)
+		error_logger.exception("/api/trade-journal/bulk-copy failed: %s", e)
 		return jsonify({"error": str(e)}), 500
 
+
 @app.route('/api/trade-journal', methods=['GET', 'POST', 'PUT'])
 def api_trade_journal():
 	"""Get, create, or update trade journal entries with order book data."""
@@ -2883,7 +4105,20 @@ def api_trade_journal():
 		method = request.method
 		if method == 'POST':
 			data = request.get_json() or {}
+			if isinstance(data, list):
+				# Bulk import: one multi-row upsert and a single commit
+				for i, item in enumerate(data):
+					err = _journal_item_error(item)
+					if err:
+						return jsonify({"error": f"item {i}: {err}", "index": i}), 400
+				if not _table_ensured:
+					ensure_trade_journal_table()
+				count = _upsert_trade_journal_batch(data)
+				access_logger.info("/api/trade-journal POST: bulk upsert of %d rows", count)
+				return jsonify({"success": True, "count": count})
 			trade_id = data.get('trade_id')
+			if not isinstance(data.get('symbol') or '', str):
+				return jsonify({"error": "symbol must be a string"}), 400
 			symbol = (data.get('symbol') or '').strip().upper()
 			ts_val = data.get('timestamp') or data.get('entry_date')
 			side = data.get('side')
@@ -2899,39 +4134,11 @@ def api_trade_journal():
 			if not symbol or not ts_val:
 				return jsonify({"error": "symbol and timestamp (or entry_date) are required"}), 400
 
+			if not _table_ensured:
+				ensure_trade_journal_table()
 			with pg_cursor() as (cur, conn):
-				# Create table if missing (idempotent). Include both columns to be tolerant.
-				cur.execute("""
-					CREATE TABLE IF NOT EXISTS trade_journal (
-						id SERIAL PRIMARY KEY,
-						trade_id TEXT UNIQUE,
-						symbol TEXT NOT NULL,
-						entry_date TIMESTAMP,
-						timestamp TIMESTAMP,
-						side TEXT,
-						order_book_imbalance NUMERIC,
-						intended_entry_price NUMERIC,
-						fill_price NUMERIC,
-						slippage NUMERIC,
-						exit_price NUMERIC,
-						pnl NUMERIC,
-						setup_description TEXT,
-						created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-						updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-						strategy TEXT,
-						status TEXT
-					)
-				""")
-
 				# inspect existing schema so we only include columns that actually exist
-				cur.execute("SELECT column_name FROM information_schema.columns WHERE table_name = 'trade_journal'")
-				cols = {r[0] for r in cur.fetchall()}
-				if 'timestamp' in cols:
-					ts_col = 'timestamp'
-				elif 'entry_date' in cols:
-					ts_col = 'entry_date'
-				else:
-					ts_col = 'entry_date'
+				cols, ts_col = _get_trade_journal_cols(cur)
 
 				# build a mapping of candidate columns to values
 				cand = {
@@ -2974,30 +4181,28 @@ def api_trade_journal():
 						if 'updated_at' in cols:
 							update_sets.append('updated_at = CURRENT_TIMESTAMP')
 						if update_sets:
-							upsert_sql = f"INSERT INTO trade_journal ({cols_sql}) VALUES ({placeholders}) ON CONFLICT (trade_id) DO UPDATE SET {', '.join(update_sets)}"
+							upsert_sql = f"INSERT INTO trade_journal ({cols_sql}) VALUES ({placeholders}) ON CONFLICT (trade_id) DO UPDATE SET {', '.join(update_sets)} RETURNING id"
 						else:
 							# no meaningful update columns; fall back to insert with ON CONFLICT DO NOTHING
-							upsert_sql = f"INSERT INTO trade_journal ({cols_sql}) VALUES ({placeholders}) ON CONFLICT (trade_id) DO NOTHING"
+							upsert_sql = f"INSERT INTO trade_journal ({cols_sql}) VALUES ({placeholders}) ON CONFLICT (trade_id) DO NOTHING RETURNING id"
 						cur.execute(upsert_sql, tuple(insert_vals))
 					else:
 						# simple insert
-						ins_sql = f"INSERT INTO trade_journal ({cols_sql}) VALUES ({placeholders})"
+						ins_sql = f"INSERT INTO trade_journal ({cols_sql}) VALUES ({placeholders}) RETURNING id"
 						cur.execute(ins_sql, tuple(insert_vals))
+					res = cur.fetchone()
+					new_id = res[0] if res else None
 					conn.commit()
+					_bump_journal_version()
 
-					# fetch id of inserted/updated row
-					try:
-						if trade_id:
+					# DO NOTHING returns no row on conflict; look up the existing one
+					if new_id is None and trade_id:
+						try:
 							cur.execute("SELECT id FROM trade_journal WHERE trade_id = %s", (trade_id,))
 							res = cur.fetchone()
 							new_id = res[0] if res else None
-						else:
-							if ts_col in cols:
-								cur.execute(f"SELECT id FROM trade_journal WHERE symbol = %s AND {ts_col} = %s ORDER BY id DESC LIMIT 1", (symbol, ts_val))
-								res = cur.fetchone()
-								new_id = res[0] if res else None
-					except Exception:
-						new_id = None
+						except Exception:
+							new_id = None
 
 			access_logger.info("/api/trade-journal POST: symbol=%s, side=%s", symbol, side)
 			resp = {"success": True, "id": new_id, "symbol": symbol}
@@ -3020,6 +4225,7 @@ def api_trade_journal():
 					(data.get('exit_price'), data.get('pnl'), data.get('exit_date'), trade_id)
 				)
 				conn.commit()
+			_bump_journal_version()
 			access_logger.info("/api/trade-journal PUT: trade_id=%s, pnl=%s", trade_id, data.get('pnl'))
 			return jsonify({"success": True, "trade_id": trade_id})
 
@@ -3036,144 +4242,47 @@ def api_trade_journal():
 				# detect which timestamp-like column exists and use it
 				# inspect schema and pick only columns that actually exist so this endpoint
 				# is tolerant to schema variants (older/newer deployments may lack some cols)
-				cur.execute("SELECT column_name FROM information_schema.columns WHERE table_name = 'trade_journal'")
-				schema_cols = [r[0] for r in cur.fetchall()]
-				if 'timestamp' in schema_cols:
-					ts_col = 'timestamp'
-				elif 'entry_date' in schema_cols:
-					ts_col = 'entry_date'
-				else:
-					ts_col = 'entry_date'
-
-				# Build a tolerant, rich field list from schema_cols so clients get
-				# full trade details when available (entry/exit prices, qty, pnl, etc.).
-				desired = [
-					('id', 'id'),
-					('trade_id', 'trade_id'),
-					('symbol', 'symbol'),
-					# timestamp-like column will be selected as 'timestamp'
-					(ts_col, 'timestamp'),
-					('entry_price', 'entry_price'),
-					('entry_qty', 'entry_qty'),
-					('entry_date', 'entry_date'),
-					('fill_price', 'fill_price'),
-					('intended_entry_price', 'intended_entry_price'),
-					('exit_date', 'exit_date'),
-					('exit_price', 'exit_price'),
-					('pnl', 'pnl'),
-					('pnl_pct', 'pnl_pct'),
-					('duration', 'duration'),
-					('strategy', 'strategy'),
-					('status', 'status'),
-					('notes', 'notes'),
-					('setup_description', 'setup_description'),
-					('order_id', 'order_id'),
-					('side', 'side'),
-					('slippage', 'slippage'),
-					('created_at', 'created_at'),
-					('updated_at', 'updated_at'),
-				]
-
-				# Only include columns that actually exist in the DB schema
-				fields = []
-				for col, alias in desired:
-					if col in schema_cols:
-						if col == ts_col:
-							fields.append(f"{col} AS {alias}")
-						else:
-							fields.append(col)
-
-				# Ensure at least a minimal set exists
-				if not fields:
-					fields = ['id', 'trade_id', 'symbol', f"{ts_col} AS timestamp"]
+				schema_cols, ts_col = _get_trade_journal_cols(cur)
 
-				base_select = "SELECT " + ", ".join(fields) + " FROM trade_journal"
+				base_select, minimal_select = _build_trade_journal_select(schema_cols, ts_col)
 				access_logger.debug("trade_journal schema_cols=%s", schema_cols)
-				access_logger.debug("trade_journal selected fields=%s", fields)
 				access_logger.debug("trade_journal base_select=%s", base_select)
-				# Execute the constructed query; if the database complains about a missing
-				# column (schema mismatch), fall back to a minimal safe select to avoid 500s.
+				# days/limit are bound parameters so the SQL text is stable across
+				# requests (plan reuse) and nothing user-supplied is spliced in.
+				where_clause = ''
+				params = ()
+				if not fetch_all:
+					where_clause = f" WHERE {ts_col} >= NOW() - (INTERVAL '1 day' * %s)"
+					params = (days_back,)
+					if symbol_filter:
+						where_clause = f" WHERE symbol = %s AND {ts_col} >= NOW() - (INTERVAL '1 day' * %s)"
+						params = (symbol_filter, days_back)
+				else:
+					if symbol_filter:
+						where_clause = " WHERE symbol = %s"
+						params = (symbol_filter,)
+				order_limit = f" ORDER BY {ts_col} DESC"
+				if limit:
+					order_limit += " LIMIT %s"
+					params += (limit,)
+
+				# Large result sets are streamed from a server-side cursor so memory
+				# stays at O(itersize) instead of materializing every row twice.
+				if (fetch_all and not limit) or (limit and limit > _JOURNAL_STREAM_MIN_ROWS):
+					selects = (base_select + where_clause + order_limit, minimal_select + where_clause + order_limit)
+					return Response(stream_with_context(_stream_trade_journal(selects, params)), mimetype='application/json')
+
+				# Execute the constructed query; fall back to the minimal select to avoid 500s.
+				_register_dec2float(cur)
 				try:
-					where_clause = ''
-					params = ()
-					if not fetch_all:
-						where_clause = f" WHERE {ts_col} >= NOW() - INTERVAL '{days_back} days'"
-						if symbol_filter:
-							where_clause = f" WHERE symbol = %s AND {ts_col} >= NOW() - INTERVAL '{days_back} days'"
-							params = (symbol_filter,)
-						else:
-							params = ()
-					else:
-						if symbol_filter:
-							where_clause = " WHERE symbol = %s"
-							params = (symbol_filter,)
-					order_limit = f" ORDER BY {ts_col} DESC"
-					if limit:
-						order_limit += f" LIMIT {limit}"
 					cur.execute(base_select + where_clause + order_limit, params)
 				except Exception:
-					# Retry with minimal core fields only (id, trade_id, symbol, timestamp)
-					minimal_fields = [
-						'id', 'trade_id', 'symbol', f"{ts_col} AS ts"
-					]
-					minimal_select = "SELECT " + ", ".join(minimal_fields) + " FROM trade_journal"
-					where_clause = ''
-					params = ()
-					if not fetch_all:
-						where_clause = f" WHERE {ts_col} >= NOW() - INTERVAL '{days_back} days'"
-						if symbol_filter:
-							where_clause = f" WHERE symbol = %s AND {ts_col} >= NOW() - INTERVAL '{days_back} days'"
-							params = (symbol_filter,)
-					else:
-						if symbol_filter:
-							where_clause = " WHERE symbol = %s"
-							params = (symbol_filter,)
-					order_limit = f" ORDER BY {ts_col} DESC"
-					if limit:
-						order_limit += f" LIMIT {limit}"
 					cur.execute(minimal_select + where_clause + order_limit, params)
 				rows = cur.fetchall()
 				cols = [desc[0] for desc in cur.description]
-				trades = [dict(zip(cols, row)) for row in rows]
-
-				# Normalize datetime fields to ISO strings when present
-				dt_fields = {'timestamp', 'entry_date', 'exit_date', 'created_at', 'updated_at'}
-				for trade in trades:
-					for f in list(dt_fields):
-						if f in trade and trade.get(f) is not None:
-							try:
-								trade[f] = trade[f].isoformat()
-							except Exception:
-								# leave as-is if not a datetime
-								pass
-
-				# Coerce numeric-like fields into proper Python numbers for JSON serialization.
-				# Database drivers may return Decimal or numeric strings; ensure they become
-				# floats or ints so the frontend can render and compute correctly.
-				num_float_fields = ('entry_price', 'exit_price', 'pnl', 'pnl_pct', 'intended_entry_price', 'fill_price', 'slippage', 'duration')
-				num_int_fields = ('entry_qty', 'id')
-				for trade in trades:
-					for f in num_float_fields:
-						if f in trade and trade.get(f) is not None:
-							try:
-								trade[f] = float(trade[f])
-							except Exception:
-								# leave value as-is if conversion fails
-								pass
-					for f in num_int_fields:
-						if f in trade and trade.get(f) is not None:
-							try:
-								trade[f] = int(trade[f])
-							except Exception:
-								pass
+				trades = [_trade_journal_row_to_dict(cols, row) for row in rows]
 
-				# Some clients expect explicit 'entry_date' and 'timestamp' names.
-				# If we only selected a single timestamp-like column, ensure both
-				if 'entry_date' not in schema_cols and ts_col in schema_cols:
-					# alias already set to 'timestamp' above
-					pass
-
-				return jsonify(trades)
+				return Response(_json_dumps(trades), mimetype='application/json')
 
 	except Exception as e:
 		error_logger.exception("/api/trade-journal failed: %s", e)
@@ -3209,56 +4318,50 @@ def api_sync_trade_exits():
 	try:
 		kite = get_kite()
 		
-		# First check if trade_journal table exists, if not return early
-		with pg_cursor() as (cur, conn):
-			cur.execute("""
-				SELECT EXISTS (
-					SELECT FROM information_schema.tables 
-					WHERE table_name = 'trade_journal'
-				)
-			""")
-			table_exists = cur.fetchone()[0]
-			
-			if not table_exists:
-				# Table doesn't exist yet, nothing to sync
-				return jsonify({"status": "no trades to sync", "synced_count": 0}), 200
-		
-		# Get all open trades from journal
+		# One connection checkout for both queries; the existence probe is
+		# skipped once ensure_trade_journal_table() has run in this process.
 		with pg_cursor() as (cur, conn):
+			if not _table_ensured:
+				cur.execute("""
+					SELECT EXISTS (
+						SELECT FROM information_schema.tables 
+						WHERE table_name = 'trade_journal'
+					)
+				""")
+				if not cur.fetchone()[0]:
+					# Table doesn't exist yet, nothing to sync
+					return jsonify({"status": "no trades to sync", "synced_count": 0}), 200
+
+			# Get open trades that still need an exit logged
 			cur.execute("""
 				SELECT id, order_id, symbol, entry_qty FROM trade_journal 
-				WHERE status = 'open' AND order_id IS NOT NULL
+				WHERE status = 'open' AND order_id IS NOT NULL AND exit_price IS NULL
 			""")
 			open_trades = cur.fetchall()
-		
-		synced_count = 0
+		if not open_trades:
+			return jsonify({"status": "sync complete", "synced_count": 0}), 200
+
+		# One broker call for the whole sync, indexed by order id
+		try:
+			orders_by_id = {str(o.get('order_id')): o for o in _cached_orders(kite)}
+		except Exception as oe:
+			order_logger.warning("orders() failed during exit sync: %s", oe)
+			orders_by_id = {}
+
+		exits = []
 		for trade_id, order_id, symbol, qty in open_trades:
 			try:
-				# Fetch order details from broker
-				orders = kite.orders() or []
-				matching_order = None
-				for order in orders:
-					if str(order.get('order_id')) == str(order_id):
-						matching_order = order
-						break
-				
+				matching_order = orders_by_id.get(str(order_id))
 				if matching_order and matching_order.get('status') == 'COMPLETE':
-					# Order is complete, check if we logged the exit
-					with pg_cursor() as (cur, conn):
-						cur.execute("""
-							SELECT exit_price FROM trade_journal WHERE id = %s
-						""", (trade_id,))
-						result = cur.fetchone()
-						
-						if result and result[0] is None:  # No exit price yet
-							# Get fill price from order
-							fill_price = float(matching_order.get('average_price', 0))
-							if fill_price > 0:
-								_log_trade_exit(order_id, symbol, fill_price, qty, 'synced')
-								synced_count += 1
+					# Get fill price from order
+					fill_price = float(matching_order.get('average_price', 0))
+					if fill_price > 0:
+						exits.append((order_id, symbol, fill_price, qty))
 			except Exception as e:
 				order_logger.warning("Error syncing order %s: %s", order_id, e)
 				continue
+
+		synced_count = _log_trade_exits_batch(exits, 'synced')
 		
 		return jsonify({"status": "sync complete", "synced_count": synced_count}), 200
 	
@@ -3266,6 +4369,46 @@ def api_sync_trade_exits():
 		order_logger.error("Failed to sync exits: %s", e)
 		return jsonify({"error": str(e)}), 500
 
+@functools.lru_cache(maxsize=2)
+def _build_trade_journal_stats_sql(ts_col: str) -> str:
+	"""Windowed stats SQL (days bound as a parameter), built once per ts column."""
+	# Single pass: each predicate is evaluated once via FILTER; the win rate
+	# is derived in Python so an empty window can't divide by zero.
+	return f"""
+		SELECT 
+			COUNT(*) AS total_trades,
+			COUNT(*) FILTER (WHERE pnl > 0) AS winning_trades,
+			COUNT(*) FILTER (WHERE pnl <= 0) AS losing_trades,
+			ROUND(CAST(COALESCE(SUM(pnl), 0) AS NUMERIC), 2) AS total_pnl,
+			ROUND(CAST(AVG(pnl) AS NUMERIC), 2) AS avg_pnl,
+			ROUND(CAST(MAX(pnl) AS NUMERIC), 2) AS max_win,
+			ROUND(CAST(MIN(pnl) AS NUMERIC), 2) AS max_loss
+		FROM trade_journal
+		WHERE {ts_col} >= NOW() - make_interval(days => %s)
+	"""
+
+
+def _trade_journal_stats_response(cur, symbol_filter):
+	"""Build the stats JSON from an executed aggregate query on `cur`."""
+	row = cur.fetchone()
+	cols = [desc[0] for desc in cur.description]
+	stats = dict(zip(cols, row)) if row else {}
+	total = int(stats.get('total_trades') or 0)
+	if not total:
+		return jsonify({
+			"total_trades": 0,
+			"winning_trades": 0,
+			"losing_trades": 0,
+			"win_rate_pct": 0,
+			"total_pnl": 0,
+			"avg_pnl": 0,
+			"max_win": 0,
+			"max_loss": 0
+		})
+	stats['win_rate_pct'] = round(100.0 * int(stats.get('winning_trades') or 0) / total, 2)
+	stats['symbol'] = symbol_filter if symbol_filter else 'Overall'
+	return _jsonify(stats)
+
 @app.route('/api/trade-journal/stats', methods=['GET'])
 def api_trade_journal_stats():
 	"""Get trade journal statistics (win rate, avg PnL, etc)."""
@@ -3276,167 +4419,125 @@ def api_trade_journal_stats():
 		days_back = int(request.args.get('days', 30))
 		
 		with pg_cursor() as (cur, conn):
+			if days_back == _STATS_VIEW_DAYS and _stats_view_ready:
+				# Pre-aggregated per symbol; refreshed every _STATS_VIEW_REFRESH_SECONDS
+				if symbol_filter:
+					cur.execute("""
+						SELECT total_trades, winning_trades, losing_trades,
+							ROUND(CAST(total_pnl AS NUMERIC), 2) AS total_pnl,
+							ROUND(CAST(total_pnl / NULLIF(pnl_count, 0) AS NUMERIC), 2) AS avg_pnl,
+							ROUND(CAST(max_win AS NUMERIC), 2) AS max_win,
+							ROUND(CAST(max_loss AS NUMERIC), 2) AS max_loss
+						FROM trade_journal_stats_30d
+						WHERE symbol = %s
+					""", (symbol_filter,))
+				else:
+					cur.execute("""
+						SELECT CAST(COALESCE(SUM(total_trades), 0) AS BIGINT) AS total_trades,
+							CAST(COALESCE(SUM(winning_trades), 0) AS BIGINT) AS winning_trades,
+							CAST(COALESCE(SUM(losing_trades), 0) AS BIGINT) AS losing_trades,
+							ROUND(CAST(COALESCE(SUM(total_pnl), 0) AS NUMERIC), 2) AS total_pnl,
+							ROUND(CAST(SUM(total_pnl) / NULLIF(SUM(pnl_count), 0) AS NUMERIC), 2) AS avg_pnl,
+							ROUND(CAST(MAX(max_win) AS NUMERIC), 2) AS max_win,
+							ROUND(CAST(MIN(max_loss) AS NUMERIC), 2) AS max_loss
+						FROM trade_journal_stats_30d
+					""")
+				return _trade_journal_stats_response(cur, symbol_filter)
+
+			_, ts_col = _get_trade_journal_cols(cur)
+			sql = _build_trade_journal_stats_sql(ts_col)
 			if symbol_filter:
-				cur.execute("""
-					SELECT 
-						COUNT(*) as total_trades,
-						COUNT(CASE WHEN pnl > 0 THEN 1 END) as winning_trades,
-						COUNT(CASE WHEN pnl <= 0 THEN 1 END) as losing_trades,
-						ROUND(CAST(COUNT(CASE WHEN pnl > 0 THEN 1 END) AS FLOAT) / COUNT(*) * 100, 2) as win_rate_pct,
-						ROUND(CAST(COALESCE(SUM(pnl), 0) AS NUMERIC), 2) as total_pnl,
-						ROUND(CAST(AVG(pnl) AS NUMERIC), 2) as avg_pnl,
-						ROUND(CAST(MAX(pnl) AS NUMERIC), 2) as max_win,
-						ROUND(CAST(MIN(pnl) AS NUMERIC), 2) as max_loss,
-						symbol
-					FROM trade_journal
-					WHERE symbol = %s AND timestamp >= NOW() - INTERVAL '%s days'
-					GROUP BY symbol
-				""", (symbol_filter, days_back))
+				cur.execute(sql + " AND symbol = %s", (days_back, symbol_filter))
 			else:
-				cur.execute("""
-					SELECT 
-						COUNT(*) as total_trades,
-						COUNT(CASE WHEN pnl > 0 THEN 1 END) as winning_trades,
-						COUNT(CASE WHEN pnl <= 0 THEN 1 END) as losing_trades,
-						ROUND(CAST(COUNT(CASE WHEN pnl > 0 THEN 1 END) AS FLOAT) / COUNT(*) * 100, 2) as win_rate_pct,
-						ROUND(CAST(COALESCE(SUM(pnl), 0) AS NUMERIC), 2) as total_pnl,
-						ROUND(CAST(AVG(pnl) AS NUMERIC), 2) as avg_pnl,
-						ROUND(CAST(MAX(pnl) AS NUMERIC), 2) as max_win,
-						ROUND(CAST(MIN(pnl) AS NUMERIC), 2) as max_loss,
-						'Overall' as symbol
-					FROM trade_journal
-					WHERE timestamp >= NOW() - INTERVAL '%s days'
-				""", (days_back,))
-			
-			row = cur.fetchone()
-			if row:
-				cols = [desc[0] for desc in cur.description]
-				stats = dict(zip(cols, row))
-				return jsonify(stats)
-			else:
-				return jsonify({
-					"total_trades": 0,
-					"winning_trades": 0,
-					"losing_trades": 0,
-					"win_rate_pct": 0,
-					"total_pnl": 0,
-					"avg_pnl": 0,
-					"max_win": 0,
-					"max_loss": 0
-				})
+				cur.execute(sql, (days_back,))
+			return _trade_journal_stats_response(cur, symbol_filter)
 	
 	except Exception as e:
 		error_logger.exception("/api/trade-journal/stats failed: %s", e)
 		return jsonify({"error": str(e)}), 500
 
 
-	@app.route('/api/trade-journal/min', methods=['GET'])
-	def api_trade_journal_min():
-		"""Minimal, tolerant read of trade_journal: returns id, trade_id, symbol, timestamp.
-		Use this when the richer `/api/trade-journal` fails due to schema mismatches.
-		Query param: days (int, default 30), symbol (optional)
-		"""
-		try:
-			days_back = int(request.args.get('days', 30))
-			symbol_filter = (request.args.get('symbol') or '').strip().upper() or None
-			from pgAdmin_database.db_connection import pg_cursor
-			with pg_cursor() as (cur, conn):
-				# ensure table exists
-				cur.execute("SELECT EXISTS (SELECT FROM information_schema.tables WHERE table_name = 'trade_journal')")
-				if not cur.fetchone()[0]:
-					return jsonify([])
-
-				# coalesce timestamp-like columns into a single column
-				# Use explicit SQL to avoid referencing missing columns
-				sql_where = f"COALESCE(timestamp, entry_date) >= NOW() - INTERVAL '{days_back} days'"
-				if symbol_filter:
-					cur.execute(f"SELECT id, trade_id, symbol, COALESCE(timestamp, entry_date) AS ts FROM trade_journal WHERE symbol = %s AND {sql_where} ORDER BY ts DESC", (symbol_filter,))
-				else:
-					cur.execute(f"SELECT id, trade_id, symbol, COALESCE(timestamp, entry_date) AS ts FROM trade_journal WHERE {sql_where} ORDER BY ts DESC")
-				rows = cur.fetchall()
-				cols = [desc[0] for desc in cur.description]
-				trades = [dict(zip(cols, row)) for row in rows]
-				for t in trades:
-					if t.get('ts'):
-						t['timestamp'] = t.pop('ts').isoformat() if hasattr(t['ts'], 'isoformat') else t.pop('ts')
-				return jsonify(trades)
-		except Exception as e:
-			error_logger.exception("/api/trade-journal/min failed: %s", e)
-			return jsonify({"error": str(e)}), 500
+@app.route('/api/trade-journal/min', methods=['GET'])
+def api_trade_journal_min():
+	"""Minimal, tolerant read of trade_journal: returns id, trade_id, symbol, timestamp.
+	Use this when the richer `/api/trade-journal` fails due to schema mismatches.
+	Query param: days (int, default 30), symbol (optional)
+	"""
+	try:
+		days_back = int(request.args.get('days', 30))
+		symbol_filter = (request.args.get('symbol') or '').strip().upper() or None
+		key = (symbol_filter, days_back)
+		version, cached = _min_cache_get(key)
+		if cached is not None:
+			return Response(cached, mimetype='application/json')
+		from pgAdmin_database.db_connection import pg_cursor
+		with pg_cursor() as (cur, conn):
+			# ensure table exists
+			cur.execute("SELECT EXISTS (SELECT FROM information_schema.tables WHERE table_name = 'trade_journal')")
+			if not cur.fetchone()[0]:
+				return jsonify([])
+
+			# coalesce timestamp-like columns into a single column
+			# Use explicit SQL to avoid referencing missing columns
+			sql_where = "COALESCE(timestamp, entry_date) >= NOW() - (INTERVAL '1 day' * %s)"
+			if symbol_filter:
+				cur.execute(f"SELECT id, trade_id, symbol, COALESCE(timestamp, entry_date) AS ts FROM trade_journal WHERE symbol = %s AND {sql_where} ORDER BY ts DESC", (symbol_filter, days_back))
+			else:
+				cur.execute(f"SELECT id, trade_id, symbol, COALESCE(timestamp, entry_date) AS ts FROM trade_journal WHERE {sql_where} ORDER BY ts DESC", (days_back,))
+			rows = cur.fetchall()
+			cols = [desc[0] for desc in cur.description]
+			trades = [dict(zip(cols, row)) for row in rows]
+			for t in trades:
+				if t.get('ts'):
+					t['timestamp'] = t.pop('ts')
+			body = _json_dumps(trades)
+			# skipped if a write landed while we were querying
+			_min_cache_put(key, version, body)
+			return Response(body, mimetype='application/json')
+	except Exception as e:
+		error_logger.exception("/api/trade-journal/min failed: %s", e)
+		return jsonify({"error": str(e)}), 500
 
 # --------- DEBUG ENDPOINTS FOR TROUBLESHOOTING MISSING DATA ---------
 
+# Fields reported by /api/debug/missing-data (in response order) and the
+# subset that must be fully populated for status "OK".
+_DEBUG_MISSING_FIELDS = (
+	'drawdown_15m_200_pct',
+	'pullback_15m_200_pct',
+	'days_since_golden_cross',
+	'sma200_15m',
+	'sma50_15m',
+	'last_close',
+)
+_DEBUG_REQUIRED_FIELDS = ('drawdown_15m_200_pct', 'pullback_15m_200_pct', 'days_since_golden_cross')
+
+
 @app.route('/api/debug/missing-data', methods=['GET'])
 def debug_missing_data():
 	"""Show which symbols are missing specific data fields."""
 	try:
-		data = fetch_ltp()
-		
-		missing_drawdown = []
-		missing_pullback = []
-		missing_days_gc = []
-		missing_sma15m = []
-		missing_sma50_15m = []
-		missing_high200 = []
-		missing_low200 = []
-		missing_last_close = []
-		
-		for sym, values in data.items():
-			if values.get('drawdown_15m_200_pct') is None:
-				missing_drawdown.append(sym)
-			if values.get('pullback_15m_200_pct') is None:
-				missing_pullback.append(sym)
-			if values.get('days_since_golden_cross') is None:
-				missing_days_gc.append(sym)
-			if values.get('sma200_15m') is None:
-				missing_sma15m.append(sym)
-			if values.get('sma50_15m') is None:
-				missing_sma50_15m.append(sym)
-			# high200 is calculated from cache, so check for None
-			if values.get('sma200_15m') is None or values.get('last_price') is None:
-				missing_high200.append(sym)
-			if values.get('sma200_15m') is None or values.get('last_price') is None:
-				missing_low200.append(sym)
-			if values.get('last_close') is None:
-				missing_last_close.append(sym)
-		
-		total_symbols = len(data)
+		# Scan one column at a time over the fetch_ltp() snapshot rather than
+		# running every None check against each per-symbol dict.
+		fields = _DEBUG_MISSING_FIELDS
+		symbols, columns = ltp_as_columns(fields)
+		missing = {
+			f: [sym for sym, v in zip(symbols, columns[f]) if v is None]
+			for f in fields
+		}
+		total_symbols = len(symbols)
 		
 		return jsonify({
 			"total_symbols": total_symbols,
 			"missing_fields": {
-				"drawdown_15m_200_pct": {
-					"count": len(missing_drawdown),
-					"percentage": round(100 * len(missing_drawdown) / total_symbols, 1),
-					"first_20_symbols": sorted(missing_drawdown)[:20]
-				},
-				"pullback_15m_200_pct": {
-					"count": len(missing_pullback),
-					"percentage": round(100 * len(missing_pullback) / total_symbols, 1),
-					"first_20_symbols": sorted(missing_pullback)[:20]
-				},
-				"days_since_golden_cross": {
-					"count": len(missing_days_gc),
-					"percentage": round(100 * len(missing_days_gc) / total_symbols, 1),
-					"first_20_symbols": sorted(missing_days_gc)[:20]
-				},
-				"sma200_15m": {
-					"count": len(missing_sma15m),
-					"percentage": round(100 * len(missing_sma15m) / total_symbols, 1),
-					"first_20_symbols": sorted(missing_sma15m)[:20]
-				},
-				"sma50_15m": {
-					"count": len(missing_sma50_15m),
-					"percentage": round(100 * len(missing_sma50_15m) / total_symbols, 1),
-					"first_20_symbols": sorted(missing_sma50_15m)[:20]
-				},
-				"last_close": {
-					"count": len(missing_last_close),
-					"percentage": round(100 * len(missing_last_close) / total_symbols, 1),
-					"first_20_symbols": sorted(missing_last_close)[:20]
+				f: {
+					"count": len(missing[f]),
+					"percentage": round(100 * len(missing[f]) / total_symbols, 1) if total_symbols else 0.0,
+					"first_20_symbols": sorted(missing[f])[:20]
 				}
+				for f in fields
 			},
-			"status": "OK" if all([len(x) == 0 for x in [missing_drawdown, missing_pullback, missing_days_gc]]) else "INCOMPLETE"
+			"status": "OK" if not any(missing[f] for f in _DEBUG_REQUIRED_FIELDS) else "INCOMPLETE"
 		})
 	except Exception as e:
 		error_logger.exception("debug_missing_data failed: %s", e)
@@ -3526,9 +4627,9 @@ try:
 	register_strategy_routes(app)
 	logging.getLogger("momentum_strategy").info("Momentum strategy routes registered")
 except ImportError as e:
-	logging.warning(f"Could not import momentum_strategy: {e}")
+	logging.warning("Could not import momentum_strategy: %s", e)
 except Exception as e:
-	logging.warning(f"Failed to register momentum strategy routes: {e}")
+	logging.warning("Failed to register momentum strategy routes: %s", e)
 
 if __name__ == "__main__":
 	# Use 5050 default to avoid macOS AirPlay occupying 5000
@@ -3542,5 +4643,6 @@ if __name__ == "__main__":
 	if host != '127.0.0.1':
 		logging.warning("⚠️  FLASK LISTENING ON %s - EXPOSED TO NETWORK", host)
 	
+	ensure_trade_journal_table()
 	app.run(host=host, port=port, debug=debug_mode)
 
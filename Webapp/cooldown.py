@@ -1,5 +1,6 @@
 from datetime import datetime
 import threading
+import time
 from typing import Tuple, Optional
 
 # Centralized per-symbol cooldown store used by API and strategy.
@@ -7,8 +8,16 @@ from typing import Tuple, Optional
 # - record(symbol: str) -> None
 # - is_allowed(symbol: str, cooldown_seconds: int = 180) -> Tuple[bool, Optional[int]]
 
-_lock = threading.RLock()
+# Guards writes (record/prune) so the two maps stay in step; is_allowed reads
+# _last_stop_mono without it, a single dict lookup being atomic under the GIL.
+_lock = threading.Lock()
 _last_stop_ts: dict[str, datetime] = {}
+# Monotonic record times used for the cooldown arithmetic; the wall-clock map
+# above is kept only for logging/reporting via get_last_timestamp().
+_last_stop_mono: dict[str, float] = {}
+# Entries older than this are dropped lazily when looked up, well past any
+# cooldown callers use, so the maps don't grow with the session's trade history.
+_PRUNE_AFTER_SECONDS = 3600
 
 
 def record(symbol: str) -> None:
@@ -17,6 +26,7 @@ def record(symbol: str) -> None:
         return
     with _lock:
         _last_stop_ts[symbol] = datetime.now()
+        _last_stop_mono[symbol] = time.monotonic()
 
 
 def is_allowed(symbol: str, cooldown_seconds: int = 600) -> Tuple[bool, Optional[int]]:
@@ -25,12 +35,18 @@ def is_allowed(symbol: str, cooldown_seconds: int = 600) -> Tuple[bool, Optional
     allowed is True when no recent stop within cooldown_seconds. If False, remaining_seconds
     is how many seconds left before entry is permitted.
     """
-    with _lock:
-        ts = _last_stop_ts.get(symbol)
-    if not ts:
+    ts = _last_stop_mono.get(symbol)
+    if ts is None:
+        return True, None
+    elapsed = time.monotonic() - ts
+    if elapsed > _PRUNE_AFTER_SECONDS and elapsed > cooldown_seconds:
+        with _lock:
+            # re-check: record() may have refreshed the entry meanwhile
+            if _last_stop_mono.get(symbol) == ts:
+                _last_stop_mono.pop(symbol, None)
+                _last_stop_ts.pop(symbol, None)
         return True, None
-    delta = datetime.now() - ts
-    rem = cooldown_seconds - int(delta.total_seconds())
+    rem = cooldown_seconds - int(elapsed)
     if rem <= 0:
         return True, None
     return False, rem
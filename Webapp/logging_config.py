@@ -3,15 +3,21 @@
 Provides:
 - setup_logging(level) -> configures root logger, console and per-component file handlers
 - get_logger(name, filename) -> convenience to obtain a logger that writes to date-based foldered files
+  (via a QueueHandler; a background QueueListener does the file I/O)
 
 Log files will be created under ./logs/YYYY-MM-DD/<filename> and rotated daily by the handler logic.
 """
 from __future__ import annotations
 
+import atexit
 import logging
 import os
-from datetime import datetime
+import queue
+import threading
+import time
+from datetime import datetime, timedelta
 from logging import Handler
+from logging.handlers import QueueHandler, QueueListener
 from typing import Optional
 
 REPO_ROOT = os.path.dirname(os.path.dirname(__file__))
@@ -19,42 +25,72 @@ LOG_BASE_DIR = os.path.join(REPO_ROOT, 'logs')
 os.makedirs(LOG_BASE_DIR, exist_ok=True)
 
 
-def _get_date_log_dir() -> str:
-    today = datetime.now().strftime('%Y-%m-%d')
+def _get_date_log_dir(today: Optional[str] = None) -> str:
+    if today is None:
+        today = datetime.now().strftime('%Y-%m-%d')
     date_dir = os.path.join(LOG_BASE_DIR, today)
     os.makedirs(date_dir, exist_ok=True)
     return date_dir
 
 
+def _next_midnight_ts(now: datetime) -> float:
+    """Unix timestamp of the next local midnight after `now`."""
+    tomorrow = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return tomorrow.timestamp()
+
+
 class DateFolderFileHandler(logging.FileHandler):
     """File handler that writes into date-based subfolders and rolls file path when date changes."""
+    # Date folder already created by some handler; sibling handlers rolling
+    # over at the same midnight skip the makedirs.
+    _dir_ready_date: Optional[str] = None
+    _dir_lock = threading.Lock()
+
     def __init__(self, filename: str, mode: str = 'a', encoding: Optional[str] = 'utf-8') -> None:
         self.base_filename = filename
         self._current_date = None
+        # Date string and folder only change at midnight; until then emit()
+        # just compares the record's timestamp against this boundary.
+        self._next_rollover_ts = 0.0
         # set initial path
         self._update_stream()
         super().__init__(self._get_current_path(), mode=mode, encoding=encoding)
 
-    def _get_current_path(self) -> str:
-        return os.path.join(_get_date_log_dir(), self.base_filename)
+    @classmethod
+    def _ensure_dir_once(cls, today: Optional[str]) -> str:
+        if today is not None and cls._dir_ready_date == today:
+            return os.path.join(LOG_BASE_DIR, today)
+        with cls._dir_lock:
+            date_dir = _get_date_log_dir(today)
+            cls._dir_ready_date = today
+            return date_dir
 
-    def _update_stream(self) -> bool:
-        today = datetime.now().strftime('%Y-%m-%d')
+    def _get_current_path(self) -> str:
+        return os.path.join(self._ensure_dir_once(self._current_date), self.base_filename)
+
+    def _update_stream(self, now_ts: Optional[float] = None) -> bool:
+        if (time.time() if now_ts is None else now_ts) < self._next_rollover_ts:
+            return False
+        now = datetime.now()
+        self._next_rollover_ts = _next_midnight_ts(now)
+        today = now.strftime('%Y-%m-%d')
         if self._current_date != today:
             self._current_date = today
             return True
         return False
 
     def emit(self, record: logging.LogRecord) -> None:
-        if self._update_stream():
+        # record.created is the wall-clock time the record was made; reusing it
+        # saves a clock read per record on the fast path
+        if self._update_stream(record.created):
             # switch file
             try:
                 if getattr(self, 'stream', None):
                     self.stream.close()
             except Exception:
                 pass
+            # _get_current_path() creates the new date folder
             self.baseFilename = self._get_current_path()
-            os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
             self.stream = self._open()
         super().emit(record)
 
@@ -85,9 +121,31 @@ def setup_logging(level: str | int = logging.INFO) -> None:
     logging.getLogger('werkzeug').setLevel(logging.INFO)
 
 
+# One QueueListener per get_logger() file handler. Callers only enqueue the
+# record; the listener thread does the formatting and the file write.
+_LISTENERS: list = []
+# filename -> (queue, file handler). Loggers sharing a file share its handler
+# and listener, so one thread owns each file's stream.
+_FILE_QUEUES: dict = {}
+_FILE_QUEUES_LOCK = threading.Lock()
+
+
+@atexit.register
+def _stop_listeners() -> None:
+    # drains each queue before returning, so records logged at exit still land
+    for listener in _LISTENERS:
+        try:
+            listener.stop()
+        except Exception:
+            pass
+
+
 def get_logger(name: str, filename: str, level: Optional[int] = None) -> logging.Logger:
     """Return a logger writing to a date-foldered file named `filename`.
 
+    The file is written from a background QueueListener thread, so logging
+    calls on request threads do not block on disk I/O.
+
     Example: get_logger('access', 'access.log')
     """
     logger = logging.getLogger(name)
@@ -98,10 +156,24 @@ def get_logger(name: str, filename: str, level: Optional[int] = None) -> logging
         level = logging.INFO
     logger.setLevel(level)
 
-    fh = DateFolderFileHandler(filename)
-    fh.setLevel(level)
-    fh.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s - %(message)s'))
-    logger.addHandler(fh)
+    with _FILE_QUEUES_LOCK:
+        entry = _FILE_QUEUES.get(filename)
+        if entry is None:
+            fh = DateFolderFileHandler(filename)
+            fh.setLevel(level)
+            fh.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s - %(message)s'))
+            log_queue: queue.Queue = queue.Queue(-1)
+            listener = QueueListener(log_queue, fh, respect_handler_level=True)
+            listener.start()
+            _LISTENERS.append(listener)
+            entry = _FILE_QUEUES[filename] = (log_queue, fh)
+        log_queue, fh = entry
+        # each logger's QueueHandler applies its own level
+        if level < fh.level:
+            fh.setLevel(level)
+    qh = QueueHandler(log_queue)
+    qh.setLevel(level)
+    logger.addHandler(qh)
 
     # Also propagate to root so console shows important messages
     logger.propagate = True
@@ -6,11 +6,15 @@ from __future__ import annotations
 
 import os
 import sys
+import functools
 import importlib.util
 import logging
 import threading
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
+from itertools import islice
 from typing import Dict, List, Any, Optional
 from src.ranking import calculate_acceleration, calculate_rank_final  # type: ignore
 
@@ -63,53 +67,118 @@ _daily_ma_cache: Dict[str, Dict[str, Any]] = {}
 _daily_ma_lock = threading.RLock()
 _daily_ma_thread_started = False
 
-_sma15m_cache: Dict[str, float] = {}
-_sma50_15m_cache: Dict[str, float] = {}
-_high200_15m_cache: Dict[str, float] = {}
-_low200_15m_cache: Dict[str, float] = {}
+# Parallel per-symbol 15m metrics, all refreshed together under _sma15m_lock
+_sma15m_cache: Dict[str, Optional[float]] = {}
+_sma50_15m_cache: Dict[str, Optional[float]] = {}
+_high200_15m_cache: Dict[str, Optional[float]] = {}
+_low200_15m_cache: Dict[str, Optional[float]] = {}
 _last15m_close_cache: Dict[str, float] = {}
 _rsi15m_cache: Dict[str, float] = {}
 _sma15m_last_ts: Optional[datetime] = None
+_sma15m_last_mono = float('-inf')  # time.monotonic() of last refresh, for the TTL
 _sma15m_lock = threading.RLock()
 
 # LTP API Request Caching (2-second TTL to prevent rate limiting)
 _ltp_cache: Dict[str, Any] = {}
-_ltp_cache_ts: Optional[datetime] = None
+_ltp_cache_mono = float('-inf')  # time.monotonic() of last fill
 _ltp_cache_lock = threading.RLock()
 _LTP_CACHE_TTL = 2  # seconds
 
 # Daily volume ratio cache: avg(5d volume) / avg(200d volume)
 _volratio_cache: Dict[str, float] = {}
 _volratio_last_ts: Optional[datetime] = None
+_volratio_last_mono = float('-inf')  # time.monotonic() of last refresh, for the TTL
 _volratio_lock = threading.RLock()
 
 # Daily simple moving averages cache (5,8,10 day)
 _daily_avg_cache: Dict[str, Dict[str, Optional[float]]] = {}
 _daily_avg_last_ts: Optional[datetime] = None
+_daily_avg_last_mono = float('-inf')  # time.monotonic() of last refresh, for the TTL
 _daily_avg_lock = threading.RLock()
 
 # Days since last Golden Cross (SMA50 crossed above SMA200) per symbol
 _days_since_gc_cache: Dict[str, Optional[int]] = {}
 _days_since_gc_last_ts: Optional[datetime] = None
+_days_since_gc_last_mono = float('-inf')  # time.monotonic() of last refresh, for the TTL
 _days_since_gc_lock = threading.RLock()
 
 # Support/Resistance cache
 _sr_cache: Dict[str, Dict[str, Any]] = {}
 _sr_last_ts: Optional[datetime] = None
+_sr_last_mono = float('-inf')  # time.monotonic() of last refresh, for the TTL
 _sr_lock = threading.RLock()
 
 # VCP (Volatility Contraction Pattern) cache
 _vcp_cache: Dict[str, Dict[str, Any]] = {}
 _vcp_last_ts: Optional[datetime] = None
+_vcp_last_mono = float('-inf')  # time.monotonic() of last refresh, for the TTL
 _vcp_lock = threading.RLock()
+# Per-symbol (newest candle ts, candle count, window close sum, window volume
+# sum) behind each cached VCP result; rebuilt on every pass by the
+# single-flighted refresh, so symbols leaving the universe drop out
+_vcp_input_keys: Dict[str, tuple] = {}
 
 # Small cache to keep previous Rank_GM per-symbol for acceleration calc
+# Entries are independent per symbol, so access is striped by symbol hash
 _rank_gm_cache: Dict[str, float] = {}
-_rank_gm_lock = threading.RLock()
+_RANK_GM_STRIPES = 32
+_rank_gm_locks = [threading.Lock() for _ in range(_RANK_GM_STRIPES)]
+
+
+def _rank_gm_stripe(sym: str) -> threading.Lock:
+    return _rank_gm_locks[hash(sym) % _RANK_GM_STRIPES]
 
 DAILY_REFRESH_SECONDS = 3600  # recompute daily MAs at most once per hour
 FIFTEEN_MIN_REFRESH_SECONDS = 60  # recompute 15m SMA200 at most once per minute
 
+# Refreshes currently running, by function name. Callers arriving while one is
+# in flight wait for it instead of repeating the same DB scan.
+_refresh_in_progress: Dict[str, threading.Event] = {}
+_refresh_guard = threading.Lock()
+
+
+# test_connection() result, reused for _DB_CHECK_TTL seconds as (monotonic ts, ok)
+_DB_CHECK_TTL = 30.0
+_db_check: tuple = (float('-inf'), False)
+
+
+def _db_available() -> bool:
+    """test_connection() memoized for _DB_CHECK_TTL so refreshes don't ping per call."""
+    global _db_check
+    ts, ok = _db_check
+    now = time.monotonic()
+    if now - ts < _DB_CHECK_TTL:
+        return ok
+    ok = bool(test_connection())
+    _db_check = (now, ok)
+    return ok
+
+
+def _single_flight(func):
+    """Let only one thread run a `_refresh_*_if_needed` at a time.
+
+    Threads that find a run in progress wait for it to finish and return;
+    the caches (and the refresh timestamp) are up to date by then.
+    """
+    key = func.__name__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with _refresh_guard:
+            running = _refresh_in_progress.get(key)
+            if running is None:
+                done = _refresh_in_progress[key] = threading.Event()
+        if running is not None:
+            running.wait()
+            return None
+        try:
+            return func(*args, **kwargs)
+        finally:
+            with _refresh_guard:
+                _refresh_in_progress.pop(key, None)
+            done.set()
+    return wrapper
+
 
 def load_params() -> Dict[str, Any]:
     if yaml is None:
@@ -121,8 +190,16 @@ def load_params() -> Dict[str, Any]:
 
 
 def load_symbol_list(universe_list_name: str) -> List[str]:
-    if not os.path.exists(NIFTY_SYMBOL_PATH):
+    try:
+        mtime_ns = os.stat(NIFTY_SYMBOL_PATH).st_mtime_ns
+    except OSError:
         raise FileNotFoundError(f"NiftySymbol.py not found at {NIFTY_SYMBOL_PATH}")
+    # NiftySymbol.py is only re-executed when it changes on disk
+    return list(_load_symbol_list_cached(universe_list_name, mtime_ns))
+
+
+@functools.lru_cache(maxsize=16)
+def _load_symbol_list_cached(universe_list_name: str, mtime_ns: int) -> tuple:
     spec = importlib.util.spec_from_file_location("NiftySymbol", NIFTY_SYMBOL_PATH)
     module = importlib.util.module_from_spec(spec)  # type: ignore
     assert spec and spec.loader
@@ -130,41 +207,89 @@ def load_symbol_list(universe_list_name: str) -> List[str]:
     if not hasattr(module, universe_list_name):
         raise AttributeError(f"Universe '{universe_list_name}' not found in NiftySymbol.py")
     symbols = getattr(module, universe_list_name)
-    return [str(s).strip() for s in symbols]
+    return tuple(str(s).strip() for s in symbols)
+
+
+# Process-wide KiteConnect client as (epoch, client); see get_kite().
+_kite_client: Optional[tuple] = None
+_kite_client_lock = threading.Lock()
 
 
 def get_kite() -> Any:
+    """Return the shared KiteConnect client.
+
+    One client serves every thread and is rebuilt only when KITE_API_KEY or
+    token.txt change (the access token is rewritten daily by auth.py), so
+    repeat calls cost a stat() instead of a file read and a new HTTP session.
+    """
+    global _kite_client
     if KiteConnect is None:
         raise RuntimeError("kiteconnect module not available (ensure local 'kiteconnect' package or pip install).")
     api_key = os.getenv("KITE_API_KEY")
     if not api_key:
         raise RuntimeError("KITE_API_KEY env not set. Add to .env or export before running.")
-    if not os.path.exists(TOKEN_PATH):
+    try:
+        st = os.stat(TOKEN_PATH)
+    except OSError:
         raise RuntimeError("Access token file missing. Run Core_files/auth.py to generate token.txt.")
-    with open(TOKEN_PATH, "r") as f:
-        access_token = f.read().strip()
-    kite = KiteConnect(api_key=api_key)
-    kite.set_access_token(access_token)
-    return kite
+    epoch = (api_key, st.st_mtime_ns, st.st_size)
+    cached = _kite_client
+    if cached is not None and cached[0] == epoch:
+        return cached[1]
+    with _kite_client_lock:
+        cached = _kite_client
+        if cached is not None and cached[0] == epoch:
+            return cached[1]
+        with open(TOKEN_PATH, "r") as f:
+            token = f.read().strip()
+        kite = KiteConnect(api_key=api_key)
+        kite.set_access_token(token)
+        _kite_client = (epoch, kite)
+        return kite
 
 
 def build_ltp_query(symbols: List[str]) -> Dict[str, str]:
-    result: Dict[str, str] = {}
-    for s in symbols:
-        result[s] = f"NSE:{s}"
-    return result
+    """Map symbol -> "NSE:<symbol>". The dict is cached per universe; don't mutate it."""
+    return _build_ltp_query_cached(tuple(symbols))
+
+
+@functools.lru_cache(maxsize=8)
+def _build_ltp_query_cached(symbols: tuple) -> Dict[str, str]:
+    return {s: "NSE:" + s for s in symbols}
 
 
 def _load_instrument_tokens(csv_path: str) -> Dict[str, int]:
+    """Map tradingsymbol -> instrument_token from instruments.csv.
+
+    The parsed mapping is cached per (path, mtime, size) and shared between
+    callers, so treat it as read-only.
+    """
+    try:
+        st = os.stat(csv_path)
+    except OSError:
+        return {}
+    return _load_tokens_cached(csv_path, st.st_mtime_ns, st.st_size)
+
+
+@functools.lru_cache(maxsize=4)
+def _load_tokens_cached(csv_path: str, mtime_ns: int, size: int) -> Dict[str, int]:
     mapping: Dict[str, int] = {}
-    if not os.path.exists(csv_path):
-        return mapping
     import csv as _csv
     with open(csv_path, 'r', newline='', encoding='utf-8') as f:
-        reader = _csv.DictReader(f)
+        # plain reader + header positions: no dict built per row
+        reader = _csv.reader(f)
+        header = next(reader, None) or []
+        try:
+            ts_i = header.index('tradingsymbol')
+            tok_i = header.index('instrument_token')
+        except ValueError:
+            return mapping
+        width = max(ts_i, tok_i)
         for row in reader:
-            ts = row.get('tradingsymbol')
-            tok = row.get('instrument_token')
+            if len(row) <= width:
+                continue
+            ts = row[ts_i]
+            tok = row[tok_i]
             if not ts or not tok:
                 continue
             try:
@@ -174,6 +299,30 @@ def _load_instrument_tokens(csv_path: str) -> Dict[str, int]:
     return mapping
 
 
+# Token bucket shared by every historical_data caller (the daily MA workers
+# run concurrently); Kite allows ~3 historical requests/second.
+_HISTORICAL_RATE_PER_SEC = 3.0
+_hist_bucket_lock = threading.Lock()
+_hist_tokens = _HISTORICAL_RATE_PER_SEC
+_hist_tokens_mono = 0.0
+
+
+def _take_historical_token() -> None:
+    """Block until one more historical_data request fits the rate limit."""
+    global _hist_tokens, _hist_tokens_mono
+    while True:
+        with _hist_bucket_lock:
+            now = time.monotonic()
+            _hist_tokens = min(_HISTORICAL_RATE_PER_SEC,
+                               _hist_tokens + (now - _hist_tokens_mono) * _HISTORICAL_RATE_PER_SEC)
+            _hist_tokens_mono = now
+            if _hist_tokens >= 1.0:
+                _hist_tokens -= 1.0
+                return
+            wait = (1.0 - _hist_tokens) / _HISTORICAL_RATE_PER_SEC
+        time.sleep(wait)
+
+
 def _compute_daily_ma_for_symbol(kite: Any, symbol: str, instrument_token: int):
     """Fetch historical daily data and compute SMA50, SMA200 and ratio.
 
@@ -182,6 +331,7 @@ def _compute_daily_ma_for_symbol(kite: Any, symbol: str, instrument_token: int):
     # Fetch ~370 calendar days to cover 200 trading days.
     to_dt = datetime.now()
     from_dt = to_dt - timedelta(days=370)
+    _take_historical_token()
     try:
         candles = kite.historical_data(instrument_token, from_dt, to_dt, 'day')
     except Exception as e:
@@ -190,9 +340,17 @@ def _compute_daily_ma_for_symbol(kite: Any, symbol: str, instrument_token: int):
     closes_sorted = closes  # already chronological per API (ascending)
     if len(closes_sorted) < 10:  # insufficient data
         return {}
-    sma20 = sum(closes_sorted[-20:]) / 20 if len(closes_sorted) >= 20 else None
-    sma50 = sum(closes_sorted[-50:]) / 50 if len(closes_sorted) >= 50 else None
-    sma200 = sum(closes_sorted[-200:]) / 200 if len(closes_sorted) >= 200 else None
+    # One newest-first walk over the last 200 closes; the 20/50/200 means are
+    # read off the running suffix sum as it passes each window length
+    suffix_sums: Dict[int, float] = {}
+    total = 0.0
+    for i, c in enumerate(islice(reversed(closes_sorted), 200), 1):
+        total += c
+        if i in (20, 50, 200):
+            suffix_sums[i] = total
+    sma20 = suffix_sums[20] / 20 if 20 in suffix_sums else None
+    sma50 = suffix_sums[50] / 50 if 50 in suffix_sums else None
+    sma200 = suffix_sums[200] / 200 if 200 in suffix_sums else None
     # Use explicit None checks (avoid truthiness) so valid numeric values like 0 are handled.
     ratio = None
     if sma50 is not None and sma200 is not None and sma200 != 0:
@@ -203,178 +361,175 @@ def _compute_daily_ma_for_symbol(kite: Any, symbol: str, instrument_token: int):
     return {"sma20": sma20, "sma50": sma50, "sma200": sma200, "ratio": ratio, "updated": datetime.now()}
 
 
+# Concurrent historical_data calls per daily MA pass; their combined rate is
+# capped by _take_historical_token().
+_DAILY_MA_FETCH_WORKERS = 4
+
+
 def _background_daily_ma_builder(kite: Any, symbols: List[str], sym_to_token: Dict[str, int]):
     global _daily_ma_thread_started
     if _daily_ma_thread_started:
         return
     _daily_ma_thread_started = True
 
-    def worker():
+    def refresh(skip_fresh: bool):
+        todo = []
         for sym in symbols:
             tok = sym_to_token.get(sym)
             if tok is None:
                 continue
-            with _daily_ma_lock:
-                cache_entry = _daily_ma_cache.get(sym)
-                if cache_entry and (datetime.now() - cache_entry.get('updated', datetime.min)) < timedelta(seconds=DAILY_REFRESH_SECONDS):
-                    continue  # fresh
-            data = _compute_daily_ma_for_symbol(kite, sym, tok)
-            if data:
+            if skip_fresh:
                 with _daily_ma_lock:
+                    cache_entry = _daily_ma_cache.get(sym)
+                    if cache_entry and (datetime.now() - cache_entry.get('updated', datetime.min)) < timedelta(seconds=DAILY_REFRESH_SECONDS):
+                        continue  # fresh
+            todo.append((sym, tok))
+        if not todo:
+            return
+        # historical_data is network-bound: keep a few requests in flight
+        with ThreadPoolExecutor(max_workers=min(_DAILY_MA_FETCH_WORKERS, len(todo)), thread_name_prefix='daily_ma') as ex:
+            futs = {ex.submit(_compute_daily_ma_for_symbol, kite, sym, tok): sym for sym, tok in todo}
+            for fut in as_completed(futs):
+                try:
+                    data = fut.result()
+                except Exception:
+                    continue
+                if not data:
+                    continue
+                sym = futs[fut]
+                with _daily_ma_lock:
+                    # a failed fetch must not replace the last good MAs
+                    prev = _daily_ma_cache.get(sym)
+                    if 'error' in data and prev and 'error' not in prev:
+                        continue
                     _daily_ma_cache[sym] = data
+
+    def worker():
+        refresh(skip_fresh=True)
         # Sleep until next refresh cycle
         while True:
             time.sleep(DAILY_REFRESH_SECONDS)
-            for sym in symbols:
-                tok = sym_to_token.get(sym)
-                if tok is None:
-                    continue
-                data = _compute_daily_ma_for_symbol(kite, sym, tok)
-                if data:
-                    with _daily_ma_lock:
-                        _daily_ma_cache[sym] = data
+            refresh(skip_fresh=False)
 
     t = threading.Thread(target=worker, name="daily_ma_builder", daemon=True)
     t.start()
 
 
+def _rsi14(closes: List[float]) -> float:
+    """Simple (non-smoothed) RSI(14) over the last 15 chronological closes."""
+    window = closes[-15:]
+    gains = 0.0
+    losses = 0.0
+    for prev, cur in zip(window, window[1:]):
+        diff = cur - prev
+        if diff > 0:
+            gains += diff
+        else:
+            losses -= diff
+    if losses == 0:
+        return 100.0
+    rs = gains / losses  # the /14 averaging cancels out
+    return 100.0 - (100.0 / (1.0 + rs))
+
+
+def _drop_keys(cache: Dict[str, Any], keys: List[str]) -> None:
+    """Remove `keys` from `cache`, leaving other symbols' entries in place."""
+    for k in keys:
+        cache.pop(k, None)
+
+
+@_single_flight
 def _refresh_sma15m_if_needed(symbols: List[str]):
     """Populate caches with:
     - 15m SMA200 (close) per symbol -> _sma15m_cache
     - Last completed 15m candle close -> _last15m_close_cache
     - Recent 200-candle high (15m) -> _high200_15m_cache
     """
-    if not test_connection() or pg_cursor is None:
+    if pg_cursor is None or not _db_available():
         return
-    global _sma15m_last_ts
-    now = datetime.now()
-    if _sma15m_last_ts and (now - _sma15m_last_ts) < timedelta(seconds=FIFTEEN_MIN_REFRESH_SECONDS):
+    global _sma15m_last_ts, _sma15m_last_mono
+    mono = time.monotonic()
+    if mono - _sma15m_last_mono < FIFTEEN_MIN_REFRESH_SECONDS:
         return
+    now = datetime.now()
     try:
         with pg_cursor() as (cur, _):
-            # SMA200 15m
+            # One ranked pass over the newest 200 15m candles per symbol feeds
+            # SMA200/SMA50, the 200-candle high/low, the last close and the
+            # newest 15 closes for RSI(14); prices are cast to float8 so
+            # every aggregate arrives as a Python float
             cur.execute(
                 """
                 WITH ranked AS (
-                    SELECT stockname, close,
+                    SELECT stockname, close::float8 AS close, high::float8 AS high, low::float8 AS low,
                            ROW_NUMBER() OVER (PARTITION BY stockname ORDER BY candle_stock DESC) AS rn
                     FROM ohlcv_data
-                    WHERE timeframe='15m'
+                    WHERE timeframe='15m' AND stockname = ANY(%s)
                 )
                 SELECT stockname,
-                       AVG(CASE WHEN rn <= 200 THEN close END) AS sma200_15m,
-                       AVG(CASE WHEN rn <= 50 THEN close END) AS sma50_15m
+                       AVG(close) AS sma200_15m,
+                       AVG(close) FILTER (WHERE rn <= 50) AS sma50_15m,
+                       MAX(high) AS high200_15m,
+                       MIN(low) AS low200_15m,
+                       MAX(close) FILTER (WHERE rn = 1) AS last_close,
+                       array_agg(close ORDER BY rn) FILTER (WHERE rn <= 15) AS closes
                 FROM ranked
+                WHERE rn <= 200
                 GROUP BY stockname
-                """
-            )
-            sma_rows = cur.fetchall()
-            # Recent 200-candle high (15m)
-            cur.execute(
-                """
-                WITH ranked AS (
-                    SELECT stockname, high, low,
-                           ROW_NUMBER() OVER (PARTITION BY stockname ORDER BY candle_stock DESC) AS rn
-                    FROM ohlcv_data
-                    WHERE timeframe='15m'
-                )
-                SELECT stockname,
-                       MAX(CASE WHEN rn <= 200 THEN high END) AS high200_15m,
-                       MIN(CASE WHEN rn <= 200 THEN low END) AS low200_15m
-                FROM ranked
-                GROUP BY stockname
-                """
-            )
-            high_rows = cur.fetchall()
-            # Last 15m candle close
-            cur.execute(
-                """
-                SELECT DISTINCT ON (stockname) stockname, close
-                FROM ohlcv_data
-                WHERE timeframe='15m'
-                ORDER BY stockname, candle_stock DESC
-                """
+                """,
+                (symbols,)
             )
-            last_rows = cur.fetchall()
-        with _sma15m_lock:
-            _sma15m_cache.clear()
-            _sma50_15m_cache.clear()
-            for stockname, sma200, sma50 in sma_rows:
-                _sma15m_cache[stockname] = float(sma200) if sma200 is not None else None
-                _sma50_15m_cache[stockname] = float(sma50) if sma50 is not None else None
-            _high200_15m_cache.clear()
-            _low200_15m_cache.clear()
-            for stockname, high200, low200 in high_rows:
-                try:
-                    _high200_15m_cache[stockname] = float(high200) if high200 is not None else None
-                except Exception:
-                    _high200_15m_cache[stockname] = None
-                try:
-                    _low200_15m_cache[stockname] = float(low200) if low200 is not None else None
-                except Exception:
-                    _low200_15m_cache[stockname] = None
-            _last15m_close_cache.clear()
-            for stockname, close_val in last_rows:
-                try:
-                    _last15m_close_cache[stockname] = float(close_val)
-                except Exception:
-                    continue
-            # Optionally compute a simple RSI(14) from recent closes if available in DB
+            rows = cur.fetchall()
+        # Every row is unpacked (and RSI computed) before taking _sma15m_lock;
+        # the lock is only held to swap the new values in
+        sma200_vals: Dict[str, Optional[float]] = {}
+        sma50_vals: Dict[str, Optional[float]] = {}
+        high_vals: Dict[str, Optional[float]] = {}
+        low_vals: Dict[str, Optional[float]] = {}
+        last_vals: Dict[str, float] = {}
+        rsi_vals: Dict[str, float] = {}
+        for stockname, sma200, sma50, high200, low200, close_val, closes_arr in rows:
+            sma200_vals[stockname] = sma200
+            sma50_vals[stockname] = sma50
+            high_vals[stockname] = high200
+            low_vals[stockname] = low200
+            if close_val is not None:
+                last_vals[stockname] = close_val
             try:
-                # Attempt to fetch last 50 closes per symbol to compute RSI(14)
-                with pg_cursor() as (cur, _):
-                    cur.execute(
-                        """
-                        SELECT stockname, array_agg(close ORDER BY candle_stock DESC) AS closes
-                        FROM ohlcv_data
-                        WHERE timeframe='15m'
-                        GROUP BY stockname
-                        """
-                    )
-                    rows_closes = cur.fetchall()
-                _rsi15m_cache.clear()
-                for stockname, closes_arr in rows_closes:
-                    try:
-                        closes = [float(x) for x in (closes_arr or [])][:50]
-                        if len(closes) >= 15:
-                            # closes ordered newest first; reverse to chronological
-                            closes = list(reversed(closes))
-                            # compute RSI(14)
-                            gains = 0.0
-                            losses = 0.0
-                            for i in range(1, 15):
-                                diff = closes[i] - closes[i-1]
-                                if diff > 0:
-                                    gains += diff
-                                else:
-                                    losses += abs(diff)
-                            avg_gain = gains / 14.0
-                            avg_loss = losses / 14.0
-                            if avg_loss == 0:
-                                rsi = 100.0
-                            else:
-                                rs = avg_gain / avg_loss
-                                rsi = 100.0 - (100.0 / (1.0 + rs))
-                            _rsi15m_cache[stockname] = round(rsi, 2)
-                    except Exception:
-                        continue
+                if closes_arr and len(closes_arr) >= 15:
+                    # closes ordered newest first; reverse to chronological
+                    closes_arr.reverse()
+                    rsi_vals[stockname] = round(_rsi14(closes_arr), 2)
             except Exception:
-                # DB not available or query failed -> leave cache as-is
-                pass
+                continue
+        with _sma15m_lock:
+            for cache, vals in (
+                (_sma15m_cache, sma200_vals),
+                (_sma50_15m_cache, sma50_vals),
+                (_high200_15m_cache, high_vals),
+                (_low200_15m_cache, low_vals),
+                (_last15m_close_cache, last_vals),
+                (_rsi15m_cache, rsi_vals),
+            ):
+                _drop_keys(cache, symbols)
+                cache.update(vals)
             _sma15m_last_ts = now
+            _sma15m_last_mono = mono
     except Exception:
         pass
 
 
+@_single_flight
 def _refresh_daily_volratio_if_needed(symbols: List[str]):
     """Compute avg 5-day volume / avg 200-day volume per symbol from ohlcv_data (timeframe='1d')."""
-    if not test_connection() or pg_cursor is None:
+    if pg_cursor is None or not _db_available():
         return
-    global _volratio_last_ts
-    now = datetime.now()
+    global _volratio_last_ts, _volratio_last_mono
+    mono = time.monotonic()
     # Refresh at most once every 15 minutes
-    if _volratio_last_ts and (now - _volratio_last_ts) < timedelta(minutes=15):
+    if mono - _volratio_last_mono < 15 * 60:
         return
+    now = datetime.now()
     try:
         with pg_cursor() as (cur, _):
             cur.execute(
@@ -383,154 +538,136 @@ def _refresh_daily_volratio_if_needed(symbols: List[str]):
                     SELECT stockname, volume,
                            ROW_NUMBER() OVER (PARTITION BY stockname ORDER BY candle_stock DESC) AS rn
                     FROM ohlcv_data
-                    WHERE timeframe='1d'
+                    WHERE timeframe='1d' AND stockname = ANY(%s)
                 )
                 SELECT stockname,
-                       AVG(CASE WHEN rn <= 5 THEN volume END) AS avg5,
-                       AVG(CASE WHEN rn <= 200 THEN volume END) AS avg200
+                       AVG(CASE WHEN rn <= 5 THEN volume END)::float8 AS avg5,
+                       AVG(CASE WHEN rn <= 200 THEN volume END)::float8 AS avg200
                 FROM ranked
                 GROUP BY stockname
-                """
+                """,
+                (symbols,)
             )
             rows = cur.fetchall()
         with _volratio_lock:
-            _volratio_cache.clear()
+            _drop_keys(_volratio_cache, symbols)
             for stockname, avg5, avg200 in rows:
                 try:
-                    a5 = float(avg5) if avg5 is not None else None
-                    a200 = float(avg200) if avg200 is not None else None
                     ratio = None
                     # Explicitly check for None and zero to avoid skipping valid values
-                    if a5 is not None and a200 is not None and a200 != 0:
+                    if avg5 is not None and avg200 is not None and avg200 != 0:
                         try:
-                            ratio = round(a5 / a200, 2)
+                            ratio = round(avg5 / avg200, 2)
                         except Exception:
                             ratio = None
                     _volratio_cache[stockname] = ratio  # may be None
                 except Exception:
                     continue
             _volratio_last_ts = now
+            _volratio_last_mono = mono
     except Exception:
         pass
 
 
-def _compute_emas_from_closes(closes_list, periods):
-    """Calculate multiple EMAs from a chronological list of closes (oldest -> newest).
-    
-    Args:
-        closes_list: List of floats in chronological order (oldest first)
-        periods: List of periods to compute (e.g., [5, 8, 10, 20, 50, 100, 200])
-    
-    Returns:
-        Dictionary mapping period -> EMA value (or None if insufficient data)
+_EMA_PERIODS = (5, 8, 10, 20, 50, 100, 200)
+_EMA_KEYS = tuple(f'ema{p}' for p in _EMA_PERIODS)
+_EMA_LOOKBACK = 500
+
+
+def _ema_sql(periods=_EMA_PERIODS, lookback: int = _EMA_LOOKBACK) -> str:
+    """Build a query returning (stockname, candles_used, ema<p>...) per symbol.
+
+    An EMA seeded with the SMA of the first p closes is a fixed weighted sum
+    of the closes, so each one is a single aggregate instead of a recursive
+    walk: with n closes, k = 2/(p+1) and age 1 = newest,
+        seed rows (age > n-p):  close * (1-k)^(n-p) / p
+        later rows:             close * k * (1-k)^(age-1)
+    EMAs needing more than n closes come back NULL.
     """
-    res = {}
+    cols = []
     for p in periods:
-        if len(closes_list) < p:
-            res[p] = None
-            continue
-        # seed EMA with simple average of first p values
-        seed = sum(closes_list[:p]) / float(p)
-        ema = seed
         k = 2.0 / (p + 1)
-        for price in closes_list[p:]:
-            ema = (price - ema) * k + ema
-        res[p] = round(ema, 2)  # Round to 2 decimal places for consistency
-    return res
+        cols.append(
+            f"CASE WHEN MAX(n) >= {p} THEN SUM(CASE WHEN age > n - {p} "
+            f"THEN close * power({1.0 - k!r}::float8, n - {p}) / {p} "
+            f"ELSE close * {k!r}::float8 * power({1.0 - k!r}::float8, age - 1) END) END AS ema{p}"
+        )
+    return f"""
+        WITH recent AS (
+            SELECT stockname, close::float8 AS close,
+                   ROW_NUMBER() OVER (PARTITION BY stockname ORDER BY candle_stock DESC) AS age
+            FROM ohlcv_data
+            WHERE timeframe='1d' AND stockname = ANY(%s)
+        ), sized AS (
+            SELECT stockname, close, age, COUNT(*) OVER (PARTITION BY stockname) AS n
+            FROM recent
+            WHERE age <= {lookback}
+        )
+        SELECT stockname, MAX(n) AS candles_used,
+               {", ".join(cols)}
+        FROM sized
+        GROUP BY stockname
+    """
+
+
+_EMA_SQL = _ema_sql()
 
 
+@_single_flight
 def _refresh_daily_averages_if_needed(symbols: List[str]):
     """Compute Exponential Moving Averages (5,8,10,20,50,100,200 day) per symbol using daily ohlcv_data.
 
     Results are cached in _daily_avg_cache and refreshed at most once every 15 minutes.
     Loads closing price data from PostgreSQL ohlcv_data table.
     """
-    if not test_connection() or pg_cursor is None:
+    if pg_cursor is None or not _db_available():
         return
-    global _daily_avg_last_ts
-    now = datetime.now()
+    global _daily_avg_last_ts, _daily_avg_last_mono
+    mono = time.monotonic()
     # Refresh at most once every 15 minutes
-    if _daily_avg_last_ts and (now - _daily_avg_last_ts) < timedelta(minutes=15):
+    if mono - _daily_avg_last_mono < 15 * 60:
         return
+    now = datetime.now()
     try:
         with pg_cursor() as (cur, _):
-            # Fetch recent daily closes per requested symbol (newest first, up to 500 candles)
-            cur.execute(
-                """
-                SELECT stockname, array_agg(close ORDER BY candle_stock DESC) AS closes
-                FROM (
-                    SELECT stockname, close, candle_stock
-                    FROM ohlcv_data
-                    WHERE timeframe='1d' AND stockname = ANY(%s)
-                    ORDER BY stockname, candle_stock DESC
-                ) subq
-                GROUP BY stockname
-                """,
-                (symbols,)
-            )
+            # EMAs over the newest 500 daily closes are computed server-side,
+            # so only the scalars per symbol cross the wire
+            cur.execute(_EMA_SQL, (symbols,))
             rows = cur.fetchall()
             logging.info(f"[EMA REFRESH] Fetched daily data for {len(rows)} symbols out of {len(symbols)} requested")
 
-        periods = [5, 8, 10, 20, 50, 100, 200]
+        # Build entries outside _daily_avg_lock; only the cache update below holds it
+        computed = {}
+        for stockname, candles_used, *emas in rows:
+            entry = {k: (round(v, 2) if v is not None else None) for k, v in zip(_EMA_KEYS, emas)}
+            entry['updated'] = now
+            entry['candles_used'] = candles_used  # Track how many candles were used
+            computed[stockname] = entry
         with _daily_avg_lock:
             # Keep existing cache for symbols not in this batch
-            for stockname, closes_arr in rows:
-                try:
-                    closes_raw = list(closes_arr or [])
-                    if not closes_raw:
-                        # No data for this symbol
-                        _daily_avg_cache[stockname] = {
-                            'ema5': None, 'ema8': None, 'ema10': None, 'ema20': None,
-                            'ema50': None, 'ema100': None, 'ema200': None, 'updated': now
-                        }
-                        continue
-                    # Limit to last 500 candles (already sorted newest-first from DB)
-                    closes_raw = closes_raw[:500]
-                    # convert to floats and reverse to chronological order (oldest first)
-                    # Handle Decimal objects from PostgreSQL
-                    closes = [float(x) for x in closes_raw]
-                    closes = list(reversed(closes))
-                    
-                    # Compute all EMAs at once
-                    emas = _compute_emas_from_closes(closes, periods)
-                    
-                    entry = {
-                        'ema5': emas.get(5),
-                        'ema8': emas.get(8),
-                        'ema10': emas.get(10),
-                        'ema20': emas.get(20),
-                        'ema50': emas.get(50),
-                        'ema100': emas.get(100),
-                        'ema200': emas.get(200),
-                        'updated': now,
-                        'candles_used': len(closes),  # Track how many candles were used
-                    }
-                    _daily_avg_cache[stockname] = entry
-                except Exception as e:
-                    # Log error but don't crash; set Nones
-                    _daily_avg_cache[stockname] = {
-                        'ema5': None, 'ema8': None, 'ema10': None, 'ema20': None,
-                        'ema50': None, 'ema100': None, 'ema200': None, 'updated': now, 'error': str(e)
-                    }
+            _daily_avg_cache.update(computed)
             _daily_avg_last_ts = now
+            _daily_avg_last_mono = mono
     except Exception as e:
         # Ignore DB failures silently; caller will handle missing values
         pass
 
 
+@_single_flight
 def _refresh_days_since_golden_cross_if_needed(symbols: List[str]):
     """Compute how many trading days since the last Golden Cross (SMA50 crossed above SMA200).
 
     Uses ohlcv_data (timeframe='1d'). We approximate SMA50/SMA200 via rolling averages
     using window functions and detect the most recent index where ratio crossed from <=1 to >1.
     """
-    if not test_connection() or pg_cursor is None:
+    if pg_cursor is None or not _db_available():
         return
-    global _days_since_gc_last_ts
-    now = datetime.now()
+    global _days_since_gc_last_ts, _days_since_gc_last_mono
+    mono = time.monotonic()
     # Refresh at most once every 15 minutes
-    if _days_since_gc_last_ts and (now - _days_since_gc_last_ts) < timedelta(minutes=15):
+    if mono - _days_since_gc_last_mono < 15 * 60:
         return
+    now = datetime.now()
     try:
         with pg_cursor() as (cur, _):
             # Compute rolling SMA50 and SMA200 and detect last golden cross per symbol
@@ -540,62 +677,79 @@ def _refresh_days_since_golden_cross_if_needed(symbols: List[str]):
                     SELECT stockname, candle_stock, close,
                            ROW_NUMBER() OVER (PARTITION BY stockname ORDER BY candle_stock) AS rn
                     FROM ohlcv_data
-                    WHERE timeframe='1d'
+                    WHERE timeframe='1d' AND stockname = ANY(%s)
                 ),
                 ma AS (
-                    SELECT stockname, candle_stock,
+                    SELECT stockname, candle_stock, rn,
                            AVG(close) OVER (PARTITION BY stockname ORDER BY candle_stock ROWS BETWEEN 49 PRECEDING AND CURRENT ROW) AS sma50,
                            AVG(close) OVER (PARTITION BY stockname ORDER BY candle_stock ROWS BETWEEN 199 PRECEDING AND CURRENT ROW) AS sma200
                     FROM ordered
                 ),
                 ratio AS (
-                    SELECT stockname, candle_stock,
+                    SELECT stockname, candle_stock, rn,
                            CASE WHEN sma200 IS NULL OR sma200 = 0 THEN NULL ELSE sma50 / sma200 END AS r
                     FROM ma
                 ),
                 crossed AS (
-                    SELECT stockname, candle_stock, r,
+                    SELECT stockname, rn, r,
                            LAG(r) OVER (PARTITION BY stockname ORDER BY candle_stock) AS r_prev
                     FROM ratio
-                ),
-                last_gc AS (
-                    SELECT stockname,
-                           MAX(candle_stock) AS last_gc_ts
-                    FROM crossed
-                    WHERE r_prev <= 1 AND r > 1
-                    GROUP BY stockname
-                ),
-                last_day AS (
-                    SELECT stockname, MAX(candle_stock) AS last_day_ts
-                    FROM ohlcv_data
-                    WHERE timeframe='1d'
-                    GROUP BY stockname
                 )
-                SELECT ld.stockname,
-                       CASE WHEN gc.last_gc_ts IS NULL THEN NULL
-                            ELSE (
-                                SELECT COUNT(*) FROM ohlcv_data d
-                                WHERE d.timeframe='1d' AND d.stockname=ld.stockname
-                                  AND d.candle_stock > gc.last_gc_ts AND d.candle_stock <= ld.last_day_ts
-                            )
-                       END AS days_since_gc
-                FROM last_day ld
-                LEFT JOIN last_gc gc ON gc.stockname = ld.stockname
-                """
+                -- rn is the per-symbol day index, so days since the last cross
+                -- is the newest index minus the index at that cross
+                SELECT stockname,
+                       MAX(rn) - MAX(rn) FILTER (WHERE r_prev <= 1 AND r > 1) AS days_since_gc
+                FROM crossed
+                GROUP BY stockname
+                """,
+                (symbols,)
             )
             rows = cur.fetchall()
         with _days_since_gc_lock:
-            _days_since_gc_cache.clear()
+            _drop_keys(_days_since_gc_cache, symbols)
             for stockname, days_since in rows:
                 try:
                     _days_since_gc_cache[stockname] = int(days_since) if days_since is not None else None
                 except Exception:
                     _days_since_gc_cache[stockname] = None
             _days_since_gc_last_ts = now
+            _days_since_gc_last_mono = mono
     except Exception:
         pass
 
 
+def _centered_extrema(vals: List[float], window: int):
+    """Max and min of vals[i-window : i+window+1] (clipped) for every i.
+
+    Monotonic-deque sliding window: O(n) overall instead of slicing and
+    scanning 2*window+1 values per index.
+    """
+    n = len(vals)
+    maxs = [0.0] * n
+    mins = [0.0] * n
+    dq_max: deque = deque()
+    dq_min: deque = deque()
+    for j in range(n + window):
+        if j < n:
+            v = vals[j]
+            while dq_max and vals[dq_max[-1]] <= v:
+                dq_max.pop()
+            dq_max.append(j)
+            while dq_min and vals[dq_min[-1]] >= v:
+                dq_min.pop()
+            dq_min.append(j)
+        i = j - window  # centre whose right edge is j
+        if i < 0:
+            continue
+        while dq_max[0] < i - window:
+            dq_max.popleft()
+        while dq_min[0] < i - window:
+            dq_min.popleft()
+        maxs[i] = vals[dq_max[0]]
+        mins[i] = vals[dq_min[0]]
+    return maxs, mins
+
+
 def _find_swings_from_closes(closes: List[float], window: int = 6, top_n: int = 3):
     """Return support and resistance levels from closes (newest-first).
 
@@ -604,20 +758,10 @@ def _find_swings_from_closes(closes: List[float], window: int = 6, top_n: int =
     if not closes:
         return [], []
     vals = list(reversed(closes))  # chronological
-    n = len(vals)
-    highs = []
-    lows = []
-    for i in range(n):
-        left = max(0, i - window)
-        right = min(n - 1, i + window)
-        v = vals[i]
-        segment = vals[left:right + 1]
-        if v == max(segment):
-            highs.append((i, v))
-        if v == min(segment):
-            lows.append((i, v))
-    highs_sorted = sorted(highs, key=lambda x: -x[0])
-    lows_sorted = sorted(lows, key=lambda x: -x[0])
+    maxs, mins = _centered_extrema(vals, window)
+    # newest first
+    highs_sorted = [(i, v) for i, v in enumerate(vals) if v == maxs[i]][::-1]
+    lows_sorted = [(i, v) for i, v in enumerate(vals) if v == mins[i]][::-1]
     res = []
     sup = []
     seen = set()
@@ -641,64 +785,70 @@ def _find_swings_from_closes(closes: List[float], window: int = 6, top_n: int =
     return sup, res
 
 
+@_single_flight
 def _refresh_sr_if_needed(symbols: List[str]):
     """Populate `_sr_cache` with supports/resistances for given symbols (refresh every 15 minutes)."""
-    if not test_connection() or pg_cursor is None:
+    if pg_cursor is None or not _db_available():
         return
-    global _sr_last_ts
-    now = datetime.now()
-    if _sr_last_ts and (now - _sr_last_ts) < timedelta(minutes=15):
+    global _sr_last_ts, _sr_last_mono
+    mono = time.monotonic()
+    if mono - _sr_last_mono < 15 * 60:
         return
+    now = datetime.now()
     # We'll replace the previous support/resistance computation with a simpler
     # rolling local extrema over the last 30 daily closes: the most recent local
     # low and local high within a 30-day rolling window. Store results in
     # `_sr_cache` as 'local_30d_low' and 'local_30d_high' for backward
     # compatibility with existing code that reads `_sr_cache`.
-    if not test_connection() or pg_cursor is None:
-        return
     try:
+        # One grouped scan for all symbols instead of a query per symbol;
+        # closes come back newest-first, capped at 800 (~3 years)
         with pg_cursor() as (cur, _):
-            for sym in symbols:
+            cur.execute(
+                """
+                SELECT stockname, (array_agg(close::float8 ORDER BY candle_stock DESC))[1:800]
+                FROM ohlcv_data
+                WHERE timeframe='1d' AND stockname = ANY(%s)
+                GROUP BY stockname
+                """,
+                (symbols,)
+            )
+            rows = cur.fetchall()
+        computed = {}
+        for sym, closes_arr in rows:
+            try:
+                closes = closes_arr or []
+                if len(closes) == 0:
+                    continue
+                # Compute rolling 30-day window local lows/highs using newest-first array
+                window = 30
+                recent = closes[:window]
                 try:
-                    cur.execute(
-                        "SELECT array_agg(close ORDER BY candle_stock DESC) FROM ohlcv_data WHERE timeframe='1d' AND stockname=%s",
-                        (sym,)
-                    )
-                    row = cur.fetchone()
-                    closes_arr = row[0] if row and row[0] is not None else []
-                    # closes are newest-first; convert to floats and keep up to 365*3 as safety
-                    closes = [float(x) for x in (closes_arr or [])][:800]
-                    if len(closes) == 0:
-                        continue
-                    # Compute rolling 30-day window local lows/highs using newest-first array
-                    window = 30
-                    recent = closes[:window]
-                    if not recent:
-                        continue
-                    try:
-                        local_low = round(float(min(recent)), 2)
-                    except Exception:
-                        local_low = None
-                    try:
-                        local_high = round(float(max(recent)), 2)
-                    except Exception:
-                        local_high = None
-                    # Also compute support/resistance swing levels (older logic) from closes
-                    try:
-                        supports, resistances = _find_swings_from_closes(closes, window=6, top_n=3)
-                    except Exception:
-                        supports, resistances = [], []
-                    with _sr_lock:
-                        # keep both legacy supports/resistances and new local 30d low/high
-                        _sr_cache[sym] = {
-                            'local_30d_low': local_low,
-                            'local_30d_high': local_high,
-                            'supports': supports,
-                            'resistances': resistances,
-                        }
+                    local_low = round(float(min(recent)), 2)
                 except Exception:
-                    continue
+                    local_low = None
+                try:
+                    local_high = round(float(max(recent)), 2)
+                except Exception:
+                    local_high = None
+                # Also compute support/resistance swing levels (older logic) from closes
+                try:
+                    supports, resistances = _find_swings_from_closes(closes, window=6, top_n=3)
+                except Exception:
+                    supports, resistances = [], []
+                # keep both legacy supports/resistances and new local 30d low/high
+                computed[sym] = {
+                    'local_30d_low': local_low,
+                    'local_30d_high': local_high,
+                    'supports': supports,
+                    'resistances': resistances,
+                }
+            except Exception:
+                continue
+        with _sr_lock:
+            _sr_cache.update(computed)
         _sr_last_ts = now
+        _sr_last_mono = mono
     except Exception:
         pass
 
@@ -729,10 +879,13 @@ def _ema(series: List[float], period: int) -> List[float]:
     result.extend([None] * (period - 1))
     result.append(sma)
     
-    # EMA calculation
-    for i in range(period, len(series)):
-        ema_val = (series[i] - result[-1]) * multiplier + result[-1]
-        result.append(ema_val)
+    # EMA calculation; carry the previous value in a local instead of
+    # re-reading result[-1] twice per step
+    prev = sma
+    append = result.append
+    for price in islice(series, period, None):
+        prev = (price - prev) * multiplier + prev
+        append(prev)
     
     return result
 
@@ -742,20 +895,22 @@ def _atr(highs: List[float], lows: List[float], closes: List[float], period: int
     if not highs or len(highs) < period + 1:
         return []
     
-    tr_list = []
-    for i in range(1, len(highs)):
-        tr = max(
-            highs[i] - lows[i],
-            abs(highs[i] - closes[i-1]),
-            abs(lows[i] - closes[i-1])
-        )
-        tr_list.append(tr)
+    # True range per bar from bar i and the previous close, zipped rather
+    # than indexed
+    tr_list = [
+        max(h - l, abs(h - pc), abs(l - pc))
+        for h, l, pc in zip(islice(highs, 1, None), islice(lows, 1, None), closes)
+    ]
     
-    # Simple moving average of TR
+    # Simple moving average of TR over tr_list[i-period+1:i+1], kept as a
+    # running window sum: add the entering value, subtract the leaving one
     atr_list = [None] * period
-    for i in range(period, len(tr_list)):
-        atr_val = sum(tr_list[i-period+1:i+1]) / period
-        atr_list.append(atr_val)
+    if len(tr_list) > period:
+        window_sum = sum(islice(tr_list, 1, period + 1))
+        atr_list.append(window_sum / period)
+        for i in range(period + 1, len(tr_list)):
+            window_sum += tr_list[i] - tr_list[i - period]
+            atr_list.append(window_sum / period)
     
     return atr_list
 
@@ -840,8 +995,6 @@ def _detect_vcp(
         # 1. TREND FILTER - EMA(50)
         # -------------------------
         ema50 = _ema(closes, VCP_EMA_TREND)
-        ema20 = _ema(closes, VCP_EMA_EXIT)
-        atr_values = _atr(highs, lows, closes, VCP_ATR_PERIOD)
         
         if not ema50 or ema50[-1] is None:
             return result
@@ -857,6 +1010,9 @@ def _detect_vcp(
                 result['pattern_stage'] = 'EMA50 Not Rising - Weak Trend'
                 return result
         
+        # ATR only for symbols that pass the trend filter
+        atr_values = _atr(highs, lows, closes, VCP_ATR_PERIOD)
+        
         # -------------------------
         # 2. FIND CONTRACTIONS
         # -------------------------
@@ -946,6 +1102,8 @@ def _detect_vcp(
         breakout_confirmed = False
         volume_confirmed = True  # Assume true if no volume data
         candle_quality = True  # Assume true if no open data
+        full_vol_window = bool(volumes) and len(volumes) >= VCP_VOL_MA
+        vol_ma = None
         
         # Check if price broke resistance
         if current_price > resistance:
@@ -953,7 +1111,7 @@ def _detect_vcp(
             
             # Volume confirmation (if data available)
             if volumes:
-                vol_ma = sum(volumes[-VCP_VOL_MA:]) / VCP_VOL_MA if len(volumes) >= VCP_VOL_MA else sum(volumes) / len(volumes)
+                vol_ma = sum(volumes[-VCP_VOL_MA:]) / VCP_VOL_MA if full_vol_window else sum(volumes) / len(volumes)
                 current_vol = volumes[-1]
                 volume_confirmed = current_vol > vol_ma * VCP_VOL_MULTIPLIER
                 result['volume_ratio'] = round(current_vol / vol_ma, 2) if vol_ma > 0 else None
@@ -988,8 +1146,10 @@ def _detect_vcp(
             
             # Confidence score based on volume
             if volumes:
-                vol_ma = sum(volumes[-VCP_VOL_MA:]) / VCP_VOL_MA if len(volumes) >= VCP_VOL_MA else 1
-                confidence = min(1.0, (volumes[-1] / vol_ma) / 3) if vol_ma > 0 else 0.5
+                # reuse the breakout check's average; short series keep the
+                # historical divisor of 1
+                conf_vol_ma = vol_ma if full_vol_window else 1
+                confidence = min(1.0, (volumes[-1] / conf_vol_ma) / 3) if conf_vol_ma > 0 else 0.5
             else:
                 confidence = 0.6  # Moderate confidence without volume
             result['confidence_score'] = round(confidence, 2)
@@ -1049,72 +1209,101 @@ def _detect_vcp(
     return result
 
 
+def _chrono_floats(raw) -> List[float]:
+    """Newest-first float8 DB array -> chronological list, skipping NULLs."""
+    if not raw:
+        return []
+    return [x for x in reversed(raw) if x is not None]
+
+
+@_single_flight
 def _refresh_vcp_if_needed(symbols: List[str]):
     """Compute VCP patterns for given symbols using 15m data from ohlcv_data.
     
     Detects volatility contraction patterns and stores in _vcp_cache.
     Refreshes at most once per 5 minutes.
     """
-    if not test_connection() or pg_cursor is None:
+    if pg_cursor is None or not _db_available():
         return
     
-    global _vcp_last_ts
-    now = datetime.now()
+    global _vcp_last_ts, _vcp_last_mono
+    mono = time.monotonic()
     # Refresh at most once per 5 minutes
-    if _vcp_last_ts and (now - _vcp_last_ts) < timedelta(minutes=5):
+    if mono - _vcp_last_mono < 5 * 60:
         return
+    now = datetime.now()
     
     try:
         with pg_cursor() as (cur, _):
-            # Fetch last 100 15m candles per symbol with OHLCV data
+            # Only the newest VCP_LOOKBACK 15m candles per symbol are analysed,
+            # so rank and trim server-side instead of shipping full history
             cur.execute(
                 """
-                SELECT stockname, 
-                       array_agg(open ORDER BY candle_stock DESC) AS opens,
-                       array_agg(high ORDER BY candle_stock DESC) AS highs,
-                       array_agg(low ORDER BY candle_stock DESC) AS lows,
-                       array_agg(close ORDER BY candle_stock DESC) AS closes,
-                       array_agg(volume ORDER BY candle_stock DESC) AS volumes
-                FROM ohlcv_data
-                WHERE timeframe='15m' AND stockname = ANY(%s)
+                WITH ranked AS (
+                    SELECT stockname, candle_stock, open, high, low, close, volume,
+                           ROW_NUMBER() OVER (PARTITION BY stockname ORDER BY candle_stock DESC) AS rn
+                    FROM ohlcv_data
+                    WHERE timeframe='15m' AND stockname = ANY(%s)
+                )
+                SELECT stockname, MAX(candle_stock) AS last_ts,
+                       array_agg(open::float8 ORDER BY rn) AS opens,
+                       array_agg(high::float8 ORDER BY rn) AS highs,
+                       array_agg(low::float8 ORDER BY rn) AS lows,
+                       array_agg(close::float8 ORDER BY rn) AS closes,
+                       array_agg(volume::float8 ORDER BY rn) AS volumes,
+                       SUM(close::float8) AS close_sum,
+                       SUM(volume::float8) AS volume_sum
+                FROM ranked
+                WHERE rn <= %s
                 GROUP BY stockname
                 """,
-                (symbols,)
+                (symbols, VCP_LOOKBACK)
             )
             rows = cur.fetchall()
         
+        # Detect outside _vcp_lock; readers only wait for the final swap
+        with _vcp_lock:
+            previous = dict(_vcp_cache)
+        computed = {}
+        input_keys = {}
+        for (stockname, last_ts, opens_raw, highs_raw, lows_raw, closes_raw,
+             volumes_raw, close_sum, volume_sum) in rows:
+            # No new candle and no revision anywhere in the window (the sums
+            # catch edited or back-filled bars) since the last pass -> same result
+            input_key = (last_ts, len(closes_raw or ()), close_sum, volume_sum)
+            input_keys[stockname] = input_key
+            if stockname in previous and _vcp_input_keys.get(stockname) == input_key:
+                computed[stockname] = previous[stockname]
+                continue
+            try:
+                # Newest-first from DB -> chronological floats (oldest first)
+                # in one pass per series, no intermediate reversed copies
+                opens = _chrono_floats(opens_raw)
+                highs = _chrono_floats(highs_raw)
+                lows = _chrono_floats(lows_raw)
+                closes = _chrono_floats(closes_raw)
+                volumes = _chrono_floats(volumes_raw)
+
+                # Detect VCP using advanced algorithm with all OHLCV data
+                computed[stockname] = _detect_vcp(
+                    closes_arr=closes, 
+                    highs_arr=highs, 
+                    lows_arr=lows,
+                    opens_arr=opens,
+                    volumes_arr=volumes,
+                    lookback=VCP_LOOKBACK, 
+                    min_contractions=VCP_MIN_CONTRACTIONS
+                )
+            except Exception:
+                computed[stockname] = {'has_vcp': False, 'stage': 'Error'}
+
         with _vcp_lock:
             _vcp_cache.clear()
-            for stockname, opens_raw, highs_raw, lows_raw, closes_raw, volumes_raw in rows:
-                try:
-                    opens = [float(x) for x in (opens_raw or []) if x is not None]
-                    highs = [float(x) for x in (highs_raw or []) if x is not None]
-                    lows = [float(x) for x in (lows_raw or []) if x is not None]
-                    closes = [float(x) for x in (closes_raw or []) if x is not None]
-                    volumes = [float(x) for x in (volumes_raw or []) if x is not None]
-                    
-                    # Reverse to chronological order (oldest first)
-                    opens = list(reversed(opens))
-                    highs = list(reversed(highs))
-                    lows = list(reversed(lows))
-                    closes = list(reversed(closes))
-                    volumes = list(reversed(volumes))
-                    
-                    # Detect VCP using advanced algorithm with all OHLCV data
-                    vcp_result = _detect_vcp(
-                        closes_arr=closes, 
-                        highs_arr=highs, 
-                        lows_arr=lows,
-                        opens_arr=opens,
-                        volumes_arr=volumes,
-                        lookback=VCP_LOOKBACK, 
-                        min_contractions=VCP_MIN_CONTRACTIONS
-                    )
-                    _vcp_cache[stockname] = vcp_result
-                except Exception:
-                    _vcp_cache[stockname] = {'has_vcp': False, 'stage': 'Error'}
-        
+            _vcp_cache.update(computed)
+        _vcp_input_keys.clear()
+        _vcp_input_keys.update(input_keys)
         _vcp_last_ts = now
+        _vcp_last_mono = mono
     except Exception:
         pass
 
@@ -1127,11 +1316,11 @@ def fetch_ltp() -> Dict[str, Any]:
     
     Includes request caching to prevent hitting Zerodha API rate limits.
     """
-    global _ltp_cache, _ltp_cache_ts
+    global _ltp_cache, _ltp_cache_mono
     
     # Check if cache is still valid
     with _ltp_cache_lock:
-        if _ltp_cache_ts and (datetime.now() - _ltp_cache_ts).total_seconds() < _LTP_CACHE_TTL:
+        if time.monotonic() - _ltp_cache_mono < _LTP_CACHE_TTL:
             return _ltp_cache.copy()
     
     params = load_params()
@@ -1210,12 +1399,14 @@ def fetch_ltp() -> Dict[str, Any]:
         daily_cache_snapshot = dict(_daily_ma_cache)
     with _daily_avg_lock:
         daily_avg_snapshot = dict(_daily_avg_cache)
+    # all five 15m caches are written together under _sma15m_lock; copy them
+    # in the same hold so a row never mixes two refreshes
     with _sma15m_lock:
         sma15m_snapshot = dict(_sma15m_cache)
-        sma50_15m_snapshot = dict(_sma50_15m_cache) 
-    high200_15m_snapshot = dict(_high200_15m_cache)
-    low200_15m_snapshot = dict(_low200_15m_cache)
-    last15m_snapshot = dict(_last15m_close_cache)
+        sma50_15m_snapshot = dict(_sma50_15m_cache)
+        high200_15m_snapshot = dict(_high200_15m_cache)
+        low200_15m_snapshot = dict(_low200_15m_cache)
+        last15m_snapshot = dict(_last15m_close_cache)
     with _volratio_lock:
         volratio_snapshot = dict(_volratio_cache)
     with _days_since_gc_lock:
@@ -1287,15 +1478,16 @@ def fetch_ltp() -> Dict[str, Any]:
         acceleration = None
         rank_final = None
         try:
-            with _rank_gm_lock:
+            # read the previous value and store the new one in one hold of
+            # this symbol's stripe
+            with _rank_gm_stripe(sym):
                 prev = _rank_gm_cache.get(sym)
+                if rank_gm is not None:
+                    _rank_gm_cache[sym] = rank_gm
             if rank_gm is not None:
                 acceleration = None if prev is None else round(rank_gm - prev, 2)
                 # compute final score using same accel_weight as ranking module
                 rank_final = calculate_rank_final(rank_gm, acceleration, accel_weight=0.3)
-                # update cache
-                with _rank_gm_lock:
-                    _rank_gm_cache[sym] = rank_gm
         except Exception:
             acceleration = None
             rank_final = rank_gm
@@ -1332,10 +1524,9 @@ def fetch_ltp() -> Dict[str, Any]:
                 # attempt a lightweight query to fetch recent daily closes and compute swings
                 try:
                     with pg_cursor() as (cur, _):
-                        cur.execute("SELECT array_agg(close ORDER BY candle_stock DESC) FROM ohlcv_data WHERE timeframe='1d' AND stockname=%s", (sym,))
+                        cur.execute("SELECT (array_agg(close::float8 ORDER BY candle_stock DESC))[1:800] FROM ohlcv_data WHERE timeframe='1d' AND stockname=%s", (sym,))
                         row = cur.fetchone()
-                        closes_arr = row[0] if row and row[0] is not None else []
-                        closes = [float(x) for x in (closes_arr or [])][:800]
+                        closes = row[0] if row and row[0] is not None else []
                         if closes:
                             supports, resistances = _find_swings_from_closes(closes, window=6, top_n=3)
                             out[sym]['supports'] = supports
@@ -1360,11 +1551,27 @@ def fetch_ltp() -> Dict[str, Any]:
     # Cache the result to prevent rate limiting on rapid successive requests
     with _ltp_cache_lock:
         _ltp_cache = result.copy()
-        _ltp_cache_ts = datetime.now()
+        _ltp_cache_mono = time.monotonic()
     
     return result
 
 
+def ltp_as_columns(fields: List[str], snapshot: Optional[Dict[str, Any]] = None) -> tuple:
+    """Column-oriented view of the LTP snapshot: (symbols, {field: [values]}).
+
+    Each column list is aligned with ``symbols`` so callers can scan a single
+    field without touching every per-symbol dict. ``snapshot`` defaults to a
+    fresh (cached) ``fetch_ltp()`` result.
+    """
+    if snapshot is None:
+        snapshot = fetch_ltp()
+    rows = (snapshot or {}).get('data') or {}
+    symbols = list(rows)
+    values = list(rows.values())
+    columns = {f: [v.get(f) for v in values] for f in fields}
+    return symbols, columns
+
+
 def get_ck_data() -> Dict[str, Any]:
     """Return minimal CK view data: symbol -> { last_price, rsi_15m }.
 
@@ -1518,24 +1725,11 @@ def get_ck_data() -> Dict[str, Any]:
         except Exception:
             pass
         # Attach daily EMAs if available (may be None)
-        try:
-            with _daily_avg_lock:
-                darr = _daily_avg_cache.get(sym) or {}
-            out[sym]['ema5'] = darr.get('ema5') if darr else None
-            out[sym]['ema8'] = darr.get('ema8') if darr else None
-            out[sym]['ema10'] = darr.get('ema10') if darr else None
-            out[sym]['ema20'] = darr.get('ema20') if darr else None
-            out[sym]['ema50'] = darr.get('ema50') if darr else None
-            out[sym]['ema100'] = darr.get('ema100') if darr else None
-            out[sym]['ema200'] = darr.get('ema200') if darr else None
-        except Exception:
-            out[sym]['ema5'] = None
-            out[sym]['ema8'] = None
-            out[sym]['ema10'] = None
-            out[sym]['ema20'] = None
-            out[sym]['ema50'] = None
-            out[sym]['ema100'] = None
-            out[sym]['ema200'] = None
+        # entries are replaced, never mutated, so the request snapshot is enough
+        darr = daily_avg_snapshot.get(sym) or {}
+        row = out[sym]
+        for k in _EMA_KEYS:
+            row[k] = darr.get(k)
     return {"count": len(out), "data": out}
 
 
@@ -1629,8 +1823,8 @@ def manual_refresh_all_averages(symbols: Optional[List[str]] = None) -> Dict[str
             universe_name = params.get("universe_list", "allstocks")
             symbols = load_symbol_list(universe_name)
         
-        global _daily_avg_last_ts
-        _daily_avg_last_ts = None  # Force refresh by clearing timestamp
+        global _daily_avg_last_mono
+        _daily_avg_last_mono = float('-inf')  # Force refresh by clearing timestamp
         
         _refresh_daily_averages_if_needed(symbols)
         
@@ -88,7 +88,7 @@ from kiteconnect import KiteConnect, KiteTicker
 from pgAdmin_database.db_connection import pg_cursor, test_connection
 
 # Import Flask app and ltp_service (now that logging is set up)
-from app import app  # Flask app instance
+from app import app, ensure_trade_journal_table  # Flask app instance
 import ltp_service  # For populating caches with real-time data
 
 # Ensure the Flask `app` module sees the canonical implementations of
@@ -538,8 +538,9 @@ def run(
     else:
         logging.info("Running in NO-KITE mode: ticker and live subscriptions disabled.")
     
-    # Ensure database table
+    # Ensure database tables
     ensure_ohlcv_table()
+    ensure_trade_journal_table()
     
     # Start Flask server
     flask_thread = run_flask_server(host, port)
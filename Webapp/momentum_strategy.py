@@ -1472,7 +1472,7 @@ class MomentumStrategy:
 
         # Also log to central trade_journal (Postgres) so all traders appear in the shared journal
         try:
-            from pgAdmin_database.db_connection import pg_cursor
+            from pgAdmin_database.db_connection import pg_cursor, ensure_trade_journal_schema
             try:
                 trade_id_str = f"MOM_{str(order_result.get('order_id') or '')}_{int(time.time())}"
             except Exception:
@@ -1480,29 +1480,8 @@ class MomentumStrategy:
 
             try:
                 with pg_cursor() as (cur, conn):
-                    # create table if missing (keep schema compatible with app._log_trade_entry)
-                    cur.execute("""
-                        CREATE TABLE IF NOT EXISTS trade_journal (
-                            id SERIAL PRIMARY KEY,
-                            trade_id TEXT UNIQUE,
-                            symbol TEXT NOT NULL,
-                            entry_date TIMESTAMP,
-                            entry_price NUMERIC,
-                            entry_qty INTEGER,
-                            exit_date TIMESTAMP,
-                            exit_price NUMERIC,
-                            pnl NUMERIC,
-                            pnl_pct NUMERIC,
-                            duration NUMERIC,
-                            strategy TEXT,
-                            status TEXT,
-                            notes TEXT,
-                            order_id TEXT,
-                            gtt_id TEXT,
-                            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                        )
-                    """)
+                    # create table if missing (schema shared with app.ensure_trade_journal_table)
+                    ensure_trade_journal_schema(cur)
 
                     cur.execute("""
                         INSERT INTO trade_journal (trade_id, symbol, entry_date, entry_price, entry_qty, status, order_id, gtt_id, notes, strategy)
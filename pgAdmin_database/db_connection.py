@@ -8,7 +8,7 @@ Usage:
             cur.execute('SELECT 1')
             print(cur.fetchone())
 
-    Or using context manager:
+    Or using context manager (connections are pooled; see PG_POOL_MIN/PG_POOL_MAX):
         with pg_cursor() as (cur, conn):
             cur.execute('SELECT now()')
             print(cur.fetchone())
@@ -28,6 +28,7 @@ or 'kite'). This module will attempt to strip spaces but warns if they exist.
 from __future__ import annotations
 
 import os
+import threading
 import yaml
 import logging
 from contextlib import contextmanager
@@ -36,12 +37,21 @@ from typing import Optional, Tuple, Any
 try:
     import psycopg2
     from psycopg2.extras import RealDictCursor
+    from psycopg2.pool import ThreadedConnectionPool
 except Exception as e:  # pragma: no cover - psycopg2 might not be installed in dev
     psycopg2 = None  # type: ignore
+    ThreadedConnectionPool = None  # type: ignore
     logging.warning("psycopg2 not available: %s (DB features disabled)", e)
 
 _CONFIG_CACHE = None
 
+# Shared connection pool backing pg_cursor(). Created lazily on first use so
+# importing this module never opens connections. Size with PG_POOL_MIN /
+# PG_POOL_MAX; maxconn should cover the number of Flask worker threads plus
+# background refreshers.
+_pool = None
+_pool_lock = threading.Lock()
+
 def _load_config():
     global _CONFIG_CACHE
     if _CONFIG_CACHE is not None:
@@ -61,6 +71,16 @@ def _normalize_db_name(name: str) -> str:
         return name.replace(' ', '')
     return name
 
+def _dsn() -> dict:
+    cfg = _load_config()
+    return dict(
+        host=cfg.get('host') or cfg.get('hostname') or '127.0.0.1',
+        port=int(cfg.get('port') or 5432),
+        dbname=_normalize_db_name(str(cfg.get('db_name') or 'postgres')),
+        user=cfg.get('username') or cfg.get('user') or os.getenv('PGUSER') or 'postgres',
+        password=cfg.get('password') or os.getenv('PGPASSWORD'),
+    )
+
 def get_connection() -> Optional[Any]:
     """Return a new psycopg2 connection or None if unavailable.
 
@@ -69,43 +89,130 @@ def get_connection() -> Optional[Any]:
     """
     if psycopg2 is None:
         return None
-    cfg = _load_config()
-    host = cfg.get('host') or cfg.get('hostname') or '127.0.0.1'
-    port = int(cfg.get('port') or 5432)
-    db_name = _normalize_db_name(str(cfg.get('db_name') or 'postgres'))
-    user = cfg.get('username') or cfg.get('user') or os.getenv('PGUSER') or 'postgres'
-    password = cfg.get('password') or os.getenv('PGPASSWORD')
+    dsn = _dsn()
     try:
-        conn = psycopg2.connect(host=host, port=port, dbname=db_name, user=user, password=password)
+        conn = psycopg2.connect(**dsn)
         conn.autocommit = True
         return conn
     except Exception as e:
-        logging.error("Failed to connect to Postgres %s:%s db=%s user=%s: %s", host, port, db_name, user, e)
+        logging.error("Failed to connect to Postgres %s:%s db=%s user=%s: %s", dsn['host'], dsn['port'], dsn['dbname'], dsn['user'], e)
         return None
 
+def _get_pool():
+    """Return the shared ThreadedConnectionPool, creating it on first call.
+
+    Returns None if psycopg2 is missing or the pool can't be created; callers
+    then fall back to a one-off connection.
+    """
+    global _pool
+    if _pool is not None or ThreadedConnectionPool is None:
+        return _pool
+    with _pool_lock:
+        if _pool is None:
+            dsn = _dsn()
+            try:
+                minconn = int(os.getenv('PG_POOL_MIN', '2'))
+                maxconn = int(os.getenv('PG_POOL_MAX', '20'))
+                _pool = ThreadedConnectionPool(minconn, maxconn, **dsn)
+            except Exception as e:
+                logging.error("Failed to create Postgres pool %s:%s db=%s user=%s: %s", dsn['host'], dsn['port'], dsn['dbname'], dsn['user'], e)
+                return None
+    return _pool
+
 @contextmanager
 def pg_cursor(dict_rows: bool = False):
     """Context manager yielding (cursor, connection).
 
+    Connections come from the shared pool and are returned on exit (discarded
+    if the block raised or the connection was closed underneath us).
+
     Parameters:
         dict_rows: use RealDictCursor for dict results.
     """
-    conn = get_connection()
+    pool = _get_pool()
+    conn = None
+    if pool is not None:
+        try:
+            conn = pool.getconn()
+            conn.autocommit = True
+        except Exception as e:
+            logging.warning("Postgres pool getconn failed, using direct connection: %s", e)
+            conn = None
+            pool = None
+    if conn is None:
+        conn = get_connection()
     if conn is None:
         raise RuntimeError("No database connection (psycopg2 missing or connect failed)")
     cur_cls = RealDictCursor if dict_rows else None
     cur = conn.cursor(cursor_factory=cur_cls) if cur_cls else conn.cursor()
+    failed = False
     try:
         yield cur, conn
+    except BaseException:
+        failed = True
+        raise
     finally:
         try:
             cur.close()
         except Exception:
             pass
-        try:
-            conn.close()
-        except Exception:
-            pass
+        if pool is not None:
+            try:
+                pool.putconn(conn, close=failed or bool(conn.closed))
+            except Exception:
+                pass
+        else:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+# trade_journal is written by both the webapp and momentum_strategy, and
+# whichever runs first creates it, so both go through this one superset schema.
+_TRADE_JOURNAL_COLUMNS = (
+    ("trade_id", "TEXT UNIQUE"),
+    ("symbol", "TEXT NOT NULL"),
+    ("entry_date", "TIMESTAMP"),
+    ("timestamp", "TIMESTAMP"),
+    ("side", "TEXT"),
+    ("order_book_imbalance", "NUMERIC"),
+    ("intended_entry_price", "NUMERIC"),
+    ("fill_price", "NUMERIC"),
+    ("slippage", "NUMERIC"),
+    ("entry_price", "NUMERIC"),
+    ("entry_qty", "INTEGER"),
+    ("exit_date", "TIMESTAMP"),
+    ("exit_price", "NUMERIC"),
+    ("pnl", "NUMERIC"),
+    ("pnl_pct", "NUMERIC"),
+    ("duration", "NUMERIC"),
+    ("setup_description", "TEXT"),
+    ("strategy", "TEXT"),
+    ("status", "TEXT"),
+    ("notes", "TEXT"),
+    ("order_id", "TEXT"),
+    ("gtt_id", "TEXT"),
+    ("created_at", "TIMESTAMP DEFAULT CURRENT_TIMESTAMP"),
+    ("updated_at", "TIMESTAMP DEFAULT CURRENT_TIMESTAMP"),
+)
+
+def ensure_trade_journal_schema(cur) -> None:
+    """Create trade_journal with every column either writer uses.
+
+    A table created earlier with a narrower column set is widened in place;
+    the ALTER (which takes an exclusive lock) only runs if columns are missing.
+    """
+    cols = ",\n".join(f"    {name} {ddl}" for name, ddl in _TRADE_JOURNAL_COLUMNS)
+    cur.execute(f"CREATE TABLE IF NOT EXISTS trade_journal (\n    id SERIAL PRIMARY KEY,\n{cols}\n)")
+    cur.execute("SELECT column_name FROM information_schema.columns WHERE table_name = 'trade_journal'")
+    have = {r[0] for r in cur.fetchall()}
+    # symbol is NOT NULL and present in every older schema; don't re-add it
+    adds = ",\n".join(
+        f"    ADD COLUMN IF NOT EXISTS {name} {ddl}"
+        for name, ddl in _TRADE_JOURNAL_COLUMNS if name != "symbol" and name not in have
+    )
+    if adds:
+        cur.execute(f"ALTER TABLE trade_journal\n{adds}")
 
 def test_connection() -> bool:
     """Quick health check: returns True if SELECT 1 succeeds."""
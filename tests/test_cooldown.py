@@ -0,0 +1,34 @@
+import sys
+import os
+
+# Ensure project root is on sys.path so tests can import application modules
+ROOT = os.path.dirname(os.path.dirname(__file__))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from Webapp import cooldown
+
+
+def test_blocked_then_allowed_after_expiry(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cooldown.time, 'monotonic', lambda: now[0])
+    cooldown.record('FOO')
+    allowed, remaining = cooldown.is_allowed('FOO', cooldown_seconds=600)
+    assert not allowed
+    assert remaining == 600
+    now[0] += 601
+    assert cooldown.is_allowed('FOO', cooldown_seconds=600) == (True, None)
+
+
+def test_unknown_symbol_allowed():
+    assert cooldown.is_allowed('NEVER_RECORDED') == (True, None)
+
+
+def test_stale_entry_pruned_on_lookup(monkeypatch):
+    now = [5000.0]
+    monkeypatch.setattr(cooldown.time, 'monotonic', lambda: now[0])
+    cooldown.record('BAR')
+    now[0] += cooldown._PRUNE_AFTER_SECONDS + 1
+    assert cooldown.is_allowed('BAR', cooldown_seconds=600) == (True, None)
+    assert 'BAR' not in cooldown._last_stop_mono
+    assert cooldown.get_last_timestamp('BAR') is None
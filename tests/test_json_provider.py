@@ -0,0 +1,49 @@
+from datetime import datetime
+from decimal import Decimal
+import json
+import sys
+import os
+
+import pytest
+
+# Ensure project root is on sys.path so tests can import application modules
+ROOT = os.path.dirname(os.path.dirname(__file__))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+pytest.importorskip('flask')
+from Webapp import app as webapp
+
+ROW = {'b': 1, 'a': Decimal('1.5'), 'ts': datetime(2026, 1, 2, 3, 4, 5)}
+
+
+def test_jsonify_matches_flask_encoding():
+    with webapp.app.app_context():
+        body = webapp.jsonify(ROW).get_data(as_text=True)
+    # sorted keys, Decimal as str, datetimes as HTTP dates (Flask's defaults)
+    assert body.strip() == '{"a":"1.5","b":1,"ts":"Fri, 02 Jan 2026 03:04:05 GMT"}'
+
+
+def test_jsonify_rejects_unknown_types():
+    with webapp.app.app_context():
+        with pytest.raises(TypeError):
+            webapp.jsonify({'x': object()})
+
+
+def test_dumps_honours_json_kwargs():
+    assert webapp.app.json.dumps({'b': 1, 'a': 2}, indent=2) == json.dumps({'a': 2, 'b': 1}, indent=2)
+
+
+def test_json_bytes_uses_iso_dates_and_float_decimals():
+    assert json.loads(webapp._json_bytes(ROW)) == {'b': 1, 'a': 1.5, 'ts': '2026-01-02T03:04:05'}
+    with pytest.raises(TypeError):
+        webapp._json_bytes({'x': object()})
+
+
+def test_jsonify_argument_forms():
+    with webapp.app.app_context():
+        assert webapp.jsonify().get_json() is None
+        assert webapp.jsonify(1, 2).get_json() == [1, 2]
+        assert webapp.jsonify(a=1).get_json() == {'a': 1}
+        with pytest.raises(TypeError):
+            webapp.jsonify(1, a=1)
@@ -0,0 +1,200 @@
+from contextlib import contextmanager
+from datetime import datetime
+import random
+import sqlite3
+import sys
+import os
+import threading
+
+import pytest
+
+# Ensure project root is on sys.path so tests can import application modules
+ROOT = os.path.dirname(os.path.dirname(__file__))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from Webapp import ltp_service as ltp
+
+
+def test_centered_extrema_matches_brute_force():
+    rng = random.Random(7)
+    for n, window in ((0, 3), (1, 3), (5, 6), (40, 6), (40, 1)):
+        vals = [rng.choice((1.0, 2.0, 3.0, rng.random())) for _ in range(n)]
+        maxs, mins = ltp._centered_extrema(vals, window)
+        for i in range(n):
+            span = vals[max(0, i - window):i + window + 1]
+            assert maxs[i] == max(span)
+            assert mins[i] == min(span)
+
+
+def test_rsi14_uses_latest_15_closes():
+    recent = [10, 11, 10.5, 11.5, 11, 12, 11.5, 12.5, 12, 13, 12.5, 13.5, 13, 14, 13.5]
+    gains = sum(max(b - a, 0) for a, b in zip(recent, recent[1:]))
+    losses = sum(max(a - b, 0) for a, b in zip(recent, recent[1:]))
+    expected = 100.0 - 100.0 / (1.0 + gains / losses)
+    assert ltp._rsi14(recent) == pytest.approx(expected)
+    # older history outside the window does not move the value
+    assert ltp._rsi14([500.0, 1.0, 900.0] + recent) == pytest.approx(expected)
+
+
+def test_rsi14_without_losses_is_100():
+    assert ltp._rsi14([float(i) for i in range(20)]) == 100.0
+
+
+def _recursive_ema(closes, p):
+    ema = sum(closes[:p]) / p
+    k = 2.0 / (p + 1)
+    for c in closes[p:]:
+        ema = c * k + ema * (1 - k)
+    return ema
+
+
+def test_ema_sql_closed_form_matches_recursive_ema():
+    periods = (5, 20)
+    rng = random.Random(3)
+    closes = [100 + rng.uniform(-5, 5) for _ in range(30)]  # chronological
+    con = sqlite3.connect(':memory:')
+    con.create_function('power', 2, pow)
+    con.execute('CREATE TABLE ohlcv_data (stockname, timeframe, candle_stock, close)')
+    con.executemany(
+        'INSERT INTO ohlcv_data VALUES (?, ?, ?, ?)',
+        [('FOO', '1d', i, c) for i, c in enumerate(closes)]
+        + [('BAR', '1d', i, c) for i, c in enumerate(closes[:10])]
+    )
+    sql = (ltp._ema_sql(periods, lookback=25)
+           .replace('::float8', '')
+           .replace('stockname = ANY(%s)', "stockname IN ('FOO', 'BAR')"))
+    rows = {r[0]: r[1:] for r in con.execute(sql)}
+
+    used, ema5, ema20 = rows['FOO']
+    assert used == 25
+    assert ema5 == pytest.approx(_recursive_ema(closes[-25:], 5))
+    assert ema20 == pytest.approx(_recursive_ema(closes[-25:], 20))
+    # too few candles for the 20-period EMA
+    used, ema5, ema20 = rows['BAR']
+    assert used == 10
+    assert ema5 == pytest.approx(_recursive_ema(closes[:10], 5))
+    assert ema20 is None
+
+
+def test_take_historical_token_rate_limits(monkeypatch):
+    clock = [1000.0]
+    sleeps = []
+
+    def sleep(s):
+        sleeps.append(s)
+        clock[0] += s
+
+    monkeypatch.setattr(ltp.time, 'monotonic', lambda: clock[0])
+    monkeypatch.setattr(ltp.time, 'sleep', sleep)
+    monkeypatch.setattr(ltp, '_hist_tokens', ltp._HISTORICAL_RATE_PER_SEC)
+    monkeypatch.setattr(ltp, '_hist_tokens_mono', clock[0])
+
+    for _ in range(int(ltp._HISTORICAL_RATE_PER_SEC)):
+        ltp._take_historical_token()
+    assert sleeps == []
+    ltp._take_historical_token()
+    assert sum(sleeps) == pytest.approx(1.0 / ltp._HISTORICAL_RATE_PER_SEC)
+
+
+def test_single_flight_joins_running_call():
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    @ltp._single_flight
+    def refresh():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return 'ran'
+
+    results = []
+    first = threading.Thread(target=lambda: results.append(refresh()))
+    first.start()
+    assert started.wait(5)
+    second = threading.Thread(target=lambda: results.append(refresh()))
+    second.start()
+    second.join(0.2)
+    assert second.is_alive()  # waits for the running call instead of starting one
+    release.set()
+    first.join(5)
+    second.join(5)
+    assert len(calls) == 1
+    assert sorted(results, key=str) == [None, 'ran']
+    # the next call after completion runs again
+    assert refresh() == 'ran'
+    assert len(calls) == 2
+
+
+class _VcpCursor:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def execute(self, sql, params):
+        pass
+
+    def fetchall(self):
+        return list(self.rows)
+
+
+@pytest.fixture
+def vcp_db(monkeypatch):
+    rows = []
+    detected = []
+
+    @contextmanager
+    def pg_cursor():
+        yield _VcpCursor(rows), None
+
+    def detect(closes_arr, **kwargs):
+        detected.append(len(closes_arr))
+        return {'has_vcp': False, 'n': len(detected)}
+
+    monkeypatch.setattr(ltp, 'pg_cursor', pg_cursor)
+    monkeypatch.setattr(ltp, '_db_available', lambda: True)
+    monkeypatch.setattr(ltp, '_detect_vcp', detect)
+    monkeypatch.setattr(ltp, '_vcp_cache', {})
+    monkeypatch.setattr(ltp, '_vcp_input_keys', {})
+
+    def refresh():
+        monkeypatch.setattr(ltp, '_vcp_last_mono', float('-inf'))
+        ltp._refresh_vcp_if_needed([r[0] for r in rows])
+
+    return rows, detected, refresh
+
+
+def _vcp_row(symbol, closes, volumes):
+    # newest-first arrays plus the window sums, as the query returns them
+    return (symbol, datetime(2026, 1, 2, 15, 15), closes, closes, closes, closes,
+            volumes, sum(closes), sum(volumes))
+
+
+def test_vcp_reuses_result_for_unchanged_window(vcp_db):
+    rows, detected, refresh = vcp_db
+    rows.append(_vcp_row('FOO', [3.0, 2.0, 1.0], [10.0, 10.0, 10.0]))
+    refresh()
+    refresh()
+    assert detected == [3]
+    assert ltp._vcp_cache['FOO']['n'] == 1
+
+
+def test_vcp_recomputes_when_older_bar_is_revised(vcp_db):
+    rows, detected, refresh = vcp_db
+    rows.append(_vcp_row('FOO', [3.0, 2.0, 1.0], [10.0, 10.0, 10.0]))
+    refresh()
+    # same newest candle, back-filled volume on the oldest one
+    rows[0] = _vcp_row('FOO', [3.0, 2.0, 1.0], [10.0, 10.0, 25.0])
+    refresh()
+    assert detected == [3, 3]
+
+
+def test_vcp_input_keys_drop_symbols_leaving_universe(vcp_db):
+    rows, detected, refresh = vcp_db
+    rows.append(_vcp_row('FOO', [3.0, 2.0, 1.0], [10.0, 10.0, 10.0]))
+    rows.append(_vcp_row('BAR', [1.0, 2.0], [5.0, 5.0]))
+    refresh()
+    del rows[1]
+    refresh()
+    assert set(ltp._vcp_input_keys) == {'FOO'}
+    assert set(ltp._vcp_cache) == {'FOO'}
@@ -0,0 +1,49 @@
+from datetime import date, datetime
+import sys
+import os
+
+import pytest
+
+# Ensure project root is on sys.path so tests can import application modules
+ROOT = os.path.dirname(os.path.dirname(__file__))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+pytest.importorskip('flask')
+from Webapp import app as webapp
+
+
+def ist(*args):
+    return datetime(*args, tzinfo=webapp._IST)
+
+
+@pytest.fixture(autouse=True)
+def holidays(monkeypatch):
+    # Fri 2026-01-16 closed, so Thu close -> Mon open
+    monkeypatch.setattr(webapp, '_MARKET_HOLIDAYS', frozenset({date(2026, 1, 16)}))
+
+
+def test_market_open_respects_hours_and_holidays():
+    assert webapp._market_open(ist(2026, 1, 15, 9, 15))
+    assert not webapp._market_open(ist(2026, 1, 15, 9, 14))
+    assert not webapp._market_open(ist(2026, 1, 15, 15, 31))
+    assert not webapp._market_open(ist(2026, 1, 16, 11, 0))
+    assert not webapp._market_open(ist(2026, 1, 17, 11, 0))
+
+
+def test_seconds_until_open_same_day():
+    assert webapp._seconds_until_market_open(ist(2026, 1, 15, 9, 0)) == 15 * 60
+    assert webapp._seconds_until_market_open(ist(2026, 1, 15, 10, 0)) == 0
+
+
+def test_seconds_until_open_skips_holiday_and_weekend():
+    now = ist(2026, 1, 15, 16, 0)
+    assert webapp._seconds_until_market_open(now) == (ist(2026, 1, 19, 9, 15) - now).total_seconds()
+
+
+def test_load_market_holidays_from_env_and_csv(tmp_path, monkeypatch):
+    path = tmp_path / 'holidays.csv'
+    path.write_text('date,name\n2026-01-26,Republic Day\n')
+    monkeypatch.setenv('MARKET_HOLIDAYS_CSV', str(path))
+    monkeypatch.setenv('MARKET_HOLIDAYS', '2026-03-03, bogus')
+    assert webapp._load_market_holidays() == {date(2026, 1, 26), date(2026, 3, 3)}
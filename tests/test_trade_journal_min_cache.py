@@ -0,0 +1,62 @@
+import sys
+import os
+
+import pytest
+
+# Ensure project root is on sys.path so tests can import application modules
+ROOT = os.path.dirname(os.path.dirname(__file__))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+pytest.importorskip('flask')
+from Webapp import app as webapp
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    webapp._min_cache.clear()
+    yield
+    webapp._min_cache.clear()
+
+
+def test_write_makes_cache_miss():
+    key = ('FOO', 30)
+    version, cached = webapp._min_cache_get(key)
+    assert cached is None
+    webapp._min_cache_put(key, version, '[1]')
+    assert webapp._min_cache_get(key) == (version, '[1]')
+    webapp._bump_journal_version()
+    assert webapp._min_cache_get(key)[1] is None
+
+
+def test_put_after_concurrent_write_is_dropped():
+    key = ('FOO', 30)
+    version, _ = webapp._min_cache_get(key)
+    webapp._bump_journal_version()
+    webapp._min_cache_put(key, version, '[1]')
+    assert key not in webapp._min_cache
+
+
+def test_uncommon_days_not_cached():
+    version, _ = webapp._min_cache_get(('FOO', 12345))
+    webapp._min_cache_put(('FOO', 12345), version, '[]')
+    assert not webapp._min_cache
+
+
+def test_cache_size_is_bounded(monkeypatch):
+    monkeypatch.setattr(webapp, '_MIN_CACHE_MAX', 3)
+    version, _ = webapp._min_cache_get(('S0', 30))
+    for i in range(10):
+        webapp._min_cache_put((f'S{i}', 30), version, '[]')
+    assert list(webapp._min_cache) == [('S7', 30), ('S8', 30), ('S9', 30)]
+
+
+def test_expired_entries_evicted_on_store(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(webapp.time, 'time', lambda: now[0])
+    version, _ = webapp._min_cache_get(('OLD', 30))
+    webapp._min_cache_put(('OLD', 30), version, '[]')
+    now[0] += webapp._MIN_CACHE_TTL + 1
+    assert webapp._min_cache_get(('OLD', 30))[1] is None
+    webapp._min_cache_put(('NEW', 30), version, '[]')
+    assert list(webapp._min_cache) == [('NEW', 30)]
@@ -0,0 +1,54 @@
+import sys
+import os
+
+import pytest
+
+# Ensure project root is on sys.path so tests can import application modules
+ROOT = os.path.dirname(os.path.dirname(__file__))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+pytest.importorskip('flask')
+from Webapp import app as webapp
+
+
+@pytest.fixture
+def book(monkeypatch):
+    """Install a cached GTT book fetched at monotonic time 100 (now is 101)."""
+    monkeypatch.setattr(webapp.time, 'monotonic', lambda: 101.0)
+    monkeypatch.setattr(webapp, '_ensure_gtt_refresher', lambda: None)
+    monkeypatch.setattr(webapp, '_trail_pruned_book_ts', 0.0)
+    monkeypatch.setattr(webapp, '_gtt_cache', {'FOO': [{'id': 1, 'tradingsymbol': 'FOO'}]})
+    monkeypatch.setattr(webapp, '_gtt_cache_ts', 100.0)
+    monkeypatch.setattr(webapp, '_trail_state', {})
+    return webapp._trail_state
+
+
+def test_prunes_entry_missing_from_book(book):
+    book['1'] = {'symbol': 'FOO', 'gtt_id': 1, 'registered': 50.0}
+    book['2'] = {'symbol': 'BAR', 'gtt_id': 2, 'registered': 50.0}
+    webapp._prune_trail_state()
+    assert list(book) == ['1']
+
+
+def test_keeps_entry_registered_after_book_fetch(book):
+    book['3'] = {'symbol': 'BAZ', 'gtt_id': 3, 'registered': 100.5}
+    webapp._prune_trail_state()
+    assert '3' in book
+
+
+def test_runs_once_per_book(book, monkeypatch):
+    webapp._prune_trail_state()
+    book['2'] = {'symbol': 'BAR', 'gtt_id': 2, 'registered': 50.0}
+    webapp._prune_trail_state()
+    assert '2' in book
+    monkeypatch.setattr(webapp, '_gtt_cache_ts', 100.8)
+    webapp._prune_trail_state()
+    assert '2' not in book
+
+
+def test_skips_invalidated_cache(book, monkeypatch):
+    monkeypatch.setattr(webapp, '_gtt_cache_ts', 0.0)
+    book['2'] = {'symbol': 'BAR', 'gtt_id': 2, 'registered': 50.0}
+    webapp._prune_trail_state()
+    assert '2' in book
@@ -0,0 +1,32 @@
+import sys
+import os
+
+import pytest
+
+# Ensure project root is on sys.path so tests can import application modules
+ROOT = os.path.dirname(os.path.dirname(__file__))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+pytest.importorskip('flask')
+from Webapp import app as webapp
+
+
+def test_trims_to_max_size_oldest_first():
+    d = {i: {'ts': 0} for i in range(5)}
+    webapp._trim_oldest(d, 2)
+    assert list(d) == [3, 4]
+
+
+def test_evicts_expired_prefix_only(monkeypatch):
+    monkeypatch.setattr(webapp.time, 'time', lambda: 1000.0)
+    d = {'a': {'ts': 100.0}, 'b': {}, 'c': {'ts': 950.0}, 'd': {'ts': 100.0}}
+    webapp._trim_oldest(d, 10, max_age=60)
+    # stops at the first fresh record; later stale ones wait their turn
+    assert list(d) == ['c', 'd']
+
+
+def test_no_age_limit_keeps_old_records():
+    d = {'a': {'ts': 0}, 'b': {'ts': 0}}
+    webapp._trim_oldest(d, 5)
+    assert list(d) == ['a', 'b']